@@ -0,0 +1,214 @@
+"""Run several projects over the same data files, loading each file only once.
+
+Studies often have several project files (lane keeping, gaze, speed compliance...) that
+are run over the same drives. Running them one after the other finds, reads and parses
+every data file once per project. `BatchRun` instead builds the union of the projects'
+data files and, for each file:
+
+1. loads it once for all projects that read data files the same way (same
+   `datafile_type`, schema and type normalization),
+2. applies the filters that all of these projects begin with (the *shared filter
+   prefix*) once,
+3. hands the filtered data to each project that includes the file, which applies its
+   remaining filters, ROIs and metrics.
+
+Each project keeps its own results and output file.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import threading
+import traceback
+from pathlib import Path
+from typing import Optional, Sequence
+
+import polars as pl
+from loguru import logger
+from tqdm import tqdm
+
+import pydre.core
+import pydre.plan
+import pydre.project
+
+
+def sharedFilterPrefix(plans: Sequence[pydre.plan.ProjectPlan]) -> int:
+    """Number of leading filters that are identical (same function and arguments) in all plans."""
+    if len(plans) == 0:
+        return 0
+    count = 0
+    for steps in zip(*(plan.filters for plan in plans)):
+        first = steps[0]
+        if any(
+            step.function_name != first.function_name
+            or dict(step.kwargs) != dict(first.kwargs)
+            for step in steps[1:]
+        ):
+            break
+        count += 1
+    return count
+
+
+def _loadKey(project: pydre.project.Project) -> tuple:
+    """Options that determine how a project loads a data file."""
+    return (
+        project.config.get("datafile_type", "rti"),
+        str(project.config.get("infer_schema_length", "")),
+        project.schema.fingerprint() if project.schema is not None else "",
+        str(sorted(project.normalized_dtypes.items())),
+    )
+
+
+def distinctOutputFiles(projects: Sequence[pydre.project.Project]) -> None:
+    """Rename output files shared by several projects to `NAME.PROJECT.EXT`."""
+    outputs: dict[str, int] = {}
+    for project in projects:
+        output = str(project.config["outputfile"])
+        outputs[output] = outputs.get(output, 0) + 1
+    for project in projects:
+        output = Path(project.config["outputfile"])
+        if outputs[str(output)] > 1:
+            renamed = output.with_name(
+                f"{output.stem}.{project.project_filename.stem}{output.suffix}"
+            )
+            logger.warning(
+                f"Several projects write {output}; "
+                f"writing the results of {project.project_filename.name} to {renamed}"
+            )
+            project.config["outputfile"] = str(renamed)
+
+
+class BatchRun:
+    """Several projects processed together, sharing the loading and common filters of each file."""
+
+    def __init__(self, projects: Sequence[pydre.project.Project]):
+        self.projects = list(projects)
+        groups: dict[tuple, list[pydre.project.Project]] = {}
+        for project in self.projects:
+            project.compilePlan()
+            groups.setdefault(_loadKey(project), []).append(project)
+        self.groups = list(groups.values())
+        # data files of each project, by group; set when processing starts
+        self.filesets: list[list[set]] = []
+        self.prefixes = [
+            sharedFilterPrefix([project.plan for project in group])
+            for group in self.groups
+        ]
+        for group, prefix in zip(self.groups, self.prefixes):
+            logger.info(
+                f"Loading data files once for {len(group)} projects, "
+                f"sharing {prefix} filters"
+            )
+
+    def processSingleFile(self, group: int, datafilename: Path) -> list[pl.DataFrame]:
+        """Results of each project of `group` for one data file (empty for projects not using it)."""
+        projects = self.groups[group]
+        uses = [datafilename in files for files in self.filesets[group]]
+        if not any(uses):
+            return [pl.DataFrame() for _ in projects]
+        # the first project using the file loads it and applies the shared filters
+        loader = projects[uses.index(True)]
+        datafile = loader.loadDatafile(datafilename)
+        for filter_step in loader.plan.filters[: self.prefixes[group]]:
+            datafile = filter_step.run(datafile)
+
+        results = []
+        for project, used in zip(projects, uses):
+            if not used:
+                results.append(pl.DataFrame())
+                continue
+            # filters replace the data frame rather than changing it, so sharing it is safe
+            projectfile = pydre.core.DriveData(datafile, datafile.data)
+            projectfile.config = project.config
+            try:
+                results.append(
+                    project.processDriveData(
+                        projectfile, datafilename, first_filter=self.prefixes[group]
+                    )
+                )
+            except Exception as exc:
+                # Non-fatal failure of one project: the other projects still get the file.
+                logger.error(
+                    f"problem with running {datafilename} for {project.project_filename}"
+                )
+                logger.critical("Unhandled Exception {}".format(exc))
+                logger.error(traceback.format_exc())
+                results.append(pl.DataFrame())
+        return results
+
+    def processDatafiles(self, numThreads: Optional[int] = None) -> None:
+        """Process the data files of all projects, storing each project's `results`."""
+        if numThreads is None:
+            numThreads = os.cpu_count() - 1 or 1
+        # STOP FLAG
+        self._stop_event = threading.Event()
+        for project in self.projects:
+            project._stop_event = self._stop_event
+            for roi_step in project.plan.rois:
+                # Inject the stop flag so ROI code can silence logs after Ctrl+C
+                if roi_step.processor is not None:
+                    roi_step.processor._stop_event = self._stop_event
+            project.scanFiles()
+        self.filesets = [
+            [set(project.filelist) for project in group] for group in self.groups
+        ]
+
+        for group, projects in enumerate(self.groups):
+            # union of the projects' files, in order
+            files: list[Path] = list(
+                dict.fromkeys(f for project in projects for f in project.filelist)
+            )
+            frames: list[list[pl.DataFrame]] = [[] for _ in projects]
+            with tqdm(total=len(files)) as pbar:
+                with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=numThreads
+                ) as executor:
+                    futures = {
+                        executor.submit(self.processSingleFile, group, f): f
+                        for f in files
+                    }
+                    try:
+                        for future in concurrent.futures.as_completed(futures):
+                            try:
+                                for i, frame in enumerate(future.result()):
+                                    if frame.height > 0:
+                                        frames[i].append(frame)
+                            except KeyboardInterrupt:
+                                self._stop_event.set()  # STOP FLAG
+                                logger.critical(
+                                    "Execution interrupted by user (Ctrl+C). Cancelling pending work..."
+                                )
+                                executor.shutdown(wait=False, cancel_futures=True)
+                                # cancelled futures never complete, so stop waiting
+                                break
+                            except Exception as exc:
+                                logger.error(
+                                    "problem with running {}".format(futures[future])
+                                )
+                                logger.critical("Unhandled Exception {}".format(exc))
+                                logger.error(traceback.format_exc())
+                            finally:
+                                pbar.update(1)
+                    except KeyboardInterrupt:
+                        self._stop_event.set()  # STOP FLAG
+                        logger.critical("Aborted by user (Ctrl+C).")
+                        executor.shutdown(wait=False, cancel_futures=True)
+
+            for project, project_frames in zip(projects, frames):
+                if len(project_frames) == 0:
+                    logger.error(
+                        f"No results found for {project.project_filename}; "
+                        "no metrics data generated"
+                    )
+                    project.results = pl.DataFrame()
+                    continue
+                project.results = pl.concat(project_frames, how="diagonal_relaxed")
+                if project.schema is not None:
+                    project.schema.save()
+            if self._stop_event.is_set():
+                break
+
+    def saveResults(self) -> None:
+        for project in self.projects:
+            project.saveResults()
@@ -0,0 +1,214 @@
+"""Persistent catalog of data files for large, multi-study data directories.
+
+Resolving `datafiles` patterns on a share with hundreds of thousands of drive files is slow,
+and every run repeats the work. A `Catalog` stores, in an SQLite database, the path, size,
+modification time, filename metadata (ParticipantID, ScenarioName, DriveID, ...) and header
+columns of each data file. Refreshing a pattern only re-reads files that are new or changed
+since the last refresh and drops files that have disappeared. Projects can then select
+files by metadata without touching the files themselves.
+"""
+
+from __future__ import annotations
+
+import fnmatch
+import json
+import re
+import sqlite3
+import threading
+from os import PathLike
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional
+
+from loguru import logger
+
+import pydre.index
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    directory TEXT NOT NULL,
+    name TEXT NOT NULL,
+    datafile_type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    compression TEXT,
+    columns TEXT NOT NULL,
+    metadata TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_directory ON files (directory);
+"""
+
+_KEY_RE = re.compile(r"^\w+$")
+
+
+def ignoreMatcher(ignore: Iterable[Any]) -> Optional[re.Pattern]:
+    """Combine `ignore` entries into one regular expression matching any of them.
+
+    A file is ignored if its path contains any entry as a substring. Matching one combined
+    expression per file replaces a loop over every ignore entry for every file.
+    """
+    entries = [str(Path(entry)) for entry in ignore]
+    if len(entries) == 0:
+        return None
+    return re.compile("|".join(re.escape(entry) for entry in entries))
+
+
+def matchesSelection(metadata: Mapping[str, Any], selection: Mapping[str, Any]) -> bool:
+    """Whether filename metadata satisfies a selection such as `{"ScenarioName": ["A", "B"]}`.
+
+    Each selection value is a single value or a list of accepted values. Values are
+    compared as strings.
+    """
+    for key, accepted in selection.items():
+        if not isinstance(accepted, (list, tuple, set)):
+            accepted = [accepted]
+        if str(metadata.get(key)) not in {str(a) for a in accepted}:
+            return False
+    return True
+
+
+class Catalog:
+    """SQLite-backed index of data files, refreshed incrementally."""
+
+    def __init__(self, path: str | PathLike):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> Catalog:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    @staticmethod
+    def _toInfo(row: tuple) -> pydre.index.FileInfo:
+        path, size, mtime_ns, compression, columns, metadata = row
+        return pydre.index.FileInfo(
+            Path(path),
+            size,
+            mtime_ns,
+            compression,
+            tuple(json.loads(columns)),
+            json.loads(metadata),
+        )
+
+    def refresh(
+        self, pattern: str | PathLike, datafile_type: str = "rti"
+    ) -> list[pydre.index.FileInfo]:
+        """Bring the catalog up to date for the files matching a glob pattern.
+
+        Only new and modified files are scanned. Catalog entries for files that match the
+        pattern but no longer exist are removed.
+
+        Returns:
+            entries for all files currently matching the pattern, sorted by path
+        """
+        pattern = Path(pattern)
+        directory = pattern.parent.resolve()
+        with self._lock:
+            known = {
+                row[0]: row
+                for row in self._connection.execute(
+                    "SELECT path, size, mtime_ns, compression, columns, metadata, "
+                    "datafile_type FROM files WHERE directory = ?",
+                    (str(directory),),
+                )
+            }
+
+        infos: list[pydre.index.FileInfo] = []
+        updates = []
+        for file in sorted(directory.glob(pattern.name)):
+            if not file.is_file():
+                continue
+            key = str(file)
+            stat = file.stat()
+            row = known.pop(key, None)
+            if (
+                row is not None
+                and row[1] == stat.st_size
+                and row[2] == stat.st_mtime_ns
+                and row[6] == datafile_type
+            ):
+                infos.append(self._toInfo(row[:6]))
+                continue
+            try:
+                info = pydre.index.scanFile(file, datafile_type)
+            except OSError as e:
+                logger.error(f"Could not scan {file}: {e}")
+                continue
+            infos.append(info)
+            updates.append(
+                (
+                    key,
+                    str(directory),
+                    file.name,
+                    datafile_type,
+                    info.size,
+                    info.mtime_ns,
+                    info.compression,
+                    json.dumps(list(info.columns)),
+                    json.dumps(dict(info.metadata)),
+                )
+            )
+
+        # entries left in `known` matching the pattern no longer exist
+        removed = [
+            (path,)
+            for path in known
+            if fnmatch.fnmatchcase(Path(path).name, pattern.name)
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                updates,
+            )
+            self._connection.executemany("DELETE FROM files WHERE path = ?", removed)
+        logger.info(
+            f"Catalog {self.path.name}: {len(infos)} files for {pattern}, "
+            f"{len(updates)} scanned, {len(removed)} removed"
+        )
+        return infos
+
+    def select(
+        self,
+        selection: Optional[Mapping[str, Any]] = None,
+        directory: Optional[str | PathLike] = None,
+    ) -> list[pydre.index.FileInfo]:
+        """Catalog entries whose filename metadata matches `selection`.
+
+        Parameters:
+            selection: metadata key -> accepted value or list of values
+            directory: only return files in this directory
+        """
+        query = "SELECT path, size, mtime_ns, compression, columns, metadata FROM files"
+        conditions: list[str] = []
+        parameters: list[Any] = []
+        for key, accepted in (selection or {}).items():
+            if not _KEY_RE.match(key):
+                raise ValueError(f"Invalid metadata key '{key}'")
+            if not isinstance(accepted, (list, tuple, set)):
+                accepted = [accepted]
+            placeholders = ", ".join("?" for _ in accepted)
+            conditions.append(
+                f"CAST(json_extract(metadata, '$.{key}') AS TEXT) IN ({placeholders})"
+            )
+            parameters.extend(str(a) for a in accepted)
+        if directory is not None:
+            conditions.append("directory = ?")
+            parameters.append(str(Path(directory).resolve()))
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY path"
+        with self._lock:
+            rows = self._connection.execute(query, parameters).fetchall()
+        return [self._toInfo(row) for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM files").fetchone()[0]
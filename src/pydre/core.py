@@ -1,13 +1,83 @@
 from __future__ import annotations
 
+import contextlib
 import copy
+import gzip
+import os
 import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
 
 import polars
 from loguru import logger
-from typing import List, Optional, Any
+from typing import Any, Callable, Hashable, Iterator, List, Optional
 from pathlib import Path
 
+import pydre.schema
+
+
+# Magic numbers at the start of compressed data files
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+
+def detectCompression(filename: Path) -> Optional[str]:
+    """Return "gzip" or "zstd" if the file is compressed, None for plain text.
+
+    The file contents are checked rather than the extension, so renamed files work too.
+    """
+    with open(filename, "rb") as f:
+        start = f.read(4)
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if start.startswith(magic):
+            return compression
+    return None
+
+
+# bytes decompressed at a time
+DECOMPRESS_CHUNK = 1024 * 1024
+
+
+@contextlib.contextmanager
+def decompressedFile(filename: Path) -> Iterator[Path]:
+    """Path of a plain text version of a possibly compressed data file, for the CSV reader.
+
+    Compressed files are decompressed in chunks to a temporary file, which is removed on
+    exit. Memory use stays at one chunk rather than the whole decompressed file, and the
+    header and the data can both be read without decompressing twice. zlib and zstandard
+    release the GIL while they work, so files processed by the project's thread pool
+    decompress in parallel. Plain files are read directly.
+    """
+    compression = detectCompression(filename)
+    if compression is None:
+        yield filename
+        return
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            # polars can decompress zstd files itself, in memory, but the header
+            # pre-scan then pays for a second decompression
+            logger.debug("zstandard is not installed, letting polars decompress")
+            yield filename
+            return
+    fd, tmp_name = tempfile.mkstemp(prefix="pydre-", suffix=".dat")
+    try:
+        with open(fd, "wb") as out, open(filename, "rb") as f:
+            if compression == "gzip":
+                reader = gzip.GzipFile(fileobj=f)
+            else:
+                reader = zstandard.ZstdDecompressor().stream_reader(f)
+            with reader:
+                shutil.copyfileobj(reader, out, DECOMPRESS_CHUNK)
+        yield Path(tmp_name)
+    finally:
+        os.unlink(tmp_name)
+
 
 class DriveData:
     data: polars.DataFrame
@@ -36,6 +106,8 @@ class DriveData:
             self.sourcefilename = Path()
             self.sourcefiletype = None
             self.metadata = {}
+        self._cache: dict[Hashable, Any] = {}
+        self._cacheData: Optional[polars.DataFrame] = None
 
     @classmethod
     def init_test(cls, data: polars.DataFrame, sourcefilename: Path):
@@ -95,62 +167,106 @@ class DriveData:
         obj.metadata["DriveID"] = drive_id
         return obj
 
-    def loadData(self):
-        """Load data from the internal filename into the DriveData object based on the fire"""
+    def loadData(self, schema: Optional[pydre.schema.SchemaRegistry] = None):
+        """Load data from the internal filename into the DriveData object based on the fire
+
+        Args:
+            schema: project-wide column types used to parse the file; see `pydre.schema`
+        """
         if self.sourcefiletype == "old SimObserver":
-            self.__load_datfile()
+            self.__load_datfile(schema)
         elif self.sourcefiletype == "SimObserver r2":
-            self.__load_datfile()
+            self.__load_datfile(schema)
         elif self.sourcefiletype == "Scanner":
-            self.__load_scannerfile()
+            self.__load_scannerfile(schema)
 
-    def __load_datfile(self):
-        """Load a single .dat file (space delimited csv)"""
-        infer_len = 5000
+    def __infer_length(self, default: int) -> int:
+        infer_len = default
         try:
             if hasattr(self, "config") and isinstance(self.config, dict):
-                infer_len = int(self.config.get("infer_schema_length", 5000))
+                infer_len = int(self.config.get("infer_schema_length", default))
         except Exception as e:
             logger.warning(
-                f"Invalid infer_schema_length config ({e}), defaulting to 5000"
+                f"Invalid infer_schema_length config ({e}), defaulting to {default}"
             )
-            infer_len = 5000
+            infer_len = default
+        return infer_len
 
-        logger.info(
-            f"Using infer_schema_length={infer_len} for file {self.sourcefilename}"
+    def __read_delimited(
+        self,
+        separator: str,
+        null_values: str,
+        infer_len: int,
+        schema: Optional[pydre.schema.SchemaRegistry],
+    ) -> polars.DataFrame:
+        """Read a delimited file, using known column types from `schema` where possible."""
+        options = dict(
+            separator=separator, null_values=null_values, truncate_ragged_lines=True
         )
+        with decompressedFile(self.sourcefilename) as source:
+            return self.__read_source(source, options, infer_len, schema)
 
-        self.data = polars.read_csv(
-            self.sourcefilename,
-            separator=" ",
-            null_values=".",
-            truncate_ragged_lines=True,
-            infer_schema_length=infer_len,
-        )
+    def __read_source(
+        self,
+        source: Path,
+        options: dict[str, Any],
+        infer_len: int,
+        schema: Optional[pydre.schema.SchemaRegistry],
+    ) -> polars.DataFrame:
+        if schema is None:
+            logger.info(
+                f"Using infer_schema_length={infer_len} for file {self.sourcefilename}"
+            )
+            return polars.read_csv(source, infer_schema_length=infer_len, **options)
 
-    def __load_scannerfile(self):
-        """Load a single csv file containing data from the Scanners simulator"""
-        infer_len = 100000
+        header = polars.read_csv(
+            source, n_rows=0, infer_schema_length=0, **options
+        ).columns
+        overrides, complete = schema.overridesFor(header)
+        if complete:
+            logger.info(f"Using project schema for file {self.sourcefilename}")
+        else:
+            logger.info(
+                f"Using infer_schema_length={infer_len} for {len(header) - len(overrides)} "
+                f"new columns in file {self.sourcefilename}"
+            )
         try:
-            if hasattr(self, "config") and isinstance(self.config, dict):
-                infer_len = int(self.config.get("infer_schema_length", 100000))
-        except Exception as e:
+            data = polars.read_csv(
+                source,
+                schema_overrides=overrides,
+                infer_schema_length=0 if complete else infer_len,
+                **options,
+            )
+        except polars.exceptions.PolarsError as e:
             logger.warning(
-                f"Invalid infer_schema_length config ({e}), defaulting to 100000"
+                f"{self.sourcefilename} does not match the project schema ({e}), "
+                "inferring types"
             )
-            infer_len = 100000
+            data = polars.read_csv(source, infer_schema_length=infer_len, **options)
+        return schema.apply(data)
 
-        logger.info(
-            f"Using infer_schema_length={infer_len} for file {self.sourcefilename}"
-        )
+    def __load_datfile(self, schema: Optional[pydre.schema.SchemaRegistry] = None):
+        """Load a single .dat file (space delimited csv)"""
+        infer_len = self.__infer_length(5000)
+        self.data = self.__read_delimited(" ", ".", infer_len, schema)
 
-        self.data = polars.read_csv(
-            self.sourcefilename,
-            separator="\t",
-            null_values="null",
-            truncate_ragged_lines=True,
-            infer_schema_length=infer_len,
-        )
+    def __load_scannerfile(self, schema: Optional[pydre.schema.SchemaRegistry] = None):
+        """Load a single csv file containing data from the Scanners simulator"""
+        infer_len = self.__infer_length(100000)
+        self.data = self.__read_delimited("\t", "null", infer_len, schema)
+
+    def cachedResult(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Value derived from `data`, computed at most once for the current data frame.
+
+        Results are kept until `data` is replaced, for example by a filter, so metrics that
+        need the same derived table (see `pydre.segments.runTable`) compute it only once.
+        """
+        if getattr(self, "_cacheData", None) is not self.data:
+            self._cache = {}
+            self._cacheData = self.data
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
 
     def copyMetaData(self, other: DriveData):
         """Copy metadata from another DriveData object. This includes source filename, source filetype, roi, and metadata."""
@@ -200,6 +316,44 @@ class DriveData:
         return new_dd
 
 
+class DriveDataCache:
+    """Thread-safe, size-bounded cache of loaded DriveData objects.
+
+    Used by long-running processes (such as `pydre serve`) to avoid re-parsing files that
+    are processed by several jobs. Entries are keyed by a tuple describing the file and the
+    options it was loaded with, so a modified file is reloaded. Cached objects are never
+    handed out directly; `get` returns a new DriveData that shares the (immutable) polars
+    frame, so filters applied by one job do not affect another.
+    """
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, DriveData] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[DriveData]:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is None:
+                return None
+            self._entries.move_to_end(key)
+        return DriveData(cached, cached.data)
+
+    def put(self, key: tuple, drivedata: DriveData) -> None:
+        with self._lock:
+            self._entries[key] = DriveData(drivedata, drivedata.data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class ColumnsMatchError(Exception):
     """Exception when a filter or metric expects a certain column in DriveData but it is not present or an unexpected type"""
 
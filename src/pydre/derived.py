@@ -0,0 +1,99 @@
+"""Named columns derived from the drive data, computed once per DriveData object.
+
+Many metrics need the same derived quantities: the duration of each sample, the speed in
+miles per hour, the magnitude of the acceleration. Rather than each metric adding these
+to its own copy of the data, they are declared here once, with the columns they depend on:
+
+```
+@registerDerived("VelocityMPH", dependencies=["Velocity"])
+def velocityMPH() -> pl.Expr:
+    return pl.col("Velocity") * 2.23694
+```
+
+`derivedColumn(drivedata, name)` evaluates the column on first use and keeps it on the
+DriveData object (see `DriveData.cachedResult`), so every metric run on the same drive or
+region of interest shares one copy. The cached columns are dropped when a filter replaces
+the data, so they always reflect the current source columns.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable
+
+import polars as pl
+
+import pydre.core
+
+
+@dataclass(frozen=True)
+class DerivedColumn:
+    name: str
+    dependencies: tuple[str, ...]
+    expression: Callable[[], pl.Expr]
+
+
+derivedColumns: dict[str, DerivedColumn] = {}
+
+
+def registerDerived(name: str, dependencies: list[str]):
+    """Register a function returning the expression for the derived column `name`.
+
+    Parameters:
+        name: name of the derived column
+        dependencies: numeric data columns the expression reads
+    """
+
+    def registering_decorator(func: Callable[[], pl.Expr]) -> Callable[[], pl.Expr]:
+        derivedColumns[name] = DerivedColumn(name, tuple(dependencies), func)
+        return func
+
+    return registering_decorator
+
+
+def derivedColumn(drivedata: pydre.core.DriveData, name: str) -> pl.Series:
+    """Derived column `name` for the current data of `drivedata`.
+
+    Raises:
+        KeyError: if no derived column of that name is registered
+        ColumnsMatchError: if a column it depends on is missing or not numeric
+    """
+    column = derivedColumns[name]
+    drivedata.checkColumnsNumeric(list(column.dependencies))
+    return drivedata.cachedResult(
+        ("derived", name),
+        lambda: drivedata.data.select(column.expression().alias(name)).to_series(),
+    )
+
+
+def withDerived(drivedata: pydre.core.DriveData, *names: str) -> pl.DataFrame:
+    """Data of `drivedata` with the derived columns `names` added.
+
+    The derived columns are shared with other metrics rather than recomputed, so this is
+    cheap to call before filtering rows on a derived quantity.
+    """
+    return drivedata.data.with_columns(derivedColumn(drivedata, name) for name in names)
+
+
+@registerDerived("dt", dependencies=["SimTime"])
+def sampleDuration() -> pl.Expr:
+    """Time since the previous sample, in seconds; time going backwards counts as 0."""
+    return pl.col("SimTime").diff().clip(lower_bound=0)
+
+
+@registerDerived("VelocityMPH", dependencies=["Velocity"])
+def velocityMPH() -> pl.Expr:
+    """Velocity (meters per second) in miles per hour."""
+    return pl.col("Velocity") * 2.23694
+
+
+@registerDerived("TotalAccel", dependencies=["LonAccel", "LatAccel"])
+def totalAcceleration() -> pl.Expr:
+    """Magnitude of the combined longitudinal and lateral acceleration."""
+    return (pl.col("LonAccel") ** 2 + pl.col("LatAccel") ** 2).sqrt()
+
+
+@registerDerived("gaze_angle", dependencies=["GAZE_HEADING", "GAZE_PITCH"])
+def gazeAngle() -> pl.Expr:
+    """Angle between the gaze direction and straight ahead, in radians."""
+    return (pl.col("GAZE_HEADING") ** 2 + pl.col("GAZE_PITCH") ** 2).sqrt()
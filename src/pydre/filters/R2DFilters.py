@@ -6,6 +6,7 @@ from loguru import logger
 
 import pydre.core
 from pydre.filters import registerFilter
+from pydre.reference import lookupReference
 
 THISDIR = pathlib.Path(__file__).resolve().parent
 
@@ -58,11 +59,7 @@ def ValidateDataStartEnd(
     df = drivedata.data
 
     if dataFile != "":
-        merge_df = pl.read_csv(source=dataFile)
-        merge_df = merge_df.filter(
-            merge_df.get_column("Scenario") == scenario,
-            merge_df.get_column("Week") == week,
-        )
+        merge_df = lookupReference(dataFile, Scenario=scenario, Week=week)
     else:
         raise Exception(
             "Datafile start/end definition not present - cannot merge w/o source of truth."
@@ -221,11 +218,7 @@ def MergeCriticalEventPositions(
     if "No Event" not in scenario:
         # adding cols with meaningless values for later CE info, ensuring shape
         if dataFile != "":
-            merge_df = pl.read_csv(source=dataFile)
-            merge_df = merge_df.filter(
-                merge_df.get_column("ScenarioName") == scenario,
-                merge_df.get_column("Week") == week,
-            )
+            merge_df = lookupReference(dataFile, ScenarioName=scenario, Week=week)
         else:
             raise Exception("Datafile not present - cannot merge w/o source of truth.")
 
@@ -333,11 +326,7 @@ def DesignateNonEventRegions(drivedata: pydre.core.DriveData, dataFile=""):
         pl.lit(-1).alias("NonEventRegion"),
     )
     if dataFile != "":
-        merge_df = pl.read_csv(source=dataFile)
-        merge_df = merge_df.filter(
-            merge_df.get_column("Scenario") == scenario,
-            merge_df.get_column("Week") == week,
-        )
+        merge_df = lookupReference(dataFile, Scenario=scenario, Week=week)
         filter_df = df.clear()
     else:
         raise Exception("Datafile not present - cannot merge w/o source of truth.")
@@ -4,10 +4,47 @@ from typing import Optional, Callable, Concatenate
 __all__ = ["common", "eyetracking", "gazeangle"]
 
 import pydre.core
+from pydre.registry import LazyRegistry, buildManifest
+
+# Static map of built-in filter names to the module that registers them. Modules are only
+# imported when a project refers to one of their filters. Keep this in sync when adding
+# filters to the package (tests/test_registry.py checks it).
+filtersManifest: dict[str, str] = buildManifest(
+    {
+        "pydre.filters.common": [
+            "numberBinaryBlocks",
+            "Jenks",
+            "SimTimeFromDatTime",
+            "FixLinearLandRoadOffset",
+            "FixReversedRoadLinearLand",
+            "setinrange",
+            "relativeBoxPos",
+            "zscoreCol",
+            "speedLimitTransitionMarker",
+            "writeToCSV",
+            "removeDataOutside",
+            "removeDataInside",
+            "separateData",
+            "filterValuesBelow",
+            "trimPreAndPostDrive",
+            "nullifyOutlier",
+        ],
+        "pydre.filters.eyetracking": ["smoothGazeData"],
+        "pydre.filters.gazeangle": ["gazeAnglePreProcessing"],
+        "pydre.filters.R2DFilters": [
+            "modifyCriticalEventsCol",
+            "ValidateDataStartEnd",
+            "BinaryColReverse",
+            "CropStartPosition",
+            "MergeCriticalEventPositions",
+            "DesignateNonEventRegions",
+        ],
+    }
+)
 
 filtersList: dict[
     str, Callable[Concatenate[pydre.core.DriveData, ...], pydre.core.DriveData]
-] = {}
+] = LazyRegistry(filtersManifest)
 
 
 def registerFilter(filtername: Optional[str] = None) -> Callable:
@@ -17,6 +54,9 @@ def registerFilter(filtername: Optional[str] = None) -> Callable:
         name = filtername
         if not name:
             name = func.__name__
+        if filtersList.isBuiltin(name, func) and filtersList.hasCustom(name):
+            logger.debug(f"Keeping custom filter {name} over the built-in one")
+            return func
         # register function
         filtersList[name] = func
         return func
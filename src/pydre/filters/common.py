@@ -1,12 +1,15 @@
 import datetime
 import struct
+import threading
+from collections import OrderedDict
 from loguru import logger
 from pathlib import Path
+import numpy as np
 import polars as pl
 import pydre.core
+import pydre.segments
 from typing import Optional
 from . import registerFilter
-import jenkspy
 
 
 @registerFilter()
@@ -37,9 +40,16 @@ def numberBinaryBlocks(
     required_col = [binary_column]
     drivedata.checkColumns(required_col)
 
+    # missing values belong to the surrounding block, so they do not start new blocks
+    # and the odd/even numbering of on and off blocks is kept
+    value = pl.col(binary_column)
+    filled = value.fill_null(strategy="forward").fill_null(strategy="backward")
+    # blocks are numbered from 1 if the data starts with a nonzero block
+    starts_on = (value.drop_nulls().first() != 0).fill_null(False).cast(pl.UInt32)
     new_dd = drivedata.data.with_columns(
-        (pl.col(binary_column).shift(fill_value=0) != pl.col(binary_column))
-        .cum_sum()
+        pl.when(value.is_null())
+        .then(None)
+        .otherwise(pydre.segments.runId(filled) + starts_on)
         .alias(new_column)
     )
 
@@ -71,17 +81,84 @@ def numberBinaryBlocks(
     return drivedata
 
 
+def _twoClassBreak(values: np.ndarray, weights: np.ndarray, upper: np.ndarray) -> float:
+    """Optimal two-class break of sorted `values` with the given weights.
+
+    The split minimizing the within-class sum of squared deviations is found with prefix
+    sums, in a single pass. Returns the upper bound of the lower class, `upper[i]` for the
+    best split after position `i`.
+    """
+    w = np.cumsum(weights)
+    s1 = np.cumsum(weights * values)
+    s2 = np.cumsum(weights * values * values)
+    total_w, total_s1, total_s2 = w[-1], s1[-1], s2[-1]
+    # the upper class must not be empty
+    w, s1, s2 = w[:-1], s1[:-1], s2[:-1]
+    high_w = total_w - w
+    ssw = (s2 - s1 * s1 / w) + ((total_s2 - s2) - (total_s1 - s1) ** 2 / high_w)
+    return float(upper[int(np.argmin(ssw))])
+
+
+def _jenksBreak(values: np.ndarray, exact: bool = True, bins: int = 1000) -> float:
+    """Jenks natural break between two classes of `values`.
+
+    Parameters:
+        values: data values; NaN values are ignored
+        exact: compute the break from the sorted unique values, weighted by their counts.
+            Otherwise, values are first grouped into a histogram of `bins` bins and the
+            break is placed on a bin edge, at most one bin width from the exact break.
+        bins: number of histogram bins when `exact` is False
+
+    Returns:
+        upper bound of the lower class
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        raise ValueError("No values to classify")
+    if exact:
+        unique, counts = np.unique(values, return_counts=True)
+        if unique.size < 2:
+            return float(unique[0])
+        return _twoClassBreak(unique, counts.astype(np.float64), unique)
+    counts, edges = np.histogram(values, bins=bins)
+    sums, _ = np.histogram(values, bins=edges, weights=values)
+    occupied = counts > 0
+    if occupied.sum() < 2:
+        return float(values.max())
+    counts = counts[occupied].astype(np.float64)
+    means = sums[occupied] / counts
+    return _twoClassBreak(means, counts, edges[1:][occupied])
+
+
+# Jenks breaks already computed, keyed by participant, source file, column and settings
+_jenksCache: OrderedDict[tuple, float] = OrderedDict()
+_jenksCacheLock = threading.Lock()
+_JENKS_CACHE_SIZE = 256
+
+
 @registerFilter()
 def Jenks(
-    drivedata: pydre.core.DriveData, oldCol: str, newCol: str
+    drivedata: pydre.core.DriveData,
+    oldCol: str,
+    newCol: str,
+    exact: bool = True,
+    bins: int = 1000,
 ) -> pydre.core.DriveData:
     """
     Classifies the given column using Jenks natural breaks and outputs a binary column.
 
+    Breaks are remembered per participant and data file, so the filter costs only a hash
+    of the column when the same drive is classified again (for example by a long-running
+    `pydre serve` worker).
+
     Parameters:
         drivedata: The DriveData object containing the data.
         oldCol: The name of the column to classify (should be 'headPitch').
         newCol: The name of the new binary column to be created (e.g., 'hpBinary').
+        exact: Compute the exact break. If false, the break is computed from a histogram
+            of the column, which bounds the cost for very long drives.
+        bins: Number of histogram bins used when `exact` is false.
 
     Returns:
         Updated DriveData object with the new binary column.
@@ -90,15 +167,32 @@ def Jenks(
     required_col = [oldCol]
     drivedata.checkColumns(required_col)
 
-    # Extract the data from the specified column
-    head_pitch_values = drivedata.data[oldCol].to_list()
-
-    # Determine Jenks breaks
-    breaks = jenkspy.jenks_breaks(head_pitch_values, n_classes=2)
+    column = drivedata.data.get_column(oldCol)
+    key = (
+        drivedata.metadata.get("ParticipantID"),
+        str(drivedata.sourcefilename),
+        oldCol,
+        exact,
+        bins,
+        column.len(),
+        column.hash().sum(),
+    )
+    with _jenksCacheLock:
+        brk = _jenksCache.get(key)
+        if brk is not None:
+            _jenksCache.move_to_end(key)
+    if brk is None:
+        brk = _jenksBreak(
+            column.drop_nulls().cast(pl.Float64).to_numpy(), exact=exact, bins=bins
+        )
+        with _jenksCacheLock:
+            _jenksCache[key] = brk
+            if len(_jenksCache) > _JENKS_CACHE_SIZE:
+                _jenksCache.popitem(last=False)
 
     # Assign binary values based on the breaks
     new_data = drivedata.data.with_columns(
-        pl.when(pl.col(oldCol) <= breaks[1]).then(0).otherwise(1).alias(newCol)
+        pl.when(pl.col(oldCol) <= brk).then(0).otherwise(1).alias(newCol)
     )
 
     drivedata.data = new_data
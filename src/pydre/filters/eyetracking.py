@@ -2,6 +2,7 @@ import polars as pl
 from loguru import logger
 
 import pydre.core
+import pydre.segments
 from pydre.filters import registerFilter
 
 # The following functions need to be revised to work with polars rather than pandas
@@ -151,9 +152,6 @@ def smoothGazeData(
     required_col = [timeColName, gazeColName]
     drivedata.checkColumns(required_col)
 
-    # adjust for 100ms latency
-    dt = drivedata.data.with_columns(pl.col(gazeColName).shift(-6))
-
     mapping = {
         "None": 0,
         "WindScreen": 1,
@@ -165,49 +163,32 @@ def smoothGazeData(
         "RearViewMirror": 0,
         "PassSideMirror": 0,
     }
-    dt = dt.with_columns(
+    # adjust for 100ms latency
+    onroad = (
         pl.col(gazeColName)
+        .shift(-latencyShift)
         .replace(mapping, default=0, return_dtype=pl.Float32)
-        .alias("onroad")
     )
-
-    if dt.get_column("onroad").n_unique() < 2:
+    if drivedata.data.select(onroad.n_unique()).item() < 2:
         logger.error("Gaze data not of sufficient variety. Skipping filtering.")
         return drivedata
 
     # smooth frame blips
-    dt = dt.with_columns(
-        pl.col("onroad").rolling_median(window_size=5, center=True).alias("onroad")
-    )
-
-    # find list of runs
-    dt = dt.with_columns(
-        (pl.col("onroad").shift() != pl.col("onroad")).cum_sum().alias("gazenum")
-    )
-
-    durations = dt.group_by("gazenum").agg(
-        glance_duration=pl.col(timeColName).max() - pl.col(timeColName).min()
+    dt = drivedata.data.with_columns(
+        pl.col(gazeColName).shift(-latencyShift),
+        onroad.rolling_median(window_size=5, center=True).alias("onroad"),
     )
 
     # SAE J2396 defines fixations as at least 0.2 seconds,
     # so we ignore changes in gaze that are less than that
-    sub200msGazes = durations.filter(pl.col("glance_duration") < 0.2).get_column(
-        "gazenum"
-    )
-
     dt = dt.with_columns(
-        pl.when(pl.col("gazenum").is_in(sub200msGazes))
-        .then(None)
-        .otherwise(pl.col("onroad"))
+        pydre.segments.dropShortRuns(pl.col("onroad"), pl.col(timeColName), 0.2)
+        .fill_null(strategy="backward")
         .alias("onroad")
     )
 
-    dt = dt.with_columns(pl.col("onroad").fill_null(strategy="backward"))
-
     # find list of runs with short fixations removed
-    dt = dt.with_columns(
-        (pl.col("onroad").shift() != pl.col("onroad")).cum_sum().alias("gazenum")
-    )
+    dt = dt.with_columns(pydre.segments.runId(pl.col("onroad")).alias("gazenum"))
 
     drivedata.data = dt
 
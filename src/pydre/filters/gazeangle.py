@@ -1,6 +1,7 @@
 import math
 import polars as pl
 import pydre.core
+import pydre.derived
 from pydre.filters import registerFilter
 
 
@@ -49,11 +50,11 @@ def gazeAnglePreProcessing(
     df = drivedata.data
 
     # Compute gaze angle magnitude (radians)
-    df = df.with_columns(
-        ((pl.col(headingColName) ** 2 + pl.col(pitchColName) ** 2).sqrt()).alias(
-            "gaze_angle"
-        )
-    )
+    if (headingColName, pitchColName) == ("GAZE_HEADING", "GAZE_PITCH"):
+        gaze_angle = pydre.derived.derivedColumn(drivedata, "gaze_angle")
+    else:
+        gaze_angle = (pl.col(headingColName) ** 2 + pl.col(pitchColName) ** 2).sqrt()
+    df = df.with_columns(gaze_angle.alias("gaze_angle"))
 
     # Convert threshold from degrees to radians
     half_angle_rad = math.radians(half_angle_deg)
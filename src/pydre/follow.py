@@ -0,0 +1,343 @@
+"""Process a data file while it is still being recorded.
+
+During a simulator session SimObserver appends rows to the drive's `.dat` file. A
+`DatTailer` reads only the bytes appended since its last read and parses the complete
+lines among them into a data frame; an incomplete last line is kept until the rest of it
+has been written. `FollowSession` pushes each batch of new rows through a project's
+filters and ROIs and updates the incremental version of each metric (see
+`pydre.metrics.incremental`), so the cost of an update depends on the number of new rows
+rather than the length of the drive. Memory use is bounded by the size of one batch and
+the metric states.
+
+Filters are applied to each batch separately. Filters that only look at a single row at a
+time give the same result as for the complete file, while filters using neighbouring rows
+(smoothing, for example) may differ at the batch boundaries. Metrics without an
+incremental version are reported as missing.
+"""
+
+from __future__ import annotations
+
+import io
+import time
+from os import PathLike
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+import polars as pl
+from loguru import logger
+
+import pydre.core
+import pydre.index
+import pydre.metrics
+import pydre.plan
+import pydre.project
+import pydre.schema
+
+
+class DatTailer:
+    """Reads the rows appended to a growing delimited data file.
+
+    Parameters:
+        path: data file
+        separator: column separator
+        null_values: marker for missing values
+        dtypes: known column dtypes, for example from the project schema. Other numeric
+            columns are read as Float64, so integer-looking columns that later contain
+            decimals are read consistently. The type of other columns is taken from the
+            first rows that have a value; until then they are read as missing Float64
+            values.
+        max_bytes: maximum number of bytes read at once
+    """
+
+    def __init__(
+        self,
+        path: PathLike,
+        separator: str = " ",
+        null_values: str = ".",
+        dtypes: Optional[dict[str, pl.DataType]] = None,
+        max_bytes: int = 4 * 1024 * 1024,
+    ):
+        self.path = Path(path)
+        self.separator = separator
+        self.null_values = null_values
+        self.known_dtypes = dict(dtypes or {})
+        self.max_bytes = max_bytes
+        self.offset = 0
+        self.columns: Optional[list[str]] = None
+        self.dtypes: Optional[dict[str, pl.DataType]] = None
+        # columns that had no value yet, whose entry in `dtypes` is provisional
+        self.untyped: set[str] = set()
+        self._pending = b""
+
+    def read(self) -> Optional[pl.DataFrame]:
+        """Complete rows appended since the last call, or None if there are none."""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return None
+        if size < self.offset:
+            logger.warning(f"{self.path} was truncated, reading it from the start")
+            self.offset = 0
+            self.columns = None
+            self.dtypes = None
+            self.untyped = set()
+            self._pending = b""
+        if size == self.offset:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(self.max_bytes)
+        self.offset += len(data)
+
+        buffer = self._pending + data
+        end = buffer.rfind(b"\n") + 1
+        self._pending = buffer[end:]
+        lines = buffer[:end]
+        if self.columns is None:
+            header, _, lines = lines.partition(b"\n")
+            if not header and not lines:
+                return None
+            self.columns = (
+                header.decode("utf-8", errors="replace")
+                .rstrip("\r")
+                .split(self.separator)
+            )
+        if not lines.strip():
+            return None
+        return self._parse(lines)
+
+    def batches(self) -> Iterator[pl.DataFrame]:
+        """All complete rows currently in the file, one batch at a time."""
+        while True:
+            before = self.offset
+            batch = self.read()
+            if batch is not None:
+                yield batch
+            elif self.offset == before:
+                return
+
+    def _parse(self, lines: bytes) -> pl.DataFrame:
+        options = dict(
+            separator=self.separator,
+            null_values=self.null_values,
+            has_header=False,
+            new_columns=self.columns,
+            truncate_ragged_lines=True,
+        )
+        if self.dtypes is None:
+            batch = pl.read_csv(
+                io.BytesIO(lines),
+                schema_overrides=self.known_dtypes,
+                infer_schema_length=None,
+                **options,
+            )
+            self.dtypes = {
+                name: (
+                    pl.Float64
+                    if dtype.is_integer() and name not in self.known_dtypes
+                    else dtype
+                )
+                for name, dtype in batch.schema.items()
+            }
+            # a column without values (no lead vehicle yet, for example) is read as text
+            # until its first value shows its type
+            self.untyped = {
+                name
+                for name in batch.columns
+                if name not in self.known_dtypes
+                and batch.get_column(name).null_count() == batch.height
+            }
+            for name in self.untyped:
+                self.dtypes[name] = pl.String
+            return self._typeColumns(batch)
+        try:
+            batch = pl.read_csv(io.BytesIO(lines), schema=self.dtypes, **options)
+        except pl.exceptions.PolarsError as e:
+            logger.warning(
+                f"New rows of {self.path} do not match the earlier column types ({e})"
+            )
+            batch = pl.read_csv(io.BytesIO(lines), infer_schema_length=None, **options)
+            batch = batch.cast(self.dtypes, strict=False)
+        return self._typeColumns(batch)
+
+    def _typeColumns(self, batch: pl.DataFrame) -> pl.DataFrame:
+        """`batch` with the columns cast to their types, fixing the types of untyped columns
+        that have values in this batch."""
+        for name in list(self.untyped):
+            values = batch.get_column(name)
+            if values.null_count() == batch.height:
+                continue
+            numeric = values.cast(pl.Float64, strict=False)
+            numeric_values = numeric.null_count() == values.null_count()
+            self.dtypes[name] = pl.Float64 if numeric_values else pl.String
+            self.untyped.discard(name)
+        return batch.cast(
+            {
+                name: pl.Float64 if name in self.untyped else self.dtypes[name]
+                for name in batch.columns
+            }
+        )
+
+
+class FollowSession:
+    """Incremental evaluation of a project's metrics on one growing data file.
+
+    Parameters:
+        project: project whose filters, ROIs and metrics are applied
+        datafile: data file being recorded
+        timecol: simulator time column, used to decide when to report results
+        interval: report results every `interval` seconds of simulator time
+        on_update: called with the current results (one row per ROI, as in the project
+            output) each time they are reported
+    """
+
+    def __init__(
+        self,
+        project: pydre.project.Project,
+        datafile: PathLike,
+        timecol: str = "SimTime",
+        interval: float = 1.0,
+        on_update: Optional[Callable[[pl.DataFrame], Any]] = None,
+    ):
+        self.project = project
+        self.plan = project.compilePlan()
+        self.timecol = timecol
+        self.interval = interval
+        self.on_update = on_update
+
+        datafile_type = project.config.get("datafile_type", "rti")
+        separator, null_values = pydre.index.FILE_FORMATS.get(
+            datafile_type, pydre.index.FILE_FORMATS["rti"]
+        )
+        dtypes = dict(project.schema.dtypes) if project.schema is not None else {}
+        dtypes.update(project.normalized_dtypes)
+        self.tailer = DatTailer(datafile, separator, null_values, dtypes)
+        self.drivedata = pydre.index.initDriveData(Path(datafile), datafile_type)
+        self.drivedata.config = project.config
+
+        self.metrics: dict[str, Optional[Any]] = {}
+        for step in self.plan.metrics:
+            cls = pydre.metrics.metricsIncremental.get(step.function_name)
+            if cls is None or step.multi_column:
+                logger.warning(
+                    f"Metric {step.name} ({step.function_name}) has no incremental "
+                    "version and will not be reported"
+                )
+                self.metrics[step.name] = None
+            else:
+                self.metrics[step.name] = cls(**step.kwargs)
+        # metric states for each ROI, in the order the ROIs were first seen
+        self.states: dict[Optional[str], dict[str, Any]] = {}
+        self.last_report: Optional[float] = None
+        self.rows = 0
+
+    def update(self) -> Optional[pl.DataFrame]:
+        """Process the rows appended since the last update.
+
+        Returns:
+            the current results if they were reported, otherwise None
+        """
+        reported = None
+        for batch in self.tailer.batches():
+            self.rows += batch.height
+            batch = pydre.schema.normalizeDtypes(batch, self.project.normalized_dtypes)
+            for roi_data in self._split(self._filter(batch)):
+                states = self.states.setdefault(roi_data.roi, self._initStates())
+                for name, metric in self.metrics.items():
+                    if metric is not None:
+                        states[name] = metric.update(states[name], roi_data.data)
+            if self._due(batch):
+                reported = self.report()
+        return reported
+
+    def results(self) -> pl.DataFrame:
+        """Current value of each metric, one row per ROI."""
+        metric_columns = self.plan.metric_columns
+        rois = list(self.states) or [None]
+        columns: dict[str, list] = {
+            key: [value] * len(rois) for key, value in self.drivedata.metadata.items()
+        }
+        columns["ROI"] = rois
+        for column in metric_columns:
+            metric = self.metrics.get(column)
+            columns[column] = [
+                metric.finalize(self.states[roi][column])
+                if metric is not None and roi in self.states
+                else None
+                for roi in rois
+            ]
+        return pydre.plan.buildResultFrame(columns, self.plan.result_schema)
+
+    def report(self) -> pl.DataFrame:
+        results = self.results()
+        if self.on_update is not None:
+            self.on_update(results)
+        return results
+
+    def follow(
+        self, poll: float = 0.5, idle_timeout: Optional[float] = None
+    ) -> pl.DataFrame:
+        """Keep processing new rows until the file has not grown for `idle_timeout` seconds.
+
+        With no `idle_timeout`, follow until interrupted (Ctrl+C).
+
+        Returns:
+            the final results
+        """
+        last_growth = time.monotonic()
+        try:
+            while True:
+                before = self.tailer.offset
+                self.update()
+                if self.tailer.offset != before:
+                    last_growth = time.monotonic()
+                elif (
+                    idle_timeout is not None
+                    and time.monotonic() - last_growth >= idle_timeout
+                ):
+                    break
+                time.sleep(poll)
+        except KeyboardInterrupt:
+            logger.info("Stopped following")
+        return self.report()
+
+    def _initStates(self) -> dict[str, Any]:
+        return {
+            name: metric.init()
+            for name, metric in self.metrics.items()
+            if metric is not None
+        }
+
+    def _filter(self, batch: pl.DataFrame) -> pydre.core.DriveData:
+        drivedata = pydre.core.DriveData(self.drivedata, batch)
+        drivedata.config = self.project.config
+        for filter_step in self.plan.filters:
+            drivedata = filter_step.run(drivedata)
+        return drivedata
+
+    def _split(self, drivedata: pydre.core.DriveData) -> list[pydre.core.DriveData]:
+        if len(self.plan.rois) == 0:
+            return [drivedata]
+        # most batches lie outside most ROIs, which is not worth a warning each time
+        logger.disable("pydre.rois")
+        try:
+            return [
+                roi_data
+                for roi_step in self.plan.rois
+                for roi_data in roi_step.split(drivedata)
+                if roi_data.data.height > 0
+            ]
+        finally:
+            logger.enable("pydre.rois")
+
+    def _due(self, batch: pl.DataFrame) -> bool:
+        """Whether `interval` seconds of simulator time have passed since the last report."""
+        if self.timecol not in batch.columns:
+            return True
+        now = batch.get_column(self.timecol).max()
+        if now is None:
+            return False
+        if self.last_report is None or now - self.last_report >= self.interval:
+            self.last_report = now
+            return True
+        return False
@@ -0,0 +1,181 @@
+"""Fast header-only scanning of a project's data files.
+
+Fully parsing a data file only to find out that it lacks a column the project needs is
+expensive. `scanFile` reads only the header line of a file (decompressing just the start
+of compressed files) and the metadata encoded in its name. A `FileIndex` keeps these
+results for a project, so files missing required columns can be skipped, and files
+missing columns referenced by ROIs or metrics can be reported, before any data is parsed.
+"""
+
+from __future__ import annotations
+
+import gzip
+import threading
+from dataclasses import dataclass, field
+from os import PathLike
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional
+
+import polars as pl
+from loguru import logger
+
+import pydre.core
+import pydre.plan
+
+# separator and null marker for each datafile_type
+FILE_FORMATS = {
+    "rti": (" ", "."),
+    "oldrti": (" ", "."),
+    "scanner": ("\t", "null"),
+}
+
+# metric and filter arguments whose string values name a data column
+COLUMN_ARGUMENTS = {
+    "var",
+    "var1",
+    "var2",
+    "col",
+    "column",
+    "timecol",
+    "lane_column",
+    "speedLimitCol",
+}
+
+
+@dataclass(frozen=True)
+class FileInfo:
+    """Header and filename metadata for one data file."""
+
+    path: Path
+    size: int
+    mtime_ns: int
+    compression: Optional[str]
+    columns: tuple[str, ...]
+    metadata: Mapping[str, Any] = field(default_factory=dict)
+
+    def missingColumns(self, required: Iterable[str]) -> list[str]:
+        return [c for c in required if c not in self.columns]
+
+
+def initDriveData(path: Path, datafile_type: str) -> pydre.core.DriveData:
+    """Create an (unloaded) DriveData object for `path` according to `datafile_type`."""
+    if datafile_type == "oldrti":
+        return pydre.core.DriveData.init_old_rti(path)
+    elif datafile_type == "scanner":
+        return pydre.core.DriveData.init_scanner(path)
+    return pydre.core.DriveData.init_rti(path)
+
+
+def readHeader(
+    path: Path, separator: str, compression: Optional[str] = None
+) -> list[str]:
+    """Read the column names from the first line of a data file."""
+    if compression == "gzip":
+        with gzip.open(path, "rb") as f:
+            line = f.readline()
+    elif compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            return pl.read_csv(
+                path, separator=separator, n_rows=0, infer_schema_length=0
+            ).columns
+        with open(path, "rb") as raw:
+            reader = zstandard.ZstdDecompressor().stream_reader(raw)
+            line = b""
+            while b"\n" not in line:
+                chunk = reader.read(8192)
+                if not chunk:
+                    break
+                line += chunk
+            line = line.split(b"\n", 1)[0]
+    else:
+        with open(path, "rb") as f:
+            line = f.readline()
+    return line.decode("utf-8", errors="replace").rstrip("\r\n").split(separator)
+
+
+def scanFile(path: PathLike, datafile_type: str = "rti") -> FileInfo:
+    """Read the header and filename metadata of one data file without parsing its data."""
+    path = Path(path)
+    stat = path.stat()
+    separator, _ = FILE_FORMATS.get(datafile_type, FILE_FORMATS["rti"])
+    compression = pydre.core.detectCompression(path)
+    columns = readHeader(path, separator, compression)
+    metadata = initDriveData(path, datafile_type).metadata
+    return FileInfo(
+        path, stat.st_size, stat.st_mtime_ns, compression, tuple(columns), metadata
+    )
+
+
+def referencedColumns(plan: pydre.plan.ProjectPlan) -> dict[str, list[str]]:
+    """Columns that the ROIs and metrics of a plan refer to, mapped to the steps using them.
+
+    Filters may create columns, so a file lacking one of these columns is not necessarily
+    incompatible; these are reported rather than enforced.
+    """
+    referenced: dict[str, list[str]] = {}
+
+    def add(column: Any, step: str) -> None:
+        if isinstance(column, str):
+            referenced.setdefault(column, []).append(step)
+
+    for roi in plan.rois:
+        processor = roi.processor
+        if processor is None:
+            continue
+        for attribute in ("timecol", "roi_column", "x_column_name", "y_column_name"):
+            add(getattr(processor, attribute, None), f"ROI {roi.name}")
+    for metric in plan.metrics:
+        for argument, value in metric.kwargs.items():
+            if argument in COLUMN_ARGUMENTS:
+                add(value, f"metric {metric.name}")
+    return referenced
+
+
+class FileIndex:
+    """Cache of `FileInfo` for the data files of a project.
+
+    Entries are refreshed when a file's size or modification time changes.
+    """
+
+    def __init__(self, datafile_type: str = "rti"):
+        self.datafile_type = datafile_type
+        self._entries: dict[Path, FileInfo] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: PathLike) -> FileInfo:
+        path = Path(path)
+        stat = path.stat()
+        with self._lock:
+            info = self._entries.get(path)
+        unchanged = info is not None and (info.size, info.mtime_ns) == (
+            stat.st_size,
+            stat.st_mtime_ns,
+        )
+        if not unchanged:
+            info = scanFile(path, self.datafile_type)
+            with self._lock:
+                self._entries[path] = info
+        return info
+
+    def add(self, info: FileInfo) -> None:
+        """Record an entry scanned elsewhere, e.g. loaded from a `pydre.catalog.Catalog`."""
+        with self._lock:
+            self._entries[info.path] = info
+
+    def scan(self, paths: Iterable[PathLike]) -> list[FileInfo]:
+        """Scan every file, skipping (and logging) files that cannot be read."""
+        infos = []
+        for path in paths:
+            try:
+                infos.append(self.get(path))
+            except OSError as e:
+                logger.error(f"Could not read header of {path}: {e}")
+        return infos
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, path: object) -> bool:
+        return Path(path) in self._entries if isinstance(path, (str, Path)) else False
@@ -0,0 +1,216 @@
+"""Merge the data files of interrupted drives into one data file per drive.
+
+When a drive is interrupted (for example because SimCreator shut down), SimObserver writes
+one data file per restart, each with its own drive number and with `SimTime` starting from
+zero again. The functions here join these fragments back together:
+
+* a **sequential** merge appends each fragment after the previous one, shifting the
+  fragment's `SimTime` column so that its first row follows the last `SimTime` written so
+  far by one sample interval;
+* a **spatial** merge additionally drops the start of each fragment up to the row whose
+  `XPos`/`YPos` position is nearest to the last position written so far, so road that was
+  driven again after the restart is not duplicated.
+
+Fragments are read one at a time and appended to the merged file as they are processed,
+so only one fragment is held in memory at once.
+"""
+
+from __future__ import annotations
+
+from os import PathLike
+from pathlib import Path
+from typing import Iterable, Optional
+
+import polars as pl
+from loguru import logger
+
+import pydre.core
+import pydre.index
+import pydre.schema
+
+MERGE_TYPES = ("sequential", "spatial")
+
+# metadata that numbers the fragments of one drive, for each datafile_type
+ORDER_KEYS = {
+    "rti": "UniqueID",
+    "oldrti": "DriveID",
+    "scanner": "DriveID",
+}
+
+
+def groupFragments(
+    paths: Iterable[PathLike], datafile_type: str = "oldrti"
+) -> dict[tuple, list[Path]]:
+    """Group data files into the fragments of each drive.
+
+    Files whose filename metadata is identical apart from the drive number belong to the
+    same drive. Each group is ordered by drive number. Files whose names do not match
+    the `datafile_type` naming scheme are skipped.
+
+    Returns:
+        filename metadata (without the drive number) as sorted key/value pairs -> fragments
+    """
+    order_key = ORDER_KEYS.get(datafile_type, "UniqueID")
+    numbered: dict[tuple, list[tuple[int, Path]]] = {}
+    for path in paths:
+        path = Path(path)
+        metadata = pydre.index.initDriveData(path, datafile_type).metadata
+        if order_key not in metadata:
+            logger.warning(f"Skipping {path.name}: no {order_key} in file name")
+            continue
+        key = tuple(sorted((k, v) for k, v in metadata.items() if k != order_key))
+        numbered.setdefault(key, []).append((int(metadata[order_key]), path))
+    return {key: [path for _, path in sorted(files)] for key, files in numbered.items()}
+
+
+def _startIndex(fragment: pl.DataFrame, position: tuple[float, float]) -> int:
+    """Row of `fragment` whose XPos/YPos is nearest to `position`."""
+    from scipy.spatial import cKDTree
+
+    with_index = fragment.with_row_index("__row").drop_nulls(["XPos", "YPos"])
+    if with_index.height == 0:
+        return 0
+    points = with_index.select(
+        pl.col("XPos").cast(pl.Float64), pl.col("YPos").cast(pl.Float64)
+    ).to_numpy()
+    _, nearest = cKDTree(points).query(position)
+    return int(with_index["__row"][int(nearest)])
+
+
+def _sampleInterval(times: pl.Series) -> Optional[float]:
+    """Typical time between consecutive samples, or None with fewer than two samples."""
+    steps = times.drop_nulls().diff().drop_nulls()
+    steps = steps.filter(steps > 0)
+    if len(steps) == 0:
+        return None
+    return float(steps.median())
+
+
+def mergeDrive(
+    fragments: list[PathLike],
+    outputfile: PathLike,
+    merge_type: str = "sequential",
+    datafile_type: str = "oldrti",
+) -> int:
+    """Merge the fragments of one drive, in order, into `outputfile`.
+
+    The merged file uses the same format as the fragments and has the columns of the
+    first fragment; columns missing from a later fragment are left empty.
+
+    Parameters:
+        fragments: data files of the drive, in drive order
+        outputfile: merged data file to write
+        merge_type: "sequential" or "spatial"
+        datafile_type: rti, oldrti or scanner
+
+    Returns:
+        number of rows written
+    """
+    merge_type = merge_type.lower()
+    if merge_type not in MERGE_TYPES:
+        raise ValueError(
+            f"Unknown merge type '{merge_type}', expected one of {', '.join(MERGE_TYPES)}"
+        )
+    required = ["SimTime", "XPos", "YPos"] if merge_type == "spatial" else ["SimTime"]
+    separator, null_value = pydre.index.FILE_FORMATS.get(
+        datafile_type, pydre.index.FILE_FORMATS["rti"]
+    )
+    # fragments of one drive share column types even when a column is empty in one of them
+    schema = pydre.schema.SchemaRegistry()
+
+    columns: Optional[list[str]] = None
+    last_time = 0.0
+    last_interval: Optional[float] = None
+    last_position: Optional[tuple[float, float]] = None
+    rows = 0
+    outputfile = Path(outputfile)
+    outputfile.parent.mkdir(parents=True, exist_ok=True)
+    with open(outputfile, "wb") as out:
+        for path in fragments:
+            drivedata = pydre.index.initDriveData(Path(path), datafile_type)
+            drivedata.loadData(schema)
+            drivedata.checkColumns(required)
+            fragment = drivedata.data
+
+            if columns is None:
+                columns = [c for c in fragment.columns if c != ""]
+            else:
+                if merge_type == "spatial" and last_position is not None:
+                    start = _startIndex(fragment, last_position)
+                    logger.info(f"Appending {Path(path).name} from row {start}")
+                    fragment = fragment.slice(start)
+                # the first kept row follows the last written row by one sample interval
+                times = fragment.get_column("SimTime").cast(pl.Float64)
+                interval = _sampleInterval(times)
+                if last_interval is not None:
+                    interval = last_interval
+                first_time = times.drop_nulls().first()
+                if first_time is not None:
+                    offset = last_time + (interval or 0.0) - first_time
+                    fragment = fragment.with_columns(
+                        pl.col("SimTime").cast(pl.Float64) + offset
+                    )
+                extra = set(fragment.columns) - set(columns) - {""}
+                if extra:
+                    logger.warning(
+                        f"Dropping columns {sorted(extra)} of {Path(path).name} "
+                        "not present in the first fragment"
+                    )
+                fragment = fragment.select(
+                    pl.col(c) if c in fragment.columns else pl.lit(None).alias(c)
+                    for c in columns
+                )
+
+            fragment = fragment.select(columns)
+            fragment.write_csv(
+                out,
+                separator=separator,
+                null_value=null_value,
+                include_header=rows == 0,
+            )
+            rows += fragment.height
+
+            times = fragment.get_column("SimTime").drop_nulls()
+            if len(times) > 0:
+                last_time = float(times[-1])
+            if last_interval is None:
+                last_interval = _sampleInterval(times.cast(pl.Float64))
+            if merge_type == "spatial":
+                positions = fragment.select("XPos", "YPos").drop_nulls()
+                if positions.height > 0:
+                    last_position = (
+                        float(positions["XPos"][-1]),
+                        float(positions["YPos"][-1]),
+                    )
+    logger.info(f"Merged {len(fragments)} fragments into {outputfile} ({rows} rows)")
+    return rows
+
+
+def mergeDirectory(
+    directory: PathLike,
+    merge_type: str = "sequential",
+    outputdir: Optional[PathLike] = None,
+    datafile_type: str = "oldrti",
+    pattern: str = "*.dat*",
+) -> list[Path]:
+    """Merge the fragments of every drive found in `directory`.
+
+    Each merged drive is written to `outputdir` (by default `directory/MergedData`) under
+    the file name of its first fragment. Drives consisting of a single file are merged
+    too, so the output directory holds a complete set of drives.
+
+    Returns:
+        merged data files
+    """
+    directory = Path(directory)
+    outputdir = Path(outputdir) if outputdir is not None else directory / "MergedData"
+    groups = groupFragments(sorted(directory.glob(pattern)), datafile_type)
+    merged = []
+    for fragments in groups.values():
+        name = fragments[0].name
+        if pydre.core.detectCompression(fragments[0]) is not None:
+            name = fragments[0].stem
+        target = outputdir / name
+        mergeDrive(fragments, target, merge_type, datafile_type)
+        merged.append(target)
+    return merged
@@ -5,6 +5,7 @@ import polars as pl
 from loguru import logger
 
 import pydre.core
+import pydre.segments
 from pydre.core import ColumnsMatchError
 from pydre.metrics import registerMetric
 
@@ -48,7 +49,7 @@ def R2DIDColumns(drivedata: pydre.core.DriveData):
     return participant_id, match_id, case, location, gender, week
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def throttleReactionTime(drivedata: pydre.core.DriveData) -> Optional[float]:
     """Calculates the time it takes to accelerate once follow car brakes (r2d)
 
@@ -72,39 +73,23 @@ def throttleReactionTime(drivedata: pydre.core.DriveData) -> Optional[float]:
     except pl.exceptions.PolarsError:
         return None
 
-    df = drivedata.data.select(
-        [
-            pl.col("FollowCarBrakingStatus"),
-            pl.col("SimTime"),
-            pl.col("LonAccel"),
-            pl.col("Brake"),
-            pl.col("Throttle"),
-        ]
-    )
-
+    df = drivedata.data
     if df.height < 1:
         return None
 
     initial_time = df.get_column("SimTime").item(0)
 
-    try:
-        df = df.filter(
-            pl.col("SimTime")
-            > df.filter(pl.col("Brake") > 3.0).get_column("SimTime").item(0)
-        )
-    except IndexError:
+    braking = pl.col("Brake") > 3.0
+    if pydre.segments.firstIndex(df, braking) is None:
         logger.warning(
             f"No braking detected for roi {drivedata.roi} in file {drivedata.sourcefilename}"
         )
         return None
 
-    df_after_brake = df.filter(pl.col("Brake") == 0)
-
-    try:
-        time_of_accel = (
-            df_after_brake.filter(pl.col("LonAccel") > 0).get_column("SimTime").item(0)
-        )
-    except IndexError:
+    time_of_accel = pydre.segments.firstTime(
+        df, (pl.col("Brake") == 0) & (pl.col("LonAccel") > 0), after=braking
+    )
+    if time_of_accel is None:
         logger.warning(
             f"No subsequent acceleration detected for roi {drivedata.roi} in file {drivedata.sourcefilename}"
         )
@@ -140,37 +125,31 @@ def eventSpeedRecoveryTime(
     except pl.exceptions.PolarsError:
         return None
 
-    df = drivedata.data.select(
-        [pl.col("Velocity"), pl.col("SimTime"), pl.col("Brake"), pl.col("EventName")]
-    )
+    df = drivedata.data
 
-    non_event_detect = df.filter(pl.col("EventName") == "")
+    non_event_detect = df.select((pl.col("EventName") == "").any()).item()
 
-    if non_event_detect.is_empty():
-        # filter df, so we take recovery time after initial slow-down
-        try:
-            df = df.filter(
-                pl.col("SimTime")
-                > df.filter(pl.col("Velocity") < lower_bound)
-                .get_column("SimTime")
-                .item(0)
-            )
-        except IndexError:
+    if not non_event_detect:
+        # take recovery time after initial slow-down
+        slow_down = pl.col("Velocity") < lower_bound
+        if pydre.segments.firstIndex(df, slow_down) is None:
             logger.warning(
                 f"Velocity doesn't drop below {lower_bound} m/s for roi {drivedata.roi} in file {drivedata.sourcefilename}"
             )
             return "NoSlowDown"
 
         # initial time once velocity reading below lower threshold
-        initial_time = df.get_column("SimTime").item(0)
+        initial_time = pydre.segments.firstTime(df, pl.lit(True), after=slow_down)
 
         recover_cond = pl.col("Velocity") >= lower_bound
-        recover_time = df.filter(recover_cond).select(pl.col("SimTime").first()).item()
+        recover_time = pydre.segments.firstTime(df, recover_cond, after=slow_down)
 
         if recover_time is not None:
             return recover_time - initial_time
         else:
-            max_velo = df.select(pl.max("Velocity").first()).item()
+            max_velo = df.select(
+                pl.col("Velocity").filter(pl.col("SimTime") >= initial_time).max()
+            ).item()
             logger.warning(
                 f"No recovery detected during this event - returned to max speed of {max_velo} m/s"
             )
@@ -205,36 +184,35 @@ def eventRecenterRecoveryTime(
     except pl.exceptions.PolarsError:
         return None
 
-    df = drivedata.data.select(
-        [pl.col("EventName"), pl.col("LaneOffset"), pl.col("SimTime")]
-    )
+    df = drivedata.data
 
-    contains_trash = df.filter(pl.col("EventName").str.contains(event_detect))
+    contains_trash = df.select(
+        pl.col("EventName").str.contains(event_detect).any()
+    ).item()
 
-    if contains_trash.height > 0:
-        # filter df, breach "tolerance"
-        try:
-            df = df.filter(
-                pl.col("SimTime")
-                > df.filter(pl.col("LaneOffset").abs() > tolerance)
-                .get_column("SimTime")
-                .item(0)
-            )
-        except IndexError:
+    if contains_trash:
+        # breach "tolerance"
+        swerve = pl.col("LaneOffset").abs() > tolerance
+        if pydre.segments.firstIndex(df, swerve) is None:
             logger.warning(
                 f"Subject does not breach {tolerance} m lane offset for roi {drivedata.roi} in file {drivedata.sourcefilename}"
             )
             return "NoSwerve"
 
         # initial time once velocity reading below lower threshold
-        initial_time = df.get_column("SimTime").item(0)
+        initial_time = pydre.segments.firstTime(df, pl.lit(True), after=swerve)
         recover_cond = pl.col("LaneOffset").abs() <= tolerance
-        recover_time = df.filter(recover_cond).select(pl.col("SimTime").first()).item()
+        recover_time = pydre.segments.firstTime(df, recover_cond, after=swerve)
 
         if recover_time is not None:
             return recover_time - initial_time
         else:
-            min_offset = df.select(pl.col("LaneOffset").abs().min().first()).item()
+            min_offset = df.select(
+                pl.col("LaneOffset")
+                .abs()
+                .filter(pl.col("SimTime") >= initial_time)
+                .min()
+            ).item()
             logger.warning(
                 f"No recovery detected during this event - returned to min offset of {min_offset} m"
             )
@@ -247,7 +225,7 @@ def eventRecenterRecoveryTime(
             return "NoEvent"  # situation is non event
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def reactionCheckVarVal(
     drivedata: pydre.core.DriveData, var: str, val: float
 ) -> Optional[float]:
@@ -261,19 +239,16 @@ def reactionCheckVarVal(
         return None
 
     try:
-        df = drivedata.data.filter(pl.col(var) < val)
+        first = pydre.segments.firstTime(drivedata.data, pl.col(var) < val)
     except pl.exceptions.ComputeError:
         logger.warning("Brake value non-numeric in {}".format(drivedata.sourcefilename))
         return None
-    if drivedata.data.height == 0 or df.height == 0:
+    if first is None:
         return None
-    return (
-        df.select("SimTime").head(1).item()
-        - drivedata.data.select("SimTime").head(1).item()
-    )
+    return first - drivedata.data.get_column("SimTime").item(0)
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def reactionTimeEventTrueR2D(
     drivedata: pydre.core.DriveData, var1: str, var2: str, val1: float, val2: float
 ):
@@ -290,13 +265,10 @@ def reactionTimeEventTrueR2D(
     if first_metric_reaction:
         return first_metric_reaction
     else:
-        df = drivedata.data.filter(abs(pl.col(var2)) >= val2)
-        if drivedata.data.height == 0 or df.height == 0:
+        first = pydre.segments.firstTime(drivedata.data, pl.col(var2).abs() >= val2)
+        if first is None:
             return None
-        return (
-            df.select("SimTime").head(1).item()
-            - drivedata.data.select("SimTime").head(1).item()
-        )
+        return first - drivedata.data.get_column("SimTime").item(0)
 
 
 @registerMetric("criticalEventStartPos", ["ceName", "ceStartPos"])
@@ -1,21 +1,147 @@
-__all__ = ["registerMetric", "common", "box", "driverdistraction", "gazeanglecutout"]
+__all__ = [
+    "registerMetric",
+    "registerIncremental",
+    "registerSweep",
+    "common",
+    "box",
+    "driverdistraction",
+    "gazeanglecutout",
+    "incremental",
+]
 
 from functools import wraps
 from typing import Any, Optional, Callable, Concatenate
 from loguru import logger
+import polars as pl
 import pydre.core
+from pydre.registry import LazyRegistry, buildManifest
 
-metricsList: dict[str, Callable[Concatenate[pydre.core.DriveData, ...], Any]] = {}
-metricsColNames: dict[str, list[str]] = {}
+# Static map of built-in metric names to the module that registers them. Modules are only
+# imported when a project refers to one of their metrics. Keep this in sync when adding
+# metrics to the package (tests/test_registry.py checks it).
+metricsManifest: dict[str, str] = buildManifest(
+    {
+        "pydre.metrics.common": [
+            "colMean",
+            "colMedian",
+            "colSD",
+            "colMax",
+            "colMin",
+            "colFirst",
+            "colLast",
+            "timeAboveSpeed",
+            "timeWithinSpeedLimit",
+            "stoppingDist",
+            "maxdeceleration",
+            "maxacceleration",
+            "numbrakes",
+            "steeringReversals",
+            "steeringReversalRate",
+            "biopticDipMeasure",
+            "maxAcceleration",
+            "laneExits",
+            "laneViolations",
+            "roadExits",
+            "roadExitsY",
+            "steeringEntropy",
+            "closeFollowing",
+            "leadVehicleCollision",
+            "timeFirstTrue",
+            "reactionBrakeFirstTrue",
+            "reactionTimeEventTrue",
+            "timeToOutsideThreshold",
+            "reactionTime",
+        ],
+        "pydre.metrics.box": [
+            "averageBoxReactionTime",
+            "sdBoxReactionTime",
+            "percentBoxHits",
+            "percentBoxMisses",
+        ],
+        "pydre.metrics.driverdistraction": [
+            "getTaskNum",
+            "errorPresses",
+            "gazeNHTSA",
+            "gazeNHTSATask",
+            "crossCorrelate",
+            "crossCorrelationLag",
+            "speedCoherence",
+            "speedLimitMatchTime",
+        ],
+        "pydre.metrics.gazeanglecutout": [
+            "gazeCutoutAngleDuration",
+            "gazeCutoutAngleRatio",
+            "gazeCutoutAngleViolations",
+        ],
+        "pydre.metrics.R2DMetrics": [
+            "R2DIDColumns",
+            "throttleReactionTime",
+            "eventSpeedRecoveryTime",
+            "eventRecenterRecoveryTime",
+            "reactionCheckVarVal",
+            "reactionTimeEventTrueR2D",
+            "criticalEventStartPos",
+            "criticalEventEndPos",
+        ],
+    }
+)
+
+# Metrics that also have an incremental version (see `pydre.metrics.incremental`)
+incrementalManifest: dict[str, str] = buildManifest(
+    {
+        "pydre.metrics.incremental": [
+            "colMean",
+            "colSD",
+            "colMin",
+            "colMax",
+            "colMedian",
+            "numbrakes",
+            "laneViolations",
+            "leadVehicleCollision",
+        ],
+    }
+)
+
+metricsList: dict[str, Callable[Concatenate[pydre.core.DriveData, ...], Any]] = (
+    LazyRegistry(metricsManifest)
+)
+metricsColNames: dict[str, list[str]] = LazyRegistry(metricsManifest)
+# Declared result dtype of each output column; None where the metric does not declare one.
+metricsColTypes: dict[str, list[Optional[pl.DataType]]] = LazyRegistry(metricsManifest)
+# Incremental metric classes, registered under the name of the metric they compute.
+metricsIncremental: dict[str, type] = LazyRegistry(incrementalManifest)
+# Functions evaluating a metric for many values of one argument in a single pass, as
+# (argument name, function); see `registerSweep`.
+metricsSweep: dict[str, tuple[str, Callable]] = LazyRegistry(metricsManifest)
 
 
 def registerMetric(
-    metricname: Optional[str] = None, columnnames: Optional[list[str]] = None
+    metricname: Optional[str] = None,
+    columnnames: Optional[list[str]] = None,
+    columntypes: Optional[list[Optional[pl.DataType]] | pl.DataType] = None,
 ) -> Callable:
+    """Register a metric function under `metricname` (default: the function name).
+
+    Parameters:
+        metricname: name used in project files
+        columnnames: output column names, for metrics that return several values
+        columntypes: polars dtype of each output column (or a single dtype for a
+            single-column metric). Declared types are used to build the result table
+            without type inference. Columns without a declared type are inferred.
+    """
+
     def registering_decorator(
         func: Callable[Concatenate[pydre.core.DriveData, ...], Any],
     ) -> Callable[Concatenate[pydre.core.DriveData, ...], Any]:
         name: str = metricname or func.__name__
+        if metricsList.isBuiltin(name, func):
+            if metricsList.hasCustom(name):
+                logger.debug(f"Keeping custom metric {name} over the built-in one")
+                return func
+        else:
+            # the built-in incremental and sweep versions do not apply to a custom metric
+            dict.pop(metricsIncremental, name, None)
+            dict.pop(metricsSweep, name, None)
         # register function
         metricsList[name] = func
         if columnnames:
@@ -24,6 +150,62 @@ def registerMetric(
             metricsColNames[name] = [
                 name,
             ]
+        if columntypes is None:
+            types = [None] * len(metricsColNames[name])
+        elif isinstance(columntypes, (list, tuple)):
+            types = list(columntypes)
+        else:
+            types = [columntypes]
+        if len(types) != len(metricsColNames[name]):
+            raise ValueError(
+                f"Metric {name} declares {len(types)} column types "
+                f"for {len(metricsColNames[name])} columns"
+            )
+        metricsColTypes[name] = types
+        return func
+
+    return registering_decorator
+
+
+def registerIncremental(metricname: str) -> Callable:
+    """Register an incremental version of the metric `metricname`.
+
+    The decorated class is constructed with the metric's keyword arguments and
+    implements the protocol of `pydre.metrics.incremental.IncrementalMetric`.
+    """
+
+    def registering_decorator(cls: type) -> type:
+        if metricsIncremental.isBuiltin(metricname, cls) and (
+            metricsIncremental.hasCustom(metricname)
+            or metricsList.hasCustom(metricname)
+        ):
+            return cls
+        metricsIncremental[metricname] = cls
+        return cls
+
+    return registering_decorator
+
+
+def registerSweep(metricname: str, parameter: str) -> Callable:
+    """Register a function computing the metric `metricname` for many values of `parameter`.
+
+    The decorated function takes the DriveData object, the list of values of `parameter`
+    and the metric's other keyword arguments, and returns one result per value. Project
+    files that sweep `parameter` (see `pydre.plan`) then use it instead of calling the
+    metric once per value.
+    """
+
+    def registering_decorator(func: Callable) -> Callable:
+        existing = dict.get(metricsSweep, metricname)
+        if metricsSweep.isBuiltin(metricname, func) and (
+            (
+                existing is not None
+                and not metricsSweep.isBuiltin(metricname, existing[1])
+            )
+            or metricsList.hasCustom(metricname)
+        ):
+            return func
+        metricsSweep[metricname] = (parameter, func)
         return func
 
     return registering_decorator
@@ -3,7 +3,7 @@ import pydre.core
 from pydre.metrics import registerMetric
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def averageBoxReactionTime(drivedata: pydre.core.DriveData):
     required_col = ["ReactionTime"]
     drivedata.checkColumns(required_col)
@@ -17,7 +17,7 @@ def averageBoxReactionTime(drivedata: pydre.core.DriveData):
     return df.mean().item()
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def sdBoxReactionTime(drivedata: pydre.core.DriveData):
     required_col = ["ReactionTime"]
     drivedata.checkColumns(required_col)
@@ -38,7 +38,7 @@ def countBoxHits(drivedata: pydre.core.DriveData, cutoff=5):
     ).height
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def percentBoxHits(drivedata: pydre.core.DriveData, cutoff=5):
     required_col = ["ReactionTime"]
     drivedata.checkColumns(required_col)
@@ -58,7 +58,7 @@ def countBoxMisses(drivedata: pydre.core.DriveData):
     return drivedata.data.filter(pl.col("ReactionTime") < 0).height
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def percentBoxMisses(drivedata: pydre.core.DriveData):
     required_col = ["ReactionTime"]
     drivedata.checkColumns(required_col)
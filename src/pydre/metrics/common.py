@@ -3,13 +3,13 @@ from typing import Optional
 import polars as pl
 from polars import exceptions
 import pydre.core
+import pydre.derived
+import pydre.segments
 from pydre.core import ColumnsMatchError
-from pydre.metrics import registerMetric
+from pydre.metrics import registerMetric, registerSweep
 from loguru import logger
 import numpy as np
 
-from scipy import signal
-
 # metrics defined here take a list of DriveData objects and return a single floating point value
 
 # not registered & incomplete
@@ -29,7 +29,7 @@ from scipy import signal
 #     return timestepID
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def colMean(
     drivedata: pydre.core.DriveData, var: str, cutoff: Optional[float] = None
 ) -> Optional[float]:
@@ -61,7 +61,7 @@ def colMean(
         return drivedata.data.get_column(var).mean()
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def colMedian(
     drivedata: pydre.core.DriveData, var: str, cutoff: Optional[float] = None
 ) -> Optional[float]:
@@ -93,7 +93,7 @@ def colMedian(
         return drivedata.data.get_column(var).median()
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def colSD(
     drivedata: pydre.core.DriveData, var: str, cutoff: Optional[float] = None
 ) -> Optional[float]:
@@ -194,7 +194,7 @@ def colLast(drivedata: pydre.core.DriveData, var: str) -> Optional[float]:
     return drivedata.data.get_column(var).tail(1).item()
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def timeAboveSpeed(
     drivedata: pydre.core.DriveData, cutoff: float = 0, percentage: bool = False
 ) -> Optional[float]:
@@ -220,18 +220,11 @@ def timeAboveSpeed(
         return None
     drivedata.checkColumns(required_col)
 
-    df = drivedata.data.select(
-        [
-            pl.col("SimTime"),
-            pl.col("Velocity"),
-            pl.col("SimTime").diff().clip(lower_bound=0).alias("Duration"),
-        ]
-    )
-
-    time = df.get_column("Duration").filter(df.get_column("Velocity") >= cutoff).sum()
+    duration = pydre.derived.derivedColumn(drivedata, "dt")
+    time = duration.filter(drivedata.data.get_column("Velocity") >= cutoff).sum()
     try:
-        total_time: float = float(df.get_column("SimTime").max()) - float(
-            df.get_column("SimTime").min()
+        total_time: float = float(drivedata.data.get_column("SimTime").max()) - float(
+            drivedata.data.get_column("SimTime").min()
         )
     except TypeError:
         return None
@@ -242,7 +235,41 @@ def timeAboveSpeed(
     return out
 
 
-@registerMetric()
+@registerSweep("timeAboveSpeed", "cutoff")
+def timeAboveSpeedSweep(
+    drivedata: pydre.core.DriveData, cutoffs: list[float], percentage: bool = False
+) -> list[Optional[float]]:
+    """`timeAboveSpeed` for each of `cutoffs`, sorting the speeds once."""
+    try:
+        drivedata.checkColumnsNumeric(["SimTime", "Velocity"])
+    except ColumnsMatchError:
+        return [None] * len(cutoffs)
+    df = (
+        pl.DataFrame(
+            {
+                "Velocity": drivedata.data.get_column("Velocity"),
+                "dt": pydre.derived.derivedColumn(drivedata, "dt").fill_null(0),
+            }
+        )
+        .drop_nulls("Velocity")
+        .sort("Velocity")
+    )
+    velocity = df.get_column("Velocity").to_numpy()
+    # time spent at each speed or faster
+    time_above = np.append(df.get_column("dt").reverse().cum_sum().reverse(), 0.0)
+    times = time_above[np.searchsorted(velocity, cutoffs, side="left")]
+    if not percentage:
+        return [float(t) for t in times]
+    try:
+        total_time = float(drivedata.data.get_column("SimTime").max()) - float(
+            drivedata.data.get_column("SimTime").min()
+        )
+    except TypeError:
+        return [None] * len(cutoffs)
+    return [float(t) / total_time for t in times]
+
+
+@registerMetric(columntypes=pl.Float64)
 def timeWithinSpeedLimit(
     drivedata: pydre.core.DriveData, lowerlimit: float = 0, percentage: bool = False
 ) -> Optional[float]:
@@ -267,22 +294,14 @@ def timeWithinSpeedLimit(
     except ColumnsMatchError:
         return None
 
-    df = drivedata.data.select(
-        [
-            pl.col("SimTime"),
-            pl.col("Velocity"),
-            pl.col("Velocity").mul(2.23694).alias("VelocityMPH"),
-            pl.col("SimTime").diff().clip(lower_bound=0).alias("Duration"),
-            pl.col("SpeedLimit"),
-        ]
-    )
+    df = pydre.derived.withDerived(drivedata, "VelocityMPH", "dt")
 
     time = (
         df.filter(
             (pl.col("VelocityMPH") <= pl.col("SpeedLimit"))
             & (pl.col("VelocityMPH") >= lowerlimit)
         )
-        .get_column("Duration")
+        .get_column("dt")
         .sum()
     )
 
@@ -296,7 +315,7 @@ def timeWithinSpeedLimit(
     return output
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def stoppingDist(
     drivedata: pydre.core.DriveData, roadtravelposition="XPos"
 ) -> Optional[float]:
@@ -343,7 +362,7 @@ def stoppingDist(
     return lineposition - stopposition
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def maxdeceleration(
     drivedata: pydre.core.DriveData, cutofflimit: float = 1
 ) -> Optional[float]:
@@ -376,7 +395,7 @@ def maxdeceleration(
     return maxdecel
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def maxacceleration(
     drivedata: pydre.core.DriveData, cutofflimit: int = 1
 ) -> Optional[float]:
@@ -409,7 +428,7 @@ def maxacceleration(
     return maxaccel
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Int64)
 def numbrakes(
     drivedata: pydre.core.DriveData, cutofflimit: float = 1
 ) -> Optional[float]:
@@ -432,22 +451,9 @@ def numbrakes(
     except ColumnsMatchError:
         return None
 
-    df = drivedata.data.select(
-        [
-            pl.col("Brake"),
-            pl.col("Brake").gt(0).cast(pl.Float32).diff().alias("BrakeStatus"),
-            pl.col("Velocity"),
-        ]
-    )
-    dfupdated = df.filter(df.get_column("Velocity") > cutofflimit)
-
-    numberofbrakes = (
-        dfupdated.filter(dfupdated.get_column("BrakeStatus") > 0)
-        .select(pl.count())
-        .item(0, 0)
-    )
-
-    return numberofbrakes
+    presses = pydre.segments.runStarts(drivedata, pl.col("Brake").gt(0))
+    velocity = drivedata.data.get_column("Velocity").gather(presses.get_column("start"))
+    return int((velocity > cutofflimit).sum())
 
 
 def _calculateReversals(df):
@@ -463,7 +469,7 @@ def _calculateReversals(df):
     return n
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Int64)
 def steeringReversals(drivedata: pydre.core.DriveData) -> float:
     """Steering reversals, as a count
 
@@ -496,6 +502,9 @@ def steeringReversals(drivedata: pydre.core.DriveData) -> float:
     numpy_df = np.column_stack((new_time, new_steer))
 
     # apply second order butterworth filter at 6z frequency
+    # scipy is imported here so that projects not using steering metrics don't pay for it
+    from scipy import signal
+
     sos = signal.butter(2, 6, output="sos", fs=32)
     theta_i = signal.sosfilt(sos, numpy_df[:, 1], zi=None)
 
@@ -537,7 +546,7 @@ def steeringReversals(drivedata: pydre.core.DriveData) -> float:
     return reversals
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def steeringReversalRate(drivedata: pydre.core.DriveData) -> float:
     """Steering reversal rate
 
@@ -570,6 +579,9 @@ def steeringReversalRate(drivedata: pydre.core.DriveData) -> float:
     numpy_df = np.column_stack((new_time, new_steer))
 
     # apply second order butterworth filter at 6z frequency
+    # scipy is imported here so that projects not using steering metrics don't pay for it
+    from scipy import signal
+
     sos = signal.butter(2, 6, output="sos", fs=32)
     theta_i = signal.sosfilt(sos, numpy_df[:, 1], zi=None)
 
@@ -631,21 +643,15 @@ def biopticDipMeasure(drivedata: pydre.core.DriveData):
         logger.warning("columns dont match in bioptics metric")
         return [None, None, None]
 
-    df = drivedata.data.select(
-        [
-            pl.col("SimTime"),
-            pl.col("hpBinary"),
-            pl.col("DipRegions"),
-            pl.col("HeadPitch"),
-        ]
-    )
+    # runs of the dip region number, while the head is down
+    runs = pydre.segments.runTable(
+        drivedata, pl.when(pl.col("hpBinary") < 1).then(pl.col("DipRegions"))
+    ).filter(pl.col("value").is_not_null())
 
-    numDips = df.filter(df["hpBinary"] < 1).get_column("DipRegions").n_unique()
+    numDips = runs.get_column("value").n_unique()
 
-    zeros_df = df.filter(pl.col("hpBinary") < 1)
-
-    duration_df = zeros_df.group_by("DipRegions").agg(
-        [(pl.col("SimTime").max() - pl.col("SimTime").min()).alias("Duration")]
+    duration_df = runs.group_by("value").agg(
+        (pl.col("end_time").max() - pl.col("start_time").min()).alias("Duration")
     )
 
     meanDipTime = duration_df.get_column("Duration").mean()
@@ -666,16 +672,7 @@ def maxAcceleration(drivedata: pydre.core.DriveData) -> Optional[float]:
     # issue with R2D part: 5210006w1 Load, No Event. SimTime is col type "str".
     drivedata.checkColumns(["SimTime"])
 
-    df = drivedata.data.select(
-        [pl.col("LatAccel"), pl.col("LonAccel"), pl.col("SimTime")]
-    )
-
-    df = df.with_columns(
-        ((pl.col("LonAccel") ** 2) + (pl.col("LatAccel") ** 2))
-        .sqrt()
-        .alias("Total_Accel")
-    )
-    return df.get_column("Total_Accel").max()
+    return pydre.derived.derivedColumn(drivedata, "TotalAccel").max()
 
 
 # laneExits
@@ -700,28 +697,13 @@ def laneViolations(
     lane_width: float = 3.65,
     car_width: float = 2.1,
 ):
-    df = drivedata.data
     # df.checkColumnsNumeric([lane_column])
     # tolerance is the maximum allowable offset deviation from 0
     tolerance = lane_width / 2 - car_width / 2
-    # Determine which rows are violations
-    df = df.with_columns(
-        ((pl.col(offset) > tolerance) | (pl.col(offset) < -tolerance)).alias(
-            "violation"
-        )
-    )
-
-    df = df.with_columns(
-        (pl.col("violation") != pl.col("violation").shift(1)).alias("transition")
-    )
-
-    # Filter to keep only the rows where a transition occurs
-    transitions = df.filter(pl.col("transition") == True)
+    violation = (pl.col(offset) > tolerance) | (pl.col(offset) < -tolerance)
 
     # Count the number of transitions from non-violation to violation
-    violation_starts = transitions.filter(pl.col("violation") == True).shape[0]
-
-    return violation_starts
+    return pydre.segments.runStarts(drivedata, violation).height
 
 
 def laneViolationDuration(
@@ -732,20 +714,20 @@ def laneViolationDuration(
     lane_width: float = 3.65,
     car_width: float = 2.1,
 ):
-    required_col = [offset, lane_column, "LaneDuration", "SimTime", "Duration"]
+    required_col = [offset, lane_column, "SimTime"]
     # to verify if column is numeric
     drivedata.checkColumnsNumeric(required_col)
 
     tolerance = lane_width / 2 - car_width / 2
-    lane_data = drivedata.data.filter(pl.col(lane_column) == 2)
-    lane_data = lane_data.select(
-        [
-            pl.col(offset).abs().alias("LaneViolations") > tolerance,
-            pl.col("SimTime").diff().clip(lower_bound=0).alias("Duration"),
-        ]
+    # sample durations are taken before selecting the lane, so leaving and re-entering
+    # the lane does not count the time spent outside it
+    lane_data = pydre.derived.withDerived(drivedata, "dt").filter(
+        pl.col(lane_column) == lane
     )
 
-    return lane_data.select(pl.col("LaneViolations") * pl.col("Duration")).sum().item()
+    return (
+        lane_data.select((pl.col(offset).abs() > tolerance) * pl.col("dt")).sum().item()
+    )
 
 
 @registerMetric()
@@ -758,25 +740,16 @@ def roadExits(drivedata: pydre.core.DriveData):
     # assuming a two lane road, determine the amount of time they were not in the legal roadway
     # Lane width 3.6m, car width 1.8m
 
-    df = drivedata.data.select(
-        [
-            pl.col("SimTime"),
-            pl.col("RoadOffset"),
-            pl.col("Velocity"),
-            pl.col("SimTime")
-            .diff()
-            .alias("Duration")
-            .clip(
-                0, 0.5
-            ),  # any duration outside this range is bad data (maybe from a splice)
-        ]
+    df = pydre.derived.withDerived(drivedata, "dt").with_columns(
+        # any duration longer than this is bad data (maybe from a splice)
+        pl.col("dt").clip(upper_bound=0.5)
     )
 
     outtimes = df.filter(
         (~pl.col("RoadOffset").is_between(0, 7.2)) & (pl.col("Velocity") > 1)
     )
 
-    return outtimes.get_column("Duration").sum()
+    return outtimes.get_column("dt").sum()
 
 
 @registerMetric()
@@ -789,18 +762,9 @@ def roadExitsY(drivedata: pydre.core.DriveData):
     # assuming a two lane road, determine the amount of time they were not in the legal roadway
     # Lane width 3.6m, car width 1.8m
 
-    df = drivedata.data.select(
-        [
-            pl.col("SimTime"),
-            pl.col("RoadOffset"),
-            pl.col("Velocity"),
-            pl.col("SimTime")
-            .diff()
-            .alias("Duration")
-            .clip(
-                0, 0.5
-            ),  # any duration outside this range is bad data (maybe from a splice)
-        ]
+    df = pydre.derived.withDerived(drivedata, "dt").with_columns(
+        # any duration longer than this is bad data (maybe from a splice)
+        pl.col("dt").clip(upper_bound=0.5)
     )
 
     outtimes = df.filter(
@@ -808,11 +772,11 @@ def roadExitsY(drivedata: pydre.core.DriveData):
         # TODO: double check offsets
     )
 
-    return outtimes.get_column("Duration").sum()
+    return outtimes.get_column("dt").sum()
 
 
 # cutoff doesn't work
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def steeringEntropy(drivedata: pydre.core.DriveData, cutoff: float = 0):
     required_col = ["SimTime", "Steer"]
     # to verify if column is numeric
@@ -899,7 +863,7 @@ def steeringEntropy(drivedata: pydre.core.DriveData, cutoff: float = 0):
     return Hp
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def closeFollowing(
     drivedata: pydre.core.DriveData,
     threshold: float = 2,
@@ -936,13 +900,11 @@ def closeFollowing(
     except pl.exceptions.PolarsError:
         return None
 
-    following_df = drivedata.data.with_columns(
-        pl.col("SimTime").diff().alias("delta_t")
-    )
+    following_df = pydre.derived.withDerived(drivedata, "dt")
 
     # find all tailgating instances where the delta time is reasonable.
     # this ensures we don't get screwy data from merged files
-    following_df = following_df.filter(pl.col("delta_t").is_between(0, 0.5))
+    following_df = following_df.filter(pl.col("dt").is_between(0, 0.5))
 
     if minvelocity:
         following_df = following_df.filter(pl.col("Velocity") >= minvelocity)
@@ -951,12 +913,12 @@ def closeFollowing(
         following_df.filter(
             pl.col("HeadwayTime").is_between(0, threshold, closed="none")
         )
-        .select("delta_t")
+        .select("dt")
         .sum()
         .item()
     )
 
-    total_time = following_df.select("delta_t").sum().item()
+    total_time = following_df.select("dt").sum().item()
 
     if percentage:
         if total_time > 0:
@@ -967,8 +929,43 @@ def closeFollowing(
         return tail_time
 
 
+@registerSweep("closeFollowing", "threshold")
+def closeFollowingSweep(
+    drivedata: pydre.core.DriveData,
+    thresholds: list[float],
+    percentage: bool = False,
+    minvelocity: Optional[float] = None,
+) -> list[Optional[float]]:
+    """`closeFollowing` for each of `thresholds`, sorting the headway times once."""
+    required_col = ["SimTime", "HeadwayTime"]
+    if minvelocity:
+        required_col.append("Velocity")
+    try:
+        drivedata.checkColumnsNumeric(required_col)
+    except pl.exceptions.PolarsError:
+        return [None] * len(thresholds)
+
+    following_df = pydre.derived.withDerived(drivedata, "dt").filter(
+        pl.col("dt").is_between(0, 0.5)
+    )
+    if minvelocity:
+        following_df = following_df.filter(pl.col("Velocity") >= minvelocity)
+    total_time = following_df.select("dt").sum().item()
+
+    close = following_df.filter(pl.col("HeadwayTime") > 0).sort("HeadwayTime")
+    headway = close.get_column("HeadwayTime").to_numpy()
+    # time spent below each headway time
+    time_below = np.insert(close.get_column("dt").cum_sum().to_numpy(), 0, 0.0)
+    tail_times = time_below[np.searchsorted(headway, thresholds, side="left")]
+    if percentage:
+        if total_time > 0:
+            return [float(t) / total_time for t in tail_times]
+        return [None] * len(thresholds)
+    return [float(t) for t in tail_times]
+
+
 # determines when the ownship collides with another vehicle by examining headway distance as threshold
-@registerMetric()
+@registerMetric(columntypes=pl.Int64)
 def leadVehicleCollision(
     drivedata: pydre.core.DriveData, cutoff: float = 2.85
 ) -> Optional[float]:
@@ -995,15 +992,41 @@ def leadVehicleCollision(
         return None
 
     # find contiguous instances of headway distance < the cutoff
-    collision_table = drivedata.data.select(
-        (pl.col("HeadwayDistance") <= cutoff).alias("CollisionZone")
+    collisions = pydre.segments.runStarts(
+        drivedata, pl.col("HeadwayDistance") <= cutoff
     )
-    collisions = (
-        collision_table.select(pl.col("CollisionZone").cast(pl.Int32).diff().clip(0, 1))
-        .sum()
-        .item()
+    return collisions.height
+
+
+@registerSweep("leadVehicleCollision", "cutoff")
+def leadVehicleCollisionSweep(
+    drivedata: pydre.core.DriveData, cutoffs: list[float]
+) -> list[Optional[int]]:
+    """`leadVehicleCollision` for each of `cutoffs` in a single pass.
+
+    A collision starts at a row whose headway distance is at most the cutoff while the
+    previous row's was above it, that is, for cutoffs between the two distances. The
+    number of collisions for a cutoff is therefore the number of consecutive row pairs
+    with a falling headway distance whose interval contains the cutoff.
+    """
+    try:
+        drivedata.checkColumnsNumeric(["SimTime", "HeadwayDistance"])
+    except pl.exceptions.PolarsError:
+        return [None] * len(cutoffs)
+    falling = (
+        drivedata.data.select(
+            pl.col("HeadwayDistance").alias("low"),
+            pl.col("HeadwayDistance").shift().alias("high"),
+        )
+        .drop_nulls()
+        .filter(pl.col("low") < pl.col("high"))
+    )
+    low = np.sort(falling.get_column("low").to_numpy())
+    high = np.sort(falling.get_column("high").to_numpy())
+    counts = np.searchsorted(low, cutoffs, side="right") - np.searchsorted(
+        high, cutoffs, side="right"
     )
-    return collisions
+    return [int(c) for c in counts]
 
 
 def _firstOccurrence(df: pl.DataFrame, column: str):
@@ -1014,7 +1037,7 @@ def _firstOccurrence(df: pl.DataFrame, column: str):
         return None
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def timeFirstTrue(
     drivedata: pydre.core.DriveData, var: str, timecol: str = "SimTime"
 ) -> Optional[float]:
@@ -1037,7 +1060,7 @@ def timeFirstTrue(
         return None
 
     try:
-        df = drivedata.data.filter(pl.col(var) > 0)
+        first = pydre.segments.firstTime(drivedata.data, pl.col(var) > 0, timecol)
     except pl.exceptions.ComputeError:
         logger.warning(
             "Failure processing timeFirstTrue metric for variable {} in file {}".format(
@@ -1045,15 +1068,12 @@ def timeFirstTrue(
             )
         )
         return None
-    if df.height == 0:
+    if first is None:
         return None
-    return (
-        df.select("SimTime").head(1).item()
-        - drivedata.data.select("SimTime").head(1).item()
-    )
+    return first - drivedata.data.get_column(timecol).item(0)
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def reactionBrakeFirstTrue(
     drivedata: pydre.core.DriveData, var: str
 ) -> Optional[float]:
@@ -1064,19 +1084,16 @@ def reactionBrakeFirstTrue(
         return None
 
     try:
-        df = drivedata.data.filter(pl.col(var) > 5)
+        first = pydre.segments.firstTime(drivedata.data, pl.col(var) > 5)
     except pl.exceptions.ComputeError:
         logger.warning("Brake value non-numeric in {}".format(drivedata.sourcefilename))
         return None
-    if drivedata.data.height == 0 or df.height == 0:
+    if first is None:
         return None
-    return (
-        df.select("SimTime").head(1).item()
-        - drivedata.data.select("SimTime").head(1).item()
-    )
+    return first - drivedata.data.get_column("SimTime").item(0)
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def reactionTimeEventTrue(drivedata: pydre.core.DriveData, var1: str, var2: str):
     required_col = [var1, var2, "SimTime"]
     try:
@@ -1088,16 +1105,13 @@ def reactionTimeEventTrue(drivedata: pydre.core.DriveData, var1: str, var2: str)
     if break_reaction:
         return break_reaction
     else:
-        df = drivedata.data.filter(abs(pl.col(var2)) >= 0.2)
-        if drivedata.data.height == 0 or df.height == 0:
+        first = pydre.segments.firstTime(drivedata.data, pl.col(var2).abs() >= 0.2)
+        if first is None:
             return None
-        return (
-            df.select("SimTime").head(1).item()
-            - drivedata.data.select("SimTime").head(1).item()
-        )
+        return first - drivedata.data.get_column("SimTime").item(0)
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def timeToOutsideThreshold(
     drivedata: pydre.core.DriveData,
     var: str,
@@ -1124,20 +1138,17 @@ def timeToOutsideThreshold(
     except ColumnsMatchError:
         return None
     try:
-        df = drivedata.data.filter(pl.col(var) < threshold_low)
+        first = pydre.segments.firstTime(drivedata.data, pl.col(var) < threshold_low)
     except pl.exceptions.ComputeError as e:
         logger.warning(f"{var} value non-numeric in {drivedata.sourcefilename} --> {e}")
         return None
     # no lower threshold violation, check upper threshold
-    if drivedata.data.height == 0 or df.height == 0:
-        df = drivedata.data.filter(pl.col(var) > threshold_high)
-        if df.height == 0:
+    if first is None:
+        first = pydre.segments.firstTime(drivedata.data, pl.col(var) > threshold_high)
+        if first is None:
             # no threshold violations for given bounds
             return None
-    return (
-        df.select("SimTime").head(1).item()
-        - drivedata.data.select("SimTime").head(1).item()
-    )
+    return first - drivedata.data.get_column("SimTime").item(0)
 
 
 """
@@ -1165,7 +1176,7 @@ This results in 8 reaction times per participant.
 """
 
 
-@registerMetric()
+@registerMetric(columntypes=pl.Float64)
 def reactionTime(drivedata: pydre.core.DriveData, brake_cutoff=1, steer_cutoff=0.2):
     required_col = ["SimTime", "Brake", "Steer", "XPos", "HeadwayDistance"]
     # to verify if column is numeric
@@ -4,6 +4,7 @@ from pydre.core import ColumnsMatchError
 from pydre.metrics import registerMetric
 import numpy as np
 from scipy import signal
+from typing import Optional
 
 
 # These metrics were used in driving distraction evaluation. They have not been fully tested after conversion from
@@ -217,47 +218,169 @@ def gazeNHTSA(drivedata: pydre.core.DriveData):
     ]
 
 
-# not working
-def addVelocities(drivedata: pydre.core.DriveData):
-    df = pl.DataFrame(drivedata.data)
-    # add column with ownship velocity
-    g = np.gradient(df.XPos.values, df.SimTime.values)
-    df.insert(len(df.columns), "OwnshipVelocity", g, True)
-    # add column with leadcar velocity
-    headwayDist = df.HeadwayTime * df.OwnshipVelocity
-    # v = df.OwnshipVelocity+np.gradient(headwayDist, df.SimTime.values)
-    df.insert(len(df.columns), "LeadCarPos", headwayDist + df.XPos.values, True)
-    df.insert(len(df.columns), "HeadwayDist", headwayDist, True)
-    v = np.gradient(headwayDist + df.XPos.values, df.SimTime.values)
-    df.insert(len(df.columns), "LeadCarVelocity", v, True)
-    return df
+def addVelocities(
+    drivedata: pydre.core.DriveData, timecol: str = "SimTime"
+) -> pl.DataFrame:
+    """Drive data with ownship and lead car velocities derived from positions.
+
+    Note: Requires data columns
+        - SimTime: Simulation time in seconds
+        - XPos: ownship position along the road
+        - HeadwayTime: time headway to the lead car in seconds
+
+    Returns:
+        the drive data with `OwnshipVelocity`, `HeadwayDist`, `LeadCarPos` and
+        `LeadCarVelocity` columns added
+    """
+    drivedata.checkColumnsNumeric([timecol, "XPos", "HeadwayTime"])
+    df = drivedata.data.drop_nulls([timecol, "XPos", "HeadwayTime"])
+    time = df.get_column(timecol).cast(pl.Float64).to_numpy()
+    position = df.get_column("XPos").cast(pl.Float64).to_numpy()
+    ownship = np.gradient(position, time)
+    headway = df.get_column("HeadwayTime").cast(pl.Float64).to_numpy() * ownship
+    return df.with_columns(
+        pl.Series("OwnshipVelocity", ownship),
+        pl.Series("HeadwayDist", headway),
+        pl.Series("LeadCarPos", headway + position),
+        pl.Series("LeadCarVelocity", np.gradient(headway + position, time)),
+    )
 
 
-@registerMetric()
-def crossCorrelate(drivedata: pydre.core.DriveData):
+def _followingSpeeds(
+    drivedata: pydre.core.DriveData, timecol: str
+) -> tuple[np.ndarray, np.ndarray, float]:
+    """Ownship and lead car speeds as NumPy arrays, and the sample interval."""
+    columns = [timecol, "OwnshipVelocity", "LeadCarVelocity"]
     df = drivedata.data
     if "OwnshipVelocity" not in df.columns or "LeadCarVelocity" not in df.columns:
-        df = addVelocities(drivedata)
-        print("calling addVelocities()")
-
-    v2 = df.LeadCarVelocity
-    v1 = df.OwnshipVelocity
-    cor = signal.correlate(v1 - v1.mean(), v2 - v2.mean(), mode="same")
-    # cor-An N-dimensional array containing a subset of the discrete linear cross-correlation of in1 with in2.
-    # delay index at the max
-    df.insert(len(df.columns), "CrossCorrelations", cor, True)
-    delayIndex = np.argmax(cor)
-    if delayIndex > 0:
-        v2 = df.LeadCarVelocity.iloc[delayIndex : df.columns.__len__()]
-        v1 = df.OwnshipVelocity.iloc[delayIndex : df.columns.__len__()]
-    # normalize vectors
-    v1_norm = v1 / np.linalg.norm(v1)
-    v2_norm = v2 / np.linalg.norm(v2)
-    cor = np.dot(v1_norm, v2_norm)
-    if cor > 0:
-        return cor
-    else:
-        return 0.0
+        df = addVelocities(drivedata, timecol)
+    df = df.select(pl.col(c).cast(pl.Float64) for c in columns).drop_nulls()
+    interval = df.get_column(timecol).diff().median()
+    return (
+        df.get_column("OwnshipVelocity").to_numpy(),
+        df.get_column("LeadCarVelocity").to_numpy(),
+        float(interval) if interval is not None else float("nan"),
+    )
+
+
+def _speedCrossCorrelation(
+    drivedata: pydre.core.DriveData, max_lag: float, timecol: str
+) -> Optional[tuple[np.ndarray, np.ndarray]]:
+    """Normalized cross-correlation of ownship with lead car speed, for lags up to `max_lag`.
+
+    Uses FFT correlation, so the cost is O(n log n) in the drive length. A positive lag
+    means the ownship speed follows the lead car speed. The result is cached on the
+    DriveData so the metrics of this family share one computation.
+
+    Returns:
+        lags in seconds and the correlation at each lag, or None if it is undefined
+    """
+
+    def compute():
+        ownship, lead, interval = _followingSpeeds(drivedata, timecol)
+        if len(ownship) < 2 or not interval > 0:
+            return None
+        ownship = ownship - ownship.mean()
+        lead = lead - lead.mean()
+        norm = np.sqrt(np.dot(ownship, ownship) * np.dot(lead, lead))
+        if norm == 0:
+            return None
+        correlation = signal.correlate(ownship, lead, mode="full", method="fft") / norm
+        lags = signal.correlation_lags(len(ownship), len(lead), mode="full")
+        window = np.abs(lags) <= int(round(max_lag / interval))
+        return lags[window] * interval, correlation[window]
+
+    return drivedata.cachedResult(("speedCrossCorrelation", max_lag, timecol), compute)
+
+
+@registerMetric(columntypes=pl.Float64)
+def crossCorrelate(
+    drivedata: pydre.core.DriveData, max_lag: float = 10.0, timecol: str = "SimTime"
+) -> Optional[float]:
+    """Peak cross-correlation between ownship speed and lead car speed.
+
+    Parameters:
+        max_lag: largest lag, in seconds, considered in either direction
+        timecol: time column
+
+    Note: Requires data columns
+        - SimTime: Simulation time in seconds
+        - OwnshipVelocity and LeadCarVelocity, or XPos and HeadwayTime to derive them
+
+    Returns:
+        highest correlation coefficient (-1 to 1) over lags within `max_lag`
+    """
+    try:
+        result = _speedCrossCorrelation(drivedata, max_lag, timecol)
+    except ColumnsMatchError:
+        return None
+    if result is None:
+        return None
+    return float(result[1].max())
+
+
+@registerMetric(columntypes=pl.Float64)
+def crossCorrelationLag(
+    drivedata: pydre.core.DriveData, max_lag: float = 10.0, timecol: str = "SimTime"
+) -> Optional[float]:
+    """Delay of the ownship speed behind the lead car speed, from the cross-correlation peak.
+
+    Parameters:
+        max_lag: largest lag, in seconds, considered in either direction
+        timecol: time column
+
+    Note: Requires data columns
+        - SimTime: Simulation time in seconds
+        - OwnshipVelocity and LeadCarVelocity, or XPos and HeadwayTime to derive them
+
+    Returns:
+        lag in seconds at the correlation peak; positive when the ownship follows
+    """
+    try:
+        result = _speedCrossCorrelation(drivedata, max_lag, timecol)
+    except ColumnsMatchError:
+        return None
+    if result is None:
+        return None
+    lags, correlation = result
+    return float(lags[np.argmax(correlation)])
+
+
+@registerMetric(columntypes=pl.Float64)
+def speedCoherence(
+    drivedata: pydre.core.DriveData,
+    max_frequency: float = 0.5,
+    segment_length: float = 60.0,
+    timecol: str = "SimTime",
+) -> Optional[float]:
+    """Mean magnitude-squared coherence of ownship and lead car speed at low frequencies.
+
+    Parameters:
+        max_frequency: highest frequency (Hz) included in the mean
+        segment_length: length in seconds of the segments used by Welch's method
+        timecol: time column
+
+    Note: Requires data columns
+        - SimTime: Simulation time in seconds
+        - OwnshipVelocity and LeadCarVelocity, or XPos and HeadwayTime to derive them
+
+    Returns:
+        mean coherence (0 to 1) for frequencies up to `max_frequency`
+    """
+    try:
+        ownship, lead, interval = _followingSpeeds(drivedata, timecol)
+    except ColumnsMatchError:
+        return None
+    if len(ownship) < 4 or not interval > 0:
+        return None
+    nperseg = min(len(ownship), max(4, int(round(segment_length / interval))))
+    frequencies, coherence = signal.coherence(
+        ownship, lead, fs=1.0 / interval, nperseg=nperseg
+    )
+    band = (frequencies > 0) & (frequencies <= max_frequency)
+    if not band.any():
+        return None
+    return float(np.nanmean(coherence[band]))
 
 
 # find relative time where speed is within [mpsBound] of new speed limit
@@ -1,5 +1,6 @@
 import polars as pl
 import pydre.core
+import pydre.segments
 from pydre.core import ColumnsMatchError
 from pydre.metrics import registerMetric
 
@@ -36,7 +37,7 @@ def _check_and_prepare(drivedata: pydre.core.DriveData) -> pl.DataFrame:
     return df
 
 
-@registerMetric("gazeCutoutAngleDuration")
+@registerMetric("gazeCutoutAngleDuration", columntypes=pl.Float64)
 def gazeCutoutAngleDuration(drivedata: pydre.core.DriveData) -> float:
     """
     Returns the total duration (seconds) that the gaze was both
@@ -51,7 +52,7 @@ def gazeCutoutAngleDuration(drivedata: pydre.core.DriveData) -> float:
     return float(duration or 0.0)
 
 
-@registerMetric("gazeCutoutAngleRatio")
+@registerMetric("gazeCutoutAngleRatio", columntypes=pl.Float64)
 def gazeCutoutAngleRatio(drivedata: pydre.core.DriveData) -> float:
     """
     Fraction of total time spent outside the cutout angle (and off-target).
@@ -71,7 +72,7 @@ def gazeCutoutAngleRatio(drivedata: pydre.core.DriveData) -> float:
     return float(off_time / total_time)
 
 
-@registerMetric("gazeCutoutAngleViolations")
+@registerMetric("gazeCutoutAngleViolations", columntypes=pl.Int64)
 def gazeCutoutAngleViolations(drivedata: pydre.core.DriveData) -> int:
     """
     Counts the number of contiguous segments where the gaze was
@@ -79,17 +80,20 @@ def gazeCutoutAngleViolations(drivedata: pydre.core.DriveData) -> int:
 
     A new violation is counted when mask transitions from False → True.
     """
-    df = _check_and_prepare(drivedata)
-    if df.is_empty():
+    required_cols = ["DatTime", "gaze_cutout", "off_target"]
+    try:
+        drivedata.checkColumns(required_cols)
+    except ColumnsMatchError:
         return 0
 
-    df = df.with_columns(pl.col("mask").shift(1).fill_null(False).alias("prev_mask"))
-
-    violation_expr = (
-        pl.when((pl.col("mask") == True) & (pl.col("prev_mask") == False))
-        .then(1)
-        .otherwise(0)
+    # rows with missing values are skipped: they continue the preceding segment
+    mask = (
+        pl.when(pl.all_horizontal(pl.col(c).is_not_null() for c in required_cols))
+        .then(
+            pl.col("gaze_cutout").cast(pl.Boolean)
+            & pl.col("off_target").cast(pl.Boolean)
+        )
+        .fill_null(strategy="forward")
     )
-    violations = df.select(violation_expr.sum().alias("violations")).item() or 0
-
-    return int(violations)
+    runs = pydre.segments.runTable(drivedata, mask, timecol=None)
+    return runs.filter(pl.col("value")).height
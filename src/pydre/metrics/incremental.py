@@ -0,0 +1,366 @@
+"""Incremental versions of metrics, updated as new rows of a drive arrive.
+
+The metric functions in `pydre.metrics` compute their result from a complete `DriveData`
+frame. For a drive that is still being recorded, recomputing every metric from the start
+each time rows are added gets slower as the drive goes on. An incremental metric instead
+keeps a small *state* summarizing the rows seen so far:
+
+* `init()` returns the state for no rows,
+* `update(state, chunk)` adds the rows of `chunk`, in O(rows in the chunk),
+* `merge(a, b)` combines the states of two consecutive parts of a drive (`b` after `a`),
+* `finalize(state)` returns the metric value for all rows seen.
+
+An incremental metric is constructed with the same keyword arguments as its metric
+function and is registered under the same name with `registerIncremental`, so a project's
+metric definitions can be evaluated either way:
+
+```
+metric = pydre.metrics.metricsIncremental["colMean"](var="Velocity")
+state = metric.init()
+for chunk in chunks:
+    state = metric.update(state, chunk)
+value = metric.finalize(state)
+```
+
+A state of None means the metric cannot be computed, for example because a required
+column is missing or not numeric; the final value is then None, as for the metric function.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import polars as pl
+
+from pydre.metrics import registerIncremental
+
+
+class IncrementalMetric:
+    """Base class of incremental metrics.
+
+    Subclasses implement `init`, `summarize` (the state of a single chunk), `merge` and
+    `finalize`; `update` merges the summary of the new chunk into the current state.
+    States are immutable, so a state can be kept as a checkpoint and updated later.
+    """
+
+    required_columns: tuple[str, ...] = ()
+
+    def init(self) -> Any:
+        raise NotImplementedError
+
+    def summarize(self, chunk: pl.DataFrame) -> Any:
+        raise NotImplementedError
+
+    def merge(self, a: Any, b: Any) -> Any:
+        raise NotImplementedError
+
+    def finalize(self, state: Any) -> Any:
+        raise NotImplementedError
+
+    def update(self, state: Any, chunk: pl.DataFrame) -> Any:
+        if state is None:
+            return None
+        if not _numeric(chunk, self.required_columns):
+            return None
+        return self.merge(state, self.summarize(chunk))
+
+    def compute(self, chunks: Iterable[pl.DataFrame]) -> Any:
+        """Metric value over all rows of `chunks`, processed one chunk at a time."""
+        state = self.init()
+        for chunk in chunks:
+            state = self.update(state, chunk)
+        return self.finalize(state)
+
+
+def _numeric(chunk: pl.DataFrame, columns: Iterable[str]) -> bool:
+    schema = chunk.schema
+    return all(c in schema and schema[c].is_numeric() for c in columns)
+
+
+def _values(chunk: pl.DataFrame, var: str, cutoff: Optional[float]) -> pl.Series:
+    values = chunk.get_column(var).drop_nulls()
+    if cutoff is not None:
+        values = values.filter(values >= cutoff)
+    return values
+
+
+@dataclass(frozen=True)
+class Moments:
+    """Count, mean and sum of squared deviations (Welford's method)."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    @classmethod
+    def of(cls, values: pl.Series) -> Moments:
+        count = len(values)
+        if count == 0:
+            return cls()
+        mean = float(values.mean())
+        return cls(count, mean, float(((values - mean) ** 2).sum()))
+
+    def __add__(self, other: Moments) -> Moments:
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            return other
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        return Moments(
+            count,
+            self.mean + delta * other.count / count,
+            self.m2 + other.m2 + delta**2 * self.count * other.count / count,
+        )
+
+
+@registerIncremental("colMean")
+class ColMean(IncrementalMetric):
+    def __init__(self, var: str, cutoff: Optional[float] = None):
+        self.var = var
+        self.cutoff = cutoff
+        self.required_columns = (var,)
+
+    def init(self) -> Moments:
+        return Moments()
+
+    def summarize(self, chunk: pl.DataFrame) -> Moments:
+        return Moments.of(_values(chunk, self.var, self.cutoff))
+
+    def merge(self, a: Optional[Moments], b: Optional[Moments]) -> Optional[Moments]:
+        if a is None or b is None:
+            return None
+        return a + b
+
+    def finalize(self, state: Optional[Moments]) -> Optional[float]:
+        if state is None or state.count == 0:
+            return None
+        return state.mean
+
+
+@registerIncremental("colSD")
+class ColSD(ColMean):
+    def finalize(self, state: Optional[Moments]) -> Optional[float]:
+        if state is None or state.count < 2:
+            return None
+        # Bessel's correction, as in colSD
+        return math.sqrt(state.m2 / (state.count - 1))
+
+
+@registerIncremental("colMin")
+class ColMin(IncrementalMetric):
+    def __init__(self, var: str):
+        self.var = var
+        self.required_columns = (var,)
+
+    def init(self) -> tuple[Optional[float]]:
+        return (None,)
+
+    def summarize(self, chunk: pl.DataFrame) -> tuple[Optional[float]]:
+        return (chunk.get_column(self.var).min(),)
+
+    def merge(self, a, b):
+        if a is None or b is None:
+            return None
+        values = [v for v in (a[0], b[0]) if v is not None]
+        return (min(values) if values else None,)
+
+    def finalize(self, state) -> Optional[float]:
+        return None if state is None else state[0]
+
+
+@registerIncremental("colMax")
+class ColMax(ColMin):
+    def summarize(self, chunk: pl.DataFrame) -> tuple[Optional[float]]:
+        return (chunk.get_column(self.var).max(),)
+
+    def merge(self, a, b):
+        if a is None or b is None:
+            return None
+        values = [v for v in (a[0], b[0]) if v is not None]
+        return (max(values) if values else None,)
+
+
+@dataclass(frozen=True)
+class Digest:
+    """Sorted centroids (mean and weight) approximating a distribution, as in a t-digest.
+
+    Values are kept exactly until there are more than `buffer` centroids. The centroids
+    are then merged so that each covers a small share of the data near the tails and a
+    larger share near the middle, which keeps quantile estimates accurate with a bounded
+    number of centroids (about `compression / 2`).
+    """
+
+    means: np.ndarray
+    weights: np.ndarray
+
+    @classmethod
+    def empty(cls) -> Digest:
+        return cls(np.empty(0), np.empty(0))
+
+    @property
+    def count(self) -> float:
+        return float(self.weights.sum())
+
+    def merge(self, other: Digest, compression: int, buffer: int) -> Digest:
+        means = np.concatenate([self.means, other.means])
+        weights = np.concatenate([self.weights, other.weights])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        if len(means) <= buffer:
+            return Digest(means, weights)
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        # t-digest k1 scale function: one centroid per unit of k
+        k = compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        _, group = np.unique(np.floor(k), return_inverse=True)
+        group_weights = np.bincount(group, weights=weights)
+        group_means = np.bincount(group, weights=weights * means) / group_weights
+        return Digest(group_means, group_weights)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if len(self.means) == 0:
+            return None
+        centers = np.cumsum(self.weights) - self.weights / 2
+        return float(np.interp(q * self.count, centers, self.means))
+
+
+@registerIncremental("colMedian")
+class ColMedian(IncrementalMetric):
+    """Approximate median; exact while fewer than `buffer` values have been seen."""
+
+    compression = 500
+    buffer = 5000
+
+    def __init__(self, var: str, cutoff: Optional[float] = None):
+        self.var = var
+        self.cutoff = cutoff
+        self.required_columns = (var,)
+
+    def init(self) -> Digest:
+        return Digest.empty()
+
+    def summarize(self, chunk: pl.DataFrame) -> Digest:
+        values = _values(chunk, self.var, self.cutoff).cast(pl.Float64).to_numpy()
+        return Digest(values, np.ones(len(values)))
+
+    def merge(self, a: Optional[Digest], b: Optional[Digest]) -> Optional[Digest]:
+        if a is None or b is None:
+            return None
+        return a.merge(b, self.compression, self.buffer)
+
+    def finalize(self, state: Optional[Digest]) -> Optional[float]:
+        return None if state is None else state.quantile(0.5)
+
+
+@dataclass(frozen=True)
+class RunCount:
+    """Number of times a condition became true, with the rows at both ends of the data.
+
+    `first` and `last` are the condition on the first and last row seen (None for no rows
+    or a missing value). `first_counts` tells whether a transition at the first row would
+    be counted, for metrics that only count some transitions. Two consecutive parts of a
+    drive are merged by counting a transition between the last row of the first part and
+    the first row of the second.
+    """
+
+    count: int = 0
+    first: Optional[bool] = None
+    last: Optional[bool] = None
+    first_counts: bool = False
+    empty: bool = True
+
+    @classmethod
+    def of(cls, condition: pl.Series, counts: Optional[pl.Series] = None) -> RunCount:
+        if len(condition) == 0:
+            return cls()
+        if counts is None:
+            counts = condition
+        counts = counts.fill_null(False)
+        started = condition & condition.shift().not_() & counts
+        return cls(
+            int(started.sum()),
+            condition[0],
+            condition[-1],
+            bool(counts[0]),
+            False,
+        )
+
+    def __add__(self, other: RunCount) -> RunCount:
+        if other.empty:
+            return self
+        if self.empty:
+            return other
+        boundary = self.last is False and other.first is True and other.first_counts
+        return RunCount(
+            self.count + other.count + int(boundary),
+            self.first,
+            other.last,
+            self.first_counts,
+            False,
+        )
+
+
+class _RunCountMetric(IncrementalMetric):
+    def init(self) -> RunCount:
+        return RunCount()
+
+    def condition(self, chunk: pl.DataFrame) -> pl.Series:
+        raise NotImplementedError
+
+    def summarize(self, chunk: pl.DataFrame) -> RunCount:
+        return RunCount.of(self.condition(chunk))
+
+    def merge(self, a: Optional[RunCount], b: Optional[RunCount]):
+        if a is None or b is None:
+            return None
+        return a + b
+
+    def finalize(self, state: Optional[RunCount]) -> Optional[int]:
+        return None if state is None else state.count
+
+
+@registerIncremental("numbrakes")
+class NumBrakes(_RunCountMetric):
+    required_columns = ("Brake", "Velocity")
+
+    def __init__(self, cutofflimit: float = 1):
+        self.cutofflimit = cutofflimit
+
+    def summarize(self, chunk: pl.DataFrame) -> RunCount:
+        return RunCount.of(
+            chunk.get_column("Brake") > 0,
+            chunk.get_column("Velocity") > self.cutofflimit,
+        )
+
+
+@registerIncremental("laneViolations")
+class LaneViolations(_RunCountMetric):
+    def __init__(
+        self,
+        offset: str = "LaneOffset",
+        lane: int = 2,
+        lane_column: str = "Lane",
+        lane_width: float = 3.65,
+        car_width: float = 2.1,
+    ):
+        self.offset = offset
+        self.tolerance = lane_width / 2 - car_width / 2
+        self.required_columns = (offset,)
+
+    def condition(self, chunk: pl.DataFrame) -> pl.Series:
+        return chunk.get_column(self.offset).abs() > self.tolerance
+
+
+@registerIncremental("leadVehicleCollision")
+class LeadVehicleCollision(_RunCountMetric):
+    required_columns = ("SimTime", "HeadwayDistance")
+
+    def __init__(self, cutoff: float = 2.85):
+        self.cutoff = cutoff
+
+    def condition(self, chunk: pl.DataFrame) -> pl.Series:
+        return chunk.get_column("HeadwayDistance") <= self.cutoff
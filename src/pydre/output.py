@@ -0,0 +1,113 @@
+"""Writing and reading result tables in CSV, Parquet and Arrow IPC formats.
+
+The output format is chosen from the `output_format` config option if present, and
+otherwise from the output file extension:
+
+- `.csv` (and anything unrecognized): CSV
+- `.parquet`, `.pq`: Parquet, compressed and with column statistics
+- `.arrow`, `.ipc`, `.feather`: Arrow IPC
+
+If `output_partition_by` is set, the output file name is used as a directory and the
+results are written as Parquet files in a Hive-style layout, one directory per value of
+each partition column (e.g. `out/ScenarioName=Load/0.parquet`). Readers such as polars,
+pyarrow and duckdb can then skip partitions that a query does not need.
+"""
+
+from os import PathLike
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+import polars as pl
+from loguru import logger
+
+FORMAT_EXTENSIONS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "ipc",
+    ".ipc": "ipc",
+    ".feather": "ipc",
+}
+
+FORMATS = {"csv", "parquet", "ipc"}
+
+
+def _partitionColumns(config: Mapping[str, Any]) -> list[str]:
+    partition_by = config.get("output_partition_by", [])
+    if isinstance(partition_by, str):
+        return [partition_by]
+    return list(partition_by)
+
+
+def outputFormat(path: PathLike, config: Optional[Mapping[str, Any]] = None) -> str:
+    """Determine the output format for `path`: "csv", "parquet" or "ipc"."""
+    config = config or {}
+    configured = config.get("output_format")
+    if configured is not None:
+        configured = str(configured).lower()
+        if configured == "arrow":
+            configured = "ipc"
+        if configured in FORMATS:
+            return configured
+        logger.warning(f"Unknown output_format '{configured}', choosing by extension")
+    if _partitionColumns(config):
+        return "parquet"
+    return FORMAT_EXTENSIONS.get(Path(path).suffix.lower(), "csv")
+
+
+def writeResults(
+    results: pl.DataFrame,
+    path: PathLike,
+    config: Optional[Mapping[str, Any]] = None,
+) -> None:
+    """Write a result table in the format selected by `config` and the file extension.
+
+    Config options:
+        output_format: "csv", "parquet" or "ipc"/"arrow"; overrides the file extension
+        output_compression: compression codec for Parquet (default "zstd") or
+            Arrow IPC (default "uncompressed")
+        output_partition_by: column name or list of column names; writes a Hive
+            partitioned Parquet directory at `path`
+    """
+    config = config or {}
+    fmt = outputFormat(path, config)
+    partition_by = _partitionColumns(config)
+    if partition_by and fmt != "parquet":
+        logger.warning("output_partition_by is only supported for Parquet output")
+        partition_by = []
+    missing = [c for c in partition_by if c not in results.columns]
+    if missing:
+        logger.warning(f"Partition columns {missing} not in results, not partitioning")
+        partition_by = []
+
+    if fmt == "parquet":
+        compression = config.get("output_compression", "zstd")
+        if partition_by:
+            Path(path).mkdir(parents=True, exist_ok=True)
+            results.write_parquet(
+                path,
+                compression=compression,
+                statistics=True,
+                partition_by=partition_by,
+            )
+        else:
+            results.write_parquet(path, compression=compression, statistics=True)
+    elif fmt == "ipc":
+        results.write_ipc(
+            path, compression=config.get("output_compression", "uncompressed")
+        )
+    else:
+        results.write_csv(path)
+
+
+def readResults(path: PathLike) -> pl.DataFrame:
+    """Read a result table written by `writeResults`, detecting the format from the path."""
+    path = Path(path)
+    if path.is_dir():
+        return pl.read_parquet(path, hive_partitioning=True)
+    fmt = FORMAT_EXTENSIONS.get(path.suffix.lower(), "csv")
+    if fmt == "parquet":
+        return pl.read_parquet(path)
+    elif fmt == "ipc":
+        return pl.read_ipc(path)
+    return pl.read_csv(path)
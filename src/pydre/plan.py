@@ -0,0 +1,415 @@
+"""Compiled project plans.
+
+A project definition (the filters, ROIs and metrics read from a project file) is compiled
+once into an immutable `ProjectPlan` before any data file is processed. Compilation
+resolves every filter and metric function, checks the keyword arguments of each definition
+against the signature of its function, builds the ROI processors and records the output
+column layout. Malformed definitions are therefore reported at startup instead of partway
+through a run, and workers only execute the prepared steps.
+"""
+
+from __future__ import annotations
+
+import copy
+import inspect
+import math
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional, Sequence
+
+import polars as pl
+from loguru import logger
+
+import pydre.core
+import pydre.filters
+import pydre.metrics
+import pydre.rois
+
+
+class ProjectDefinitionError(KeyError):
+    """Exception when a filter, ROI or metric definition in a project cannot be compiled"""
+
+    def __init__(self, message: str, problems: Optional[list[str]] = None):
+        super().__init__(message)
+        self.message = message
+        self.problems = problems or [message]
+
+    def __str__(self) -> str:
+        return self.message
+
+
+def _checkArguments(func: Callable, kwargs: Mapping[str, Any]) -> None:
+    """Raise TypeError if `func` cannot be called with a DriveData object and `kwargs`."""
+    try:
+        signature = inspect.signature(func)
+    except (TypeError, ValueError):
+        # builtins and some C extensions have no inspectable signature
+        return
+    signature.bind(None, **kwargs)
+
+
+def _splitDefinition(definition: Mapping[str, Any], kind: str) -> tuple[str, dict]:
+    if not isinstance(definition, Mapping):
+        raise ProjectDefinitionError(f"Malformed {kind} definition: {definition!r}")
+    if "function" not in definition:
+        raise ProjectDefinitionError(
+            f'{kind.capitalize()} definitions require a "function". '
+            f"Malformed {kind} definition: {dict(definition)}"
+        )
+    kwargs = copy.deepcopy(dict(definition))
+    func_name = kwargs.pop("function")
+    kwargs.pop("name", None)
+    return func_name, kwargs
+
+
+@dataclass(frozen=True)
+class FilterStep:
+    """A filter function with its bound keyword arguments."""
+
+    name: str
+    function_name: str
+    func: Callable[..., pydre.core.DriveData]
+    kwargs: Mapping[str, Any]
+
+    def run(self, drivedata: pydre.core.DriveData) -> pydre.core.DriveData:
+        return self.func(drivedata, **self.kwargs)
+
+
+@dataclass(frozen=True)
+class MetricStep:
+    """A metric function with its bound keyword arguments and output columns."""
+
+    name: str
+    function_name: str
+    func: Callable[..., Any]
+    kwargs: Mapping[str, Any]
+    columns: tuple[str, ...]
+    multi_column: bool
+    # declared dtype for each column in `columns`, None where undeclared
+    dtypes: tuple[Optional[pl.DataType], ...] = ()
+
+    def run(self, drivedata: pydre.core.DriveData) -> dict[str, Any]:
+        if self.multi_column:
+            return dict(zip(self.columns, self.func(drivedata, **self.kwargs)))
+        return {self.name: self.func(drivedata, **self.kwargs)}
+
+
+@dataclass(frozen=True)
+class RoiStep:
+    """An ROI definition with its processor constructed once for the whole run.
+
+    `processor` is None for unknown ROI types, which pass the data through unchanged.
+    """
+
+    name: str
+    roi_type: str
+    definition: Mapping[str, Any]
+    processor: Optional[Any]
+
+    def split(self, drivedata: pydre.core.DriveData) -> list[pydre.core.DriveData]:
+        if self.processor is None:
+            return [drivedata]
+        return list(self.processor.split(drivedata))
+
+
+@dataclass(frozen=True)
+class ProjectPlan:
+    """Immutable, validated form of a project definition."""
+
+    filters: tuple[FilterStep, ...]
+    rois: tuple[RoiStep, ...]
+    metrics: tuple[MetricStep, ...]
+
+    @property
+    def metric_columns(self) -> tuple[str, ...]:
+        """Output columns produced by the metrics, in project order."""
+        columns: list[str] = []
+        for metric in self.metrics:
+            for column in metric.columns:
+                if column not in columns:
+                    columns.append(column)
+        return tuple(columns)
+
+    @property
+    def output_columns(self) -> tuple[str, ...]:
+        """Output columns after the per-file metadata columns."""
+        return ("ROI",) + self.metric_columns
+
+    @property
+    def result_schema(self) -> dict[str, pl.DataType]:
+        """Declared dtypes of the output columns. Undeclared metric columns are omitted."""
+        schema: dict[str, pl.DataType] = {"ROI": pl.String}
+        for metric in self.metrics:
+            for column, dtype in zip(metric.columns, metric.dtypes):
+                if dtype is not None:
+                    schema.setdefault(column, dtype)
+        return schema
+
+
+def compileFilter(definition: Mapping[str, Any]) -> FilterStep:
+    """Resolve and validate a single filter definition."""
+    func_name, kwargs = _splitDefinition(definition, "filter")
+    try:
+        func = pydre.filters.filtersList[func_name]
+    except KeyError:
+        raise ProjectDefinitionError(f"Unknown filter function '{func_name}'")
+    name = definition.get("name", func_name)
+    try:
+        _checkArguments(func, kwargs)
+    except TypeError as e:
+        raise ProjectDefinitionError(
+            f"Bad arguments for filter '{name}' ({func_name}): {e}"
+        )
+    return FilterStep(name, func_name, func, MappingProxyType(kwargs))
+
+
+def _sweepValues(spec: Any) -> Optional[list]:
+    """Values of a swept metric argument, or None if `spec` is not a sweep.
+
+    A sweep is written as `{ sweep = [values...] }` or `{ start = a, stop = b, step = c }`
+    (`stop` included).
+    """
+    if not isinstance(spec, Mapping):
+        return None
+    if (
+        set(spec) == {"sweep"}
+        and isinstance(spec["sweep"], Sequence)
+        and not isinstance(spec["sweep"], str)
+    ):
+        return list(spec["sweep"])
+    if set(spec) == {"start", "stop", "step"}:
+        start, stop, step = spec["start"], spec["stop"], spec["step"]
+        if step <= 0 or stop < start:
+            raise ProjectDefinitionError(f"Bad sweep range {dict(spec)}")
+        count = math.floor((stop - start) / step + 1e-9) + 1
+        return [round(start + i * step, 10) for i in range(count)]
+    return None
+
+
+def sweepColumnName(name: str, parameter: str, value: Any) -> str:
+    """Output column of metric `name` evaluated with `parameter` set to `value`."""
+    if isinstance(value, float):
+        value = f"{value:g}"
+    return f"{name}_{parameter}_{value}"
+
+
+@dataclass(frozen=True)
+class SweepFunction:
+    """Metric evaluated for every value of a swept argument, returning one result per value.
+
+    Uses the metric's registered sweep function if it has one, otherwise calls the metric
+    once per value.
+    """
+
+    func: Callable[..., Any]
+    parameter: str
+    values: tuple
+    sweep_func: Optional[Callable[..., Sequence[Any]]] = None
+
+    def __call__(self, drivedata: pydre.core.DriveData, **kwargs) -> list[Any]:
+        if self.sweep_func is not None:
+            return list(self.sweep_func(drivedata, list(self.values), **kwargs))
+        return [
+            self.func(drivedata, **kwargs, **{self.parameter: value})
+            for value in self.values
+        ]
+
+
+def compileMetric(definition: Mapping[str, Any]) -> MetricStep:
+    """Resolve and validate a single metric definition.
+
+    An argument given as a sweep (see `_sweepValues`) expands the metric into one output
+    column per value, named by `sweepColumnName`.
+    """
+    func_name, kwargs = _splitDefinition(definition, "metric")
+    if "name" not in definition:
+        raise ProjectDefinitionError(
+            'Metric definitions require both "name" and "function". '
+            f"Malformed metrics definition: {dict(definition)}"
+        )
+    name = definition["name"]
+    try:
+        func = pydre.metrics.metricsList[func_name]
+        col_names = pydre.metrics.metricsColNames[func_name]
+    except KeyError:
+        raise ProjectDefinitionError(f"Unknown metric function '{func_name}'")
+    sweeps = {k: v for k, v in kwargs.items() if _sweepValues(v) is not None}
+    if sweeps:
+        return _compileSweep(name, func_name, func, col_names, kwargs, sweeps)
+    try:
+        _checkArguments(func, kwargs)
+    except TypeError as e:
+        raise ProjectDefinitionError(
+            f"Bad arguments for metric '{name}' ({func_name}): {e}"
+        )
+    multi_column = len(col_names) > 1
+    columns = tuple(col_names) if multi_column else (name,)
+    col_types = pydre.metrics.metricsColTypes.get(func_name) or [None] * len(columns)
+    return MetricStep(
+        name,
+        func_name,
+        func,
+        MappingProxyType(kwargs),
+        columns,
+        multi_column,
+        tuple(col_types),
+    )
+
+
+def _compileSweep(
+    name: str,
+    func_name: str,
+    func: Callable[..., Any],
+    col_names: Sequence[str],
+    kwargs: dict[str, Any],
+    sweeps: dict[str, Any],
+) -> MetricStep:
+    if len(sweeps) > 1:
+        raise ProjectDefinitionError(
+            f"Metric '{name}' sweeps {sorted(sweeps)}; only one argument can be swept"
+        )
+    if len(col_names) > 1:
+        raise ProjectDefinitionError(
+            f"Metric '{name}' ({func_name}) returns several columns and cannot be swept"
+        )
+    parameter, spec = next(iter(sweeps.items()))
+    values = _sweepValues(spec)
+    if len(values) == 0:
+        raise ProjectDefinitionError(
+            f"Metric '{name}' sweeps {parameter} over no values"
+        )
+    del kwargs[parameter]
+    try:
+        _checkArguments(func, {**kwargs, parameter: values[0]})
+    except TypeError as e:
+        raise ProjectDefinitionError(
+            f"Bad arguments for metric '{name}' ({func_name}): {e}"
+        )
+    sweep_func = None
+    registered = pydre.metrics.metricsSweep.get(func_name)
+    if registered is not None and registered[0] == parameter:
+        sweep_func = registered[1]
+    columns = tuple(sweepColumnName(name, parameter, v) for v in values)
+    col_types = pydre.metrics.metricsColTypes.get(func_name) or [None]
+    return MetricStep(
+        name,
+        func_name,
+        SweepFunction(func, parameter, tuple(values), sweep_func),
+        MappingProxyType(kwargs),
+        columns,
+        True,
+        tuple(col_types) * len(columns),
+    )
+
+
+def compileRoi(
+    definition: Mapping[str, Any], resolve_file: Callable[[Any], Any]
+) -> RoiStep:
+    """Validate an ROI definition and construct its processor.
+
+    Parameters:
+        definition: ROI definition from the project file
+        resolve_file: function used to resolve ROI filenames relative to the project file
+    """
+    if not isinstance(definition, Mapping) or "type" not in definition:
+        raise ProjectDefinitionError(f'ROI definitions require a "type": {definition}')
+    roi_type = definition["type"]
+    name = definition.get("name", roi_type)
+    processor: Optional[Any]
+    try:
+        if roi_type == "time":
+            filename = resolve_file(definition["filename"])
+            if "timecol" in definition:
+                processor = pydre.rois.TimeROI(filename, definition["timecol"])
+            else:
+                processor = pydre.rois.TimeROI(filename)
+        elif roi_type == "rect":
+            processor = pydre.rois.SpaceROI(resolve_file(definition["filename"]))
+        elif roi_type == "column":
+            processor = pydre.rois.ColumnROI(definition["columnname"])
+        else:
+            logger.warning("Unknown ROI type {}".format(roi_type))
+            processor = None
+    except KeyError as e:
+        raise ProjectDefinitionError(
+            f"ROI '{name}' of type '{roi_type}' is missing field {e}"
+        )
+    except (OSError, ValueError, TypeError, pl.exceptions.PolarsError) as e:
+        # a missing or malformed ROI file; other errors are bugs and propagate
+        raise ProjectDefinitionError(f"Could not load ROI '{name}': {e}")
+    return RoiStep(name, roi_type, MappingProxyType(dict(definition)), processor)
+
+
+def compilePlan(
+    definition: Mapping[str, Any],
+    resolve_file: Callable[[Any], Any] = lambda f: f,
+) -> ProjectPlan:
+    """Compile a restructured project definition into a `ProjectPlan`.
+
+    All problems in the definition are collected and reported together.
+
+    Parameters:
+        definition: project definition with "filters", "rois" and "metrics" lists
+        resolve_file: function used to resolve filenames relative to the project file
+
+    Returns:
+        The compiled plan
+
+    Raises:
+        ProjectDefinitionError: if any definition is malformed
+    """
+    problems: list[str] = []
+
+    def collect(compile_func, items, *args):
+        steps = []
+        for item in items:
+            try:
+                steps.append(compile_func(item, *args))
+            except ProjectDefinitionError as e:
+                problems.append(e.message)
+        return tuple(steps)
+
+    filters = collect(compileFilter, definition.get("filters", []))
+    rois = collect(compileRoi, definition.get("rois", []), resolve_file)
+    metrics = collect(compileMetric, definition.get("metrics", []))
+
+    if len(problems) > 0:
+        for problem in problems:
+            logger.error(problem)
+        raise ProjectDefinitionError(
+            f"Project definition has {len(problems)} error(s): " + "; ".join(problems),
+            problems,
+        )
+    return ProjectPlan(filters, rois, metrics)
+
+
+def buildResultFrame(
+    columns: Mapping[str, Sequence[Any]], schema: Mapping[str, pl.DataType]
+) -> pl.DataFrame:
+    """Assemble result columns into a DataFrame.
+
+    Columns listed in `schema` are built with that dtype directly, without inference.
+    Other columns (per-file metadata and metrics without declared types) are inferred
+    from all of their values. If a metric returns a value that does not fit its declared
+    dtype, a warning is logged and the column is inferred instead.
+
+    Parameters:
+        columns: column name -> values, all of the same length
+        schema: declared column dtypes, usually `ProjectPlan.result_schema`
+    """
+    series = []
+    for column, values in columns.items():
+        dtype = schema.get(column)
+        if dtype is None:
+            series.append(pl.Series(column, values, strict=False))
+            continue
+        try:
+            series.append(
+                pl.Series(column, values, dtype=dtype, strict=column != "ROI")
+            )
+        except (TypeError, pl.exceptions.PolarsError) as e:
+            logger.warning(
+                f"Values of {column} do not match declared type {dtype}, inferring: {e}"
+            )
+            series.append(pl.Series(column, values, strict=False))
+    return pl.DataFrame(series)
@@ -1,4 +1,3 @@
-import copy
 import json
 import traceback
 import os
@@ -9,13 +8,17 @@ import polars.exceptions
 import sys
 import tomllib
 from typing import Optional
+import pydre.catalog
 import pydre.core
+import pydre.index
+import pydre.output
+import pydre.plan
+import pydre.schema
+import pydre.shards
 import pydre.rois
 import pydre.metrics
 from pydre.core import DriveData
-from pydre.metrics import *
 import pydre.filters
-from pydre.filters import *
 import pathlib
 from pathlib import Path
 from loguru import logger
@@ -24,12 +27,31 @@ import concurrent.futures
 import importlib.util
 import threading
 
+# custom metric/filter files already executed in this process, with their modification times
+_loadedCustomModules: dict[Path, int] = {}
+
+
+def _customModuleLoaded(module_file: Path) -> bool:
+    """True if the file was already executed in this process and has not changed since."""
+    return (
+        _loadedCustomModules.get(module_file.resolve())
+        == module_file.stat().st_mtime_ns
+    )
+
+
+def _markCustomModuleLoaded(module_file: Path) -> None:
+    _loadedCustomModules[module_file.resolve()] = module_file.stat().st_mtime_ns
+
 
 class Project:
     project_filename: Path  # used only for information
     definition: dict
     results: Optional[pl.DataFrame]
     filelist: list[PathLike]
+    plan: Optional[pydre.plan.ProjectPlan]
+    schema: Optional[pydre.schema.SchemaRegistry]
+    normalized_dtypes: dict[str, pl.DataType]
+    index: Optional[pydre.index.FileIndex]
 
     def __init__(
         self,
@@ -42,6 +64,10 @@ class Project:
         self.config = {}
         self.results = None
         self.filelist = []
+        self.plan = None
+        self.schema = None
+        self.normalized_dtypes = {}
+        self.index = None
         try:
             logger.info("Loading project from: " + str(self.project_filename))
             with open(self.project_filename, "rb") as project_file:
@@ -123,9 +149,32 @@ class Project:
         # Configure logging from TOML [config]
         self._configure_logging()
 
+        # Column types shared by all data files; see pydre.schema
+        self.schema = pydre.schema.SchemaRegistry.fromConfig(
+            self.config, self.project_filename.parent
+        )
+        self.normalized_dtypes = pydre.schema.normalizedDtypes(self.config)
+
         self._load_custom_functions()
 
-        # resolve the file paths
+        self.filelist = self.findDatafiles()
+
+    def findDatafiles(self) -> list[PathLike]:
+        """
+        Resolve the data files of the project from its `datafiles` patterns.
+
+        The `catalog`, `ignore` and `select` options are applied. Called once when the project
+        is loaded; call it again to pick up files added since.
+
+        Returns:
+            data file paths, in pattern order
+        """
+        # resolve the file paths, through the catalog if the project uses one
+        datafile_type = self.config.get("datafile_type", "rti")
+        catalog = None
+        if "catalog" in self.config:
+            catalog = pydre.catalog.Catalog(self.resolve_file(self.config["catalog"]))
+            self.index = pydre.index.FileIndex(datafile_type)
         filelist: list[PathLike] = []
         for fn in self.config.get("datafiles", []):
             # convert relative path to absolute path
@@ -134,25 +183,40 @@ class Project:
                 datapath = pathlib.Path(self.project_filename.parent / fn).resolve()
             else:
                 datapath = fn
-            datafiles = sorted(datapath.parent.glob(datapath.name))
-            filelist.extend(datafiles)
-
-        ignore_files: list[PathLike] = []
-        for fn in self.config.get("ignore", []):
-            fn = Path(fn)
-            ignore_files.append(fn)
-
+            if catalog is not None:
+                for info in catalog.refresh(datapath, datafile_type):
+                    self.index.add(info)
+                    filelist.append(info.path)
+            else:
+                datafiles = sorted(datapath.parent.glob(datapath.name))
+                filelist.extend(datafiles)
+        if catalog is not None:
+            catalog.close()
+
+        selected: list[PathLike] = []
+        ignore_matcher = pydre.catalog.ignoreMatcher(self.config.get("ignore", []))
+        selection = self.config.get("select", {})
         for potential_file in filelist:
-            include_file = True
-            for ignore_file in ignore_files:
-                if str(ignore_file) in str(potential_file):
-                    logger.info(f"Ignoring file {potential_file} based on ignore list.")
-                    include_file = False
-            if include_file:
-                self.filelist.append(potential_file)
-
-        if len(self.filelist) == 0 and len(filelist) > 0:
+            if ignore_matcher is not None and ignore_matcher.search(
+                str(potential_file)
+            ):
+                logger.info(f"Ignoring file {potential_file} based on ignore list.")
+                continue
+            if selection:
+                if self.index is not None and potential_file in self.index:
+                    metadata = self.index.get(potential_file).metadata
+                else:
+                    metadata = pydre.index.initDriveData(
+                        Path(potential_file), datafile_type
+                    ).metadata
+                if not pydre.catalog.matchesSelection(metadata, selection):
+                    logger.debug(f"{potential_file} not in selection, skipping.")
+                    continue
+            selected.append(potential_file)
+
+        if len(selected) == 0 and len(filelist) > 0:
             logger.error("No data files left after removing ignored files.")
+        return selected
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
@@ -164,6 +228,23 @@ class Project:
         else:
             return False
 
+    def selectShard(self, index: int, count: int) -> None:
+        """
+        Restrict the project to one shard of its data files and name the output file after it.
+
+        Args:
+            index: 1-based shard number
+            count: total number of shards
+        """
+        self.filelist = pydre.shards.shardFiles(self.filelist, index, count)
+        self.config["outputfile"] = pydre.shards.shardOutputName(
+            self.config["outputfile"], index, count
+        )
+        logger.info(
+            f"Shard {index}/{count}: processing {len(self.filelist)} files, "
+            f"writing {self.config['outputfile']}"
+        )
+
     @staticmethod
     def __restructureProjectDefinition(def_dict: dict) -> list:
         new_def = []
@@ -191,6 +272,9 @@ class Project:
 
             # Process all Python files in the directory
             for metrics_file in metrics_path.glob("*.py"):
+                if _customModuleLoaded(metrics_file):
+                    logger.debug(f"Custom metrics from {metrics_file} already loaded")
+                    continue
                 try:
                     # Create a module name
                     module_name = f"custom_metrics_{metrics_file.stem}"
@@ -205,6 +289,7 @@ class Project:
                     spec.loader.exec_module(module)
 
                     # The @registerMetric decorator will automatically register the metrics
+                    _markCustomModuleLoaded(metrics_file)
                     logger.info(f"Successfully loaded metrics from {metrics_file}")
                 except Exception as e:
                     logger.exception(
@@ -222,6 +307,9 @@ class Project:
                 continue
             logger.info(f"Loading custom filters from: {filters_path}")
             for filters_file in filters_path.glob("*.py"):
+                if _customModuleLoaded(filters_file):
+                    logger.debug(f"Custom filters from {filters_file} already loaded")
+                    continue
                 try:
                     module_name = f"custom_filters_{filters_file.stem}"
                     spec = importlib.util.spec_from_file_location(
@@ -232,6 +320,7 @@ class Project:
                         continue
                     module = importlib.util.module_from_spec(spec)
                     spec.loader.exec_module(module)
+                    _markCustomModuleLoaded(filters_file)
                     logger.info(f"Successfully loaded filters from {filters_file}")
                 except Exception as e:
                     logger.exception(
@@ -353,6 +442,8 @@ class Project:
         """
         Handles running any filter definition
 
+        Filters run as part of `processDatafiles` use the compiled project plan instead.
+
         Args:
             datafilter: A dict containing the function of a filter and the parameters to process it
             datafile: drive data object to process with the filter
@@ -360,24 +451,19 @@ class Project:
         Returns:
             The augmented DriveData object
         """
-        ldatafilter = copy.deepcopy(datafilter)
         try:
-            func_name = ldatafilter.pop("function")
-            filter_func = pydre.filters.filtersList[func_name]
-            datafilter_name = ldatafilter.pop("name")
-        except KeyError as e:
-            logger.error(
-                'Filter definitions require a "function". Malformed filters definition: missing '
-                + str(e)
-            )
+            step = pydre.plan.compileFilter(datafilter)
+        except pydre.plan.ProjectDefinitionError as e:
+            logger.error(str(e))
             raise e
-
-        return filter_func(datafile, **ldatafilter)
+        return step.run(datafile)
 
     def processMetric(self, metric: dict, dataset: pydre.core.DriveData) -> dict:
         """
         Handles running any metric definition
 
+        Metrics run as part of `processDatafiles` use the compiled project plan instead.
+
         Args:
             metric: A dict containing the function of a metric and the parameters to process it
             dataset: drive data object to process with the metric
@@ -385,28 +471,88 @@ class Project:
         Returns:
             A dictionary containing the results of the metric
         """
-
-        metric = copy.deepcopy(metric)
         try:
-            func_name = metric.pop("function")
-            metric_func = pydre.metrics.metricsList[func_name]
-            report_name = metric.pop("name")
-            col_names = pydre.metrics.metricsColNames[func_name]
-        except KeyError as e:
-            logger.warning(
-                'Metric definitions require both "name" and "function". Malformed metrics definition'
-            )
+            step = pydre.plan.compileMetric(metric)
+        except pydre.plan.ProjectDefinitionError as e:
+            logger.warning(str(e))
             raise e
+        return step.run(dataset)
 
-        metric_dict = dict()
-        if len(col_names) > 1:
-            x = metric_func(dataset, **metric)
-            metric_dict = dict(zip(col_names, x))
-        else:
-            # report = pl.DataFrame(
-            #    [metric_func(dataset, **metric) ], schema=[report_name, ])
-            metric_dict[report_name] = metric_func(dataset, **metric)
-        return metric_dict
+    def scanFiles(self) -> list[pydre.index.FileInfo]:
+        """
+        Read the header line and filename metadata of every data file, without parsing data.
+
+        Files missing any of the `required_columns` listed in the config are removed from
+        the file list. Columns referenced by ROIs and metrics that some files lack are
+        reported, since they may still be created by a filter.
+
+        Returns:
+            index entries of the files left in the file list
+        """
+        if self.index is None:
+            self.index = pydre.index.FileIndex(self.config.get("datafile_type", "rti"))
+        infos = self.index.scan(self.filelist)
+
+        required = self.config.get("required_columns", [])
+        compatible = []
+        for info in infos:
+            missing = info.missingColumns(required)
+            if missing:
+                logger.warning(
+                    f"Skipping {info.path}: missing required columns {missing}"
+                )
+            else:
+                compatible.append(info)
+
+        for column, steps in pydre.index.referencedColumns(self.compilePlan()).items():
+            lacking = [info for info in compatible if column not in info.columns]
+            if lacking:
+                logger.warning(
+                    f"{len(lacking)} of {len(compatible)} files have no column {column}, "
+                    f"used by {', '.join(steps)}. It must be created by a filter."
+                )
+
+        if len(compatible) < len(self.filelist):
+            logger.info(
+                f"Header scan kept {len(compatible)} of {len(self.filelist)} files"
+            )
+        self.filelist = [info.path for info in compatible]
+        return compatible
+
+    def compilePlan(self) -> pydre.plan.ProjectPlan:
+        """
+        Compile the project definition into an immutable plan, validating every filter, ROI and metric.
+
+        The plan is compiled once and reused for every file.
+
+        Returns:
+            The compiled project plan
+
+        Raises:
+            pydre.plan.ProjectDefinitionError: if any definition in the project is malformed
+        """
+        if getattr(self, "plan", None) is None:
+            self.plan = pydre.plan.compilePlan(self.definition, self.resolve_file)
+        return self.plan
+
+    def planSources(self) -> list[pathlib.Path]:
+        """
+        Files read when the plan is compiled: the project file, custom metric and filter
+        modules and ROI files.
+
+        A compiled plan is out of date once any of these files changes.
+        """
+        sources = [self.project_filename.resolve()]
+        for key in ("custom_metrics_dirs", "custom_filters_dirs"):
+            dirs = self.config.get(key, [])
+            if isinstance(dirs, str):
+                dirs = [dirs]
+            for custom_dir in dirs:
+                sources.extend(sorted(self.resolve_file(custom_dir).glob("*.py")))
+        for roi in self.definition.get("rois", []):
+            if isinstance(roi, dict) and "filename" in roi:
+                sources.append(self.resolve_file(roi["filename"]))
+        return sources
 
     @staticmethod
     def __clean(src_str: str) -> str:
@@ -453,11 +599,22 @@ class Project:
 
         logger.info(f"Using {numThreads} threads for processing")
 
-        results_list: list[dict] = []  # results_list = []
+        result_frames: list[pl.DataFrame] = []
 
         # STOP FLAG
         self._stop_event = threading.Event()
 
+        # Compile the definition before touching any data so that malformed
+        # definitions are reported once, up front.
+        plan = self.compilePlan()
+        # Drop files without the required columns before parsing any of them
+        self.scanFiles()
+
+        for roi_step in plan.rois:
+            # Inject the stop flag so ROI code can silence logs after Ctrl+C
+            if roi_step.processor is not None:
+                roi_step.processor._stop_event = self._stop_event
+
         with tqdm(total=len(self.filelist)) as pbar:
             with concurrent.futures.ThreadPoolExecutor(
                 max_workers=numThreads
@@ -472,11 +629,9 @@ class Project:
                         arg = futures[future]
                         try:
                             # Collect result only ONCE; this will re-raise any worker exception.
-                            per_file_rows = (
-                                future.result()
-                            )  # list[dict] from processSingleFile
-                            # Extend the global accumulator with this file's rows.
-                            results_list.extend(per_file_rows)
+                            per_file_results = future.result()
+                            if per_file_results.height > 0:
+                                result_frames.append(per_file_results)
                         except KeyboardInterrupt:
                             self._stop_event.set()  # STOP FLAG
                             # User hit Ctrl+C: log, cancel outstanding work, and re-raise to abort.
@@ -501,25 +656,17 @@ class Project:
                     logger.critical("Aborted by user (Ctrl+C).")
 
         # Postconditions: convert to a Polars DataFrame
-        if len(results_list) == 0:
+        if len(result_frames) == 0:
             logger.error("No results found; no metrics data generated")
             return (
                 pl.DataFrame()
             )  # return empty DataFrame to keep return type consistent
 
-        infer_schema_length = self.config.get("infer_schema_length", 5000)
-        try:
-            infer_schema_length = int(infer_schema_length)
-            logger.info(f"Using infer_schema_length={infer_schema_length}")
-        except (TypeError, ValueError):
-            logger.warning(
-                f"Invalid infer_schema_length={infer_schema_length}, defaulting to 5000"
-            )
-            infer_schema_length = 5000
-
-        result_dataframe = pl.from_dicts(
-            results_list, infer_schema_length=infer_schema_length
-        )
+        # Per-file frames share the declared column types; columns whose types were
+        # inferred per file are cast to a common supertype
+        result_dataframe = pl.concat(result_frames, how="diagonal_relaxed")
+        if self.schema is not None:
+            self.schema.save()
 
         # sorting_columns = ["Subject", "ScenarioName", "ROI"]
         # try:
@@ -530,48 +677,109 @@ class Project:
         self.results = result_dataframe
         return result_dataframe
 
-    def processSingleFile(self, datafilename: Path):
-        if getattr(self, "_stop_event", None) and self._stop_event.is_set():
-            return []
+    def loadDatafile(self, datafilename: Path) -> DriveData:
+        """
+        Load a single data file into a DriveData object according to the project's datafile_type.
+
+        If the project has a `datafile_cache` (a `pydre.core.DriveDataCache`), previously
+        loaded files are taken from the cache as long as they have not changed on disk.
+
+        Args:
+            datafilename: path of the data file
+
+        Returns:
+            DriveData object containing the file's data and filename metadata
+        """
+        cache: Optional[pydre.core.DriveDataCache] = getattr(
+            self, "datafile_cache", None
+        )
+        cache_key = None
+        if cache is not None:
+            cache_key = self._datafileCacheKey(datafilename)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info("Using cached data for file {}".format(datafilename))
+                cached.config = self.config
+                return cached
+
         logger.info("Loading file {}".format(datafilename))
-        if "datafile_type" in self.config:
-            if self.config["datafile_type"] == "rti":
-                datafile = DriveData.init_rti(datafilename)
-            elif self.config["datafile_type"] == "oldrti":
-                datafile = DriveData.init_old_rti(datafilename)
-            elif self.config["datafile_type"] == "scanner":
-                datafile = DriveData.init_scanner(datafilename)
-            else:
-                logger.warning(
-                    f"Unknown datafile type {self.config['datafile_type']}, processing as RTI .dat file."
-                )
-                datafile = DriveData.init_rti(datafilename)
-        else:
-            datafile = DriveData.init_rti(datafilename)
+        datafile_type = self.config.get("datafile_type", "rti")
+        if datafile_type not in pydre.index.FILE_FORMATS:
+            logger.warning(
+                f"Unknown datafile type {datafile_type}, processing as RTI .dat file."
+            )
+        datafile = pydre.index.initDriveData(datafilename, datafile_type)
         datafile.config = self.config
-        datafile.loadData()
-        roi_datalist = []
-        results_list = []
+        datafile.loadData(getattr(self, "schema", None))
+        datafile.data = pydre.schema.normalizeDtypes(
+            datafile.data, getattr(self, "normalized_dtypes", {})
+        )
+        if cache is not None:
+            cache.put(cache_key, datafile)
+        return datafile
+
+    def _datafileCacheKey(self, datafilename: Path) -> tuple:
+        """Identity of a loaded data file: its path and stat, plus the options that affect loading."""
+        path = Path(datafilename).resolve()
+        stat = path.stat()
+        return (
+            str(path),
+            stat.st_mtime_ns,
+            stat.st_size,
+            self.config.get("datafile_type", "rti"),
+            str(self.config.get("infer_schema_length", "")),
+            self.schema.fingerprint() if getattr(self, "schema", None) else "",
+            str(sorted(getattr(self, "normalized_dtypes", {}).items())),
+        )
 
-        if "filters" in self.definition:
-            for datafilter in self.definition["filters"]:
-                try:
-                    datafile = self.processFilter(datafilter, datafile)
-                except Exception as e:
-                    logger.exception(
-                        "Unhandled exception in {} while processing {}.".format(
-                            datafilter, datafilename
-                        )
+    def processSingleFile(self, datafilename: Path) -> pl.DataFrame:
+        """
+        Run the filters, ROIs and metrics on one data file.
+
+        Returns:
+            one row per ROI: the file metadata, the ROI name and the metric columns.
+            Empty if no ROI produced results.
+        """
+        if getattr(self, "_stop_event", None) and self._stop_event.is_set():
+            return pl.DataFrame()
+        datafile = self.loadDatafile(datafilename)
+        return self.processDriveData(datafile, datafilename)
+
+    def processDriveData(
+        self, datafile: DriveData, datafilename: Path, first_filter: int = 0
+    ) -> pl.DataFrame:
+        """
+        Run the filters, ROIs and metrics on a loaded data file.
+
+        Args:
+            datafile: the loaded data file
+            datafilename: path of the data file, for log messages
+            first_filter: number of the project's filters already applied to `datafile`
+
+        Returns:
+            one row per ROI, as for `processSingleFile`
+        """
+        roi_datalist = []
+        plan = self.compilePlan()
+
+        for filter_step in plan.filters[first_filter:]:
+            try:
+                datafile = filter_step.run(datafile)
+            except Exception as e:
+                logger.exception(
+                    "Unhandled exception in {} while processing {}.".format(
+                        filter_step.name, datafilename
                     )
-                    raise e
-        if "rois" in self.definition:
-            for roi in self.definition["rois"]:
+                )
+                raise e
+        if len(plan.rois) > 0:
+            for roi_step in plan.rois:
                 try:
-                    roi_datalist.extend(self.processROI(roi, datafile))
+                    roi_datalist.extend(roi_step.split(datafile))
                 except Exception as e:
                     logger.exception(
                         "Unhandled exception in {} while processing {}.".format(
-                            roi, datafilename
+                            roi_step.name, datafilename
                         )
                     )
                     raise e
@@ -579,46 +787,59 @@ class Project:
         else:
             # no ROIs to process, but that's OK
             if getattr(self, "_stop_event", None) and self._stop_event.is_set():
-                return []  # silent early-exit; avoids post-abort warning spam
+                return (
+                    pl.DataFrame()
+                )  # silent early-exit; avoids post-abort warning spam
             logger.warning("No ROIs defined, processing raw data.")
             roi_datalist.append(datafile)
 
         if len(roi_datalist) == 0:
             if getattr(self, "_stop_event", None) and self._stop_event.is_set():
-                return []  # silent early-exit; avoids post-abort warning spam
+                return (
+                    pl.DataFrame()
+                )  # silent early-exit; avoids post-abort warning spam
             logger.warning(
                 "Qualifying ROIs fail to generate results for {}, no output generated.".format(
                     datafilename
                 )
             )
-            return []
+            return pl.DataFrame()
 
+        # accumulate results column by column; the metadata is the same for every ROI
+        metric_columns = plan.metric_columns
+        metric_values: dict[str, list] = {column: [] for column in metric_columns}
+        rois = []
         for data in roi_datalist:
-            result_dict = copy.deepcopy(datafile.metadata)
-            result_dict["ROI"] = data.roi
-
-            for metric in self.definition["metrics"]:
+            rois.append(data.roi)
+            roi_results = {}
+            for metric_step in plan.metrics:
                 try:
-                    processed_metric = self.processMetric(metric, data)
-                    result_dict.update(processed_metric)
+                    roi_results.update(metric_step.run(data))
                 except Exception as e:
                     logger.critical(
                         "Unhandled exception {} in {} while processing {}.".format(
-                            e.args, metric, datafilename
+                            e.args, metric_step.name, datafilename
                         )
                     )
                     raise e
-            results_list.append(result_dict)
-        return results_list
+            for column in metric_columns:
+                metric_values[column].append(roi_results.get(column))
+
+        columns: dict[str, list] = {
+            key: [value] * len(rois) for key, value in datafile.metadata.items()
+        }
+        columns["ROI"] = rois
+        columns.update(metric_values)
+        return pydre.plan.buildResultFrame(columns, plan.result_schema)
 
     def saveResults(self):
         """
-        Args:
-            outfilename: filename to output csv data to.
+        Write the results to the project's output file, overwriting it if it exists.
 
-            The filename specified will be overwritten automatically.
+        The format (CSV, Parquet or Arrow IPC, optionally partitioned) is chosen from the
+        output file extension and the `output_*` config options; see `pydre.output`.
         """
-        try:
-            self.results.write_csv(self.config["outputfile"])
-        except AttributeError:
+        if self.results is None:
             logger.error("Results not computed yet")
+            return
+        pydre.output.writeResults(self.results, self.config["outputfile"], self.config)
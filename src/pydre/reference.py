@@ -0,0 +1,162 @@
+"""Process-wide cache of reference tables used by filters and metrics.
+
+Several filters (for example the R2D critical event and validation filters) read a small
+side CSV on every drive file and then select the rows that match the current scenario and
+week. The cache in this module loads each table once, reloads it when the file on disk
+changes, and keeps pre-partitioned copies so that per-file lookups are dictionary hits.
+"""
+
+from __future__ import annotations
+
+import threading
+from os import PathLike
+from pathlib import Path
+from typing import Any, Optional
+
+import polars as pl
+from loguru import logger
+
+
+def _keyString(value: Any) -> str:
+    """String form of a key value used to match table rows."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        if number.is_integer() and "." in value:
+            return str(int(number))
+    return str(value)
+
+
+class ReferenceTable:
+    """A loaded reference table and its partitions.
+
+    Partitions are built lazily for each tuple of key columns that is requested, so a
+    table looked up by `("Scenario", "Week")` is only partitioned once for those keys.
+    Key values are compared as strings, which matches how filters extract them from
+    participant identifiers and filenames. Whole numbers are written without a decimal
+    part, so a key read as 1.0 in one place matches 1 or "1" in another.
+    """
+
+    path: Path
+    mtime_ns: int
+    size: int
+    data: pl.DataFrame
+    partitions: dict[tuple[str, ...], dict[tuple[str, ...], pl.DataFrame]]
+
+    def __init__(self, path: Path, data: pl.DataFrame, mtime_ns: int, size: int):
+        self.path = path
+        self.data = data
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.partitions = {}
+        self._lock = threading.Lock()
+
+    def partition(self, keys: tuple[str, ...]) -> dict[tuple[str, ...], pl.DataFrame]:
+        """Return the table partitioned by the given key columns."""
+        with self._lock:
+            parts = self.partitions.get(keys)
+            if parts is None:
+                missing = set(keys) - set(self.data.columns)
+                if len(missing) > 0:
+                    raise KeyError(
+                        f"Reference table {self.path} does not contain columns {missing}"
+                    )
+                parts = {}
+                if self.data.height > 0:
+                    for key_values, part in self.data.partition_by(
+                        list(keys), as_dict=True, maintain_order=True
+                    ).items():
+                        parts[tuple(_keyString(v) for v in key_values)] = part
+                self.partitions[keys] = parts
+            return parts
+
+    def lookup(self, **keys: Any) -> pl.DataFrame:
+        """Return the rows whose key columns equal the given values.
+
+        An empty frame with the table's schema is returned when no rows match.
+        """
+        if len(keys) == 0:
+            return self.data
+        parts = self.partition(tuple(keys.keys()))
+        found = parts.get(tuple(_keyString(v) for v in keys.values()))
+        if found is None:
+            return self.data.clear()
+        return found
+
+
+class ReferenceTableCache:
+    """Thread-safe cache of reference tables keyed by resolved path."""
+
+    def __init__(self):
+        self._tables: dict[Path, ReferenceTable] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str | PathLike, **read_options: Any) -> ReferenceTable:
+        """Return the cached table for `path`, loading or reloading it if needed.
+
+        A table is reloaded when the modification time or the size of the file changes.
+
+        Parameters:
+            path: CSV file to load
+            read_options: extra keyword arguments passed to `polars.read_csv` on load
+
+        Returns:
+            The loaded reference table
+        """
+        resolved = Path(path).resolve()
+        stat = resolved.stat()
+        with self._lock:
+            table = self._tables.get(resolved)
+            if (
+                table is not None
+                and table.mtime_ns == stat.st_mtime_ns
+                and table.size == stat.st_size
+            ):
+                return table
+            if table is not None:
+                logger.info(f"Reference table {resolved} changed on disk, reloading")
+            else:
+                logger.info(f"Loading reference table {resolved}")
+            table = ReferenceTable(
+                resolved,
+                pl.read_csv(source=resolved, **read_options),
+                stat.st_mtime_ns,
+                stat.st_size,
+            )
+            self._tables[resolved] = table
+            return table
+
+    def lookup(self, path: str | PathLike, **keys: Any) -> pl.DataFrame:
+        """Return the rows of the table at `path` matching the given key values."""
+        return self.get(path).lookup(**keys)
+
+    def clear(self, path: Optional[str | PathLike] = None):
+        """Drop one table, or every table if no path is given."""
+        with self._lock:
+            if path is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(Path(path).resolve(), None)
+
+
+referenceTables = ReferenceTableCache()
+
+
+def lookupReference(path: str | PathLike, **keys: Any) -> pl.DataFrame:
+    """Look up rows in a reference table through the process-wide cache.
+
+    Example:
+        `lookupReference(dataFile, Scenario=scenario, Week=week)`
+
+    Parameters:
+        path: CSV file containing the reference table
+        keys: column names and the values they must equal
+
+    Returns:
+        Matching rows of the reference table
+    """
+    return referenceTables.lookup(path, **keys)
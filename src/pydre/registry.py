@@ -0,0 +1,80 @@
+"""Lazily populated registries for metric and filter functions.
+
+Metric and filter modules register their functions with decorators when they are imported.
+Importing every module up front pulls in heavy dependencies (scipy, numpy) even
+when a project only uses a simple metric. A `LazyRegistry` is backed by a static
+manifest that maps each built-in function name to the module that defines it, and only
+imports that module the first time the name is looked up.
+
+Because built-in modules are imported late, a custom function may be registered under a
+built-in name before the built-in module is imported. The registering decorators use
+`isBuiltin` and `hasCustom` so that importing the built-in module afterwards does not
+replace the custom function.
+"""
+
+import importlib
+from typing import Any, Iterable, Mapping
+
+from loguru import logger
+
+
+class LazyRegistry(dict):
+    """Dictionary of registered functions that imports defining modules on demand.
+
+    Names registered directly (for example by custom metric modules) behave as in a
+    normal dictionary. Names that are missing but listed in the manifest cause their
+    module to be imported, which registers them as a side effect.
+    """
+
+    def __init__(self, manifest: Mapping[str, str]):
+        super().__init__()
+        self.manifest = dict(manifest)
+
+    def _load(self, name: Any) -> bool:
+        module_name = self.manifest.get(name)
+        if module_name is None:
+            return False
+        logger.debug(f"Importing {module_name} for {name}")
+        importlib.import_module(module_name)
+        return dict.__contains__(self, name)
+
+    def __missing__(self, name: Any) -> Any:
+        if self._load(name):
+            return dict.__getitem__(self, name)
+        raise KeyError(name)
+
+    def __contains__(self, name: object) -> bool:
+        return dict.__contains__(self, name) or self._load(name)
+
+    def get(self, name: Any, default: Any = None) -> Any:
+        if name in self:
+            return dict.__getitem__(self, name)
+        return default
+
+    def isBuiltin(self, name: Any, value: Any) -> bool:
+        """Whether `value` is defined in the built-in module the manifest lists for `name`."""
+        module_name = self.manifest.get(name)
+        return (
+            module_name is not None
+            and getattr(value, "__module__", None) == module_name
+        )
+
+    def hasCustom(self, name: Any) -> bool:
+        """Whether `name` is registered with a value that is not the built-in one."""
+        return dict.__contains__(self, name) and not self.isBuiltin(
+            name, dict.__getitem__(self, name)
+        )
+
+    def modules(self) -> set[str]:
+        """Names of all modules listed in the manifest."""
+        return set(self.manifest.values())
+
+    def loadAll(self) -> None:
+        """Import every module in the manifest, registering all built-in functions."""
+        for module_name in sorted(self.modules()):
+            importlib.import_module(module_name)
+
+
+def buildManifest(modules: Mapping[str, Iterable[str]]) -> dict[str, str]:
+    """Flatten a module -> function names mapping into a function name -> module manifest."""
+    return {name: module for module, names in modules.items() for name in names}
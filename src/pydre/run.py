@@ -1,5 +1,5 @@
 from loguru import logger
-from pydre import project
+from pydre import project, shards
 import sys
 import argparse
 from typing import List, Optional
@@ -28,6 +28,13 @@ def parse_arguments(args: Optional[List[str]] = None) -> argparse.Namespace:
         default="WARNING",
         help="Loggging error level. DEBUG, INFO, WARNING, ERROR, and CRITICAL are allowed.",
     )
+    parser.add_argument(
+        "-s",
+        "--shard",
+        type=str,
+        default=None,
+        help="process only shard i of N of the data files, e.g. 2/8",
+    )
     return parser.parse_args(args)
 
 
@@ -50,21 +57,393 @@ def run_project(
     datafiles: Optional[List[str]],
     outputfile: Optional[str],
     num_threads: int = 12,
+    shard: Optional[str] = None,
 ) -> project.Project:
-    """Create, process and save a project."""
+    """Create, process and save a project, optionally restricted to one shard (`i/N`)."""
     p = project.Project(projectfile, datafiles, outputfile)
+    if shard is not None:
+        p.selectShard(*shards.parseShard(shard))
     p.processDatafiles(numThreads=num_threads)
     p.saveResults()
     return p
 
 
+def serve_main(args: Optional[List[str]] = None) -> int:
+    """Run a long-lived worker that processes jobs submitted with `pydre submit`."""
+    from pydre import server
+
+    parser = argparse.ArgumentParser(prog="pydre serve")
+    parser.add_argument(
+        "-q", "--queue", type=str, default=".pydre-queue", help="job queue directory"
+    )
+    parser.add_argument(
+        "-t", "--threads", type=int, default=None, help="worker threads per job"
+    )
+    parser.add_argument(
+        "--poll", type=float, default=1.0, help="seconds between queue checks"
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="process the jobs currently in the queue and exit",
+    )
+    parser.add_argument("-l", "--warninglevel", type=str, default="INFO")
+    parsed_args = parser.parse_args(args)
+    level = setup_logging(parsed_args.warninglevel)
+    try:
+        worker = server.PydreServer(
+            parsed_args.queue,
+            num_threads=parsed_args.threads,
+            poll_interval=parsed_args.poll,
+            log_level=level,
+        )
+        if parsed_args.once:
+            worker.runPending()
+        else:
+            worker.serveForever()
+        return 0
+    except Exception as e:
+        logger.error(f"Worker failed: {str(e)}")
+        return 1
+
+
+def submit_main(args: Optional[List[str]] = None) -> int:
+    """Submit a project to a running `pydre serve` worker and wait for the result."""
+    from pydre import server
+
+    parser = argparse.ArgumentParser(prog="pydre submit")
+    parser.add_argument(
+        "-p", "--projectfile", type=str, help="the project file path", required=True
+    )
+    parser.add_argument(
+        "-d", "--datafiles", type=str, help="the data file path", nargs="+"
+    )
+    parser.add_argument(
+        "-o",
+        "--outputfile",
+        type=str,
+        help="the name of the output file",
+        default="out.csv",
+    )
+    parser.add_argument(
+        "-q", "--queue", type=str, default=".pydre-queue", help="job queue directory"
+    )
+    parser.add_argument(
+        "--no-wait",
+        action="store_true",
+        help="return after queueing the job instead of waiting for it",
+    )
+    parser.add_argument("-l", "--warninglevel", type=str, default="INFO")
+    parsed_args = parser.parse_args(args)
+    setup_logging(parsed_args.warninglevel)
+    try:
+        job_id = server.submitJob(
+            parsed_args.queue,
+            parsed_args.projectfile,
+            parsed_args.datafiles,
+            parsed_args.outputfile,
+        )
+        logger.info(f"Submitted job {job_id}")
+        if parsed_args.no_wait:
+            return 0
+        status = server.waitForJob(parsed_args.queue, job_id, stream=sys.stderr)
+    except Exception as e:
+        logger.error(f"Submitting job failed: {str(e)}")
+        return 1
+    if status["status"] != "done":
+        logger.error(f"Job {job_id} {status['status']}: {status.get('error', '')}")
+        return 1
+    logger.info(f"Job {job_id} wrote {status['rows']} rows to {status['outputfile']}")
+    return 0
+
+
+def merge_results_main(args: Optional[List[str]] = None) -> int:
+    """Merge the result files written by sharded runs into one result file."""
+    parser = argparse.ArgumentParser(prog="pydre merge-results")
+    parser.add_argument("resultfiles", type=str, nargs="+", help="shard result files")
+    parser.add_argument(
+        "-o",
+        "--outputfile",
+        type=str,
+        help="the name of the merged output file",
+        default="out.csv",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        type=str,
+        default=None,
+        help="output format (csv, parquet or ipc); by default chosen by file extension",
+    )
+    parser.add_argument(
+        "--partition-by",
+        type=str,
+        nargs="+",
+        default=None,
+        help="write a Parquet directory partitioned by these columns",
+    )
+    parser.add_argument("-l", "--warninglevel", type=str, default="WARNING")
+    parsed_args = parser.parse_args(args)
+    setup_logging(parsed_args.warninglevel)
+    config = {}
+    if parsed_args.format is not None:
+        config["output_format"] = parsed_args.format
+    if parsed_args.partition_by is not None:
+        config["output_partition_by"] = parsed_args.partition_by
+    try:
+        shards.mergeResults(parsed_args.resultfiles, parsed_args.outputfile, config)
+        return 0
+    except Exception as e:
+        logger.error(f"Merging results failed: {str(e)}")
+        return 1
+
+
+def catalog_main(args: Optional[List[str]] = None) -> int:
+    """Refresh a data file catalog and list the files matching a metadata selection."""
+    from pydre import catalog
+
+    parser = argparse.ArgumentParser(prog="pydre catalog")
+    parser.add_argument("catalogfile", type=str, help="SQLite catalog file")
+    parser.add_argument(
+        "patterns", type=str, nargs="*", help="data file patterns to refresh"
+    )
+    parser.add_argument(
+        "-t", "--datafile-type", type=str, default="rti", help="rti, oldrti or scanner"
+    )
+    parser.add_argument(
+        "-s",
+        "--select",
+        type=str,
+        nargs="+",
+        default=[],
+        help="metadata selection, e.g. ScenarioName=Load ParticipantID=3",
+    )
+    parser.add_argument("-l", "--warninglevel", type=str, default="WARNING")
+    parsed_args = parser.parse_args(args)
+    setup_logging(parsed_args.warninglevel)
+    selection: dict[str, list[str]] = {}
+    for item in parsed_args.select:
+        key, _, value = item.partition("=")
+        selection.setdefault(key, []).append(value)
+    try:
+        with catalog.Catalog(parsed_args.catalogfile) as c:
+            for pattern in parsed_args.patterns:
+                c.refresh(pattern, parsed_args.datafile_type)
+            for info in c.select(selection):
+                print(info.path)
+        return 0
+    except Exception as e:
+        logger.error(f"Catalog failed: {str(e)}")
+        return 1
+
+
+def merge_main(args: Optional[List[str]] = None) -> int:
+    """Merge the data files of interrupted drives into one data file per drive."""
+    from pydre import merge
+
+    parser = argparse.ArgumentParser(prog="pydre merge")
+    parser.add_argument(
+        "-d", "--directory", type=str, required=True, help="directory of data files"
+    )
+    parser.add_argument(
+        "-t",
+        "--type",
+        type=str,
+        default="sequential",
+        help="merge type, sequential or spatial",
+    )
+    parser.add_argument(
+        "-o",
+        "--outputdir",
+        type=str,
+        default=None,
+        help="directory for the merged files (default: DIRECTORY/MergedData)",
+    )
+    parser.add_argument(
+        "--datafile-type",
+        type=str,
+        default="oldrti",
+        help="rti, oldrti or scanner",
+    )
+    parser.add_argument("-l", "--warninglevel", type=str, default="WARNING")
+    parsed_args = parser.parse_args(args)
+    setup_logging(parsed_args.warninglevel)
+    try:
+        merged = merge.mergeDirectory(
+            parsed_args.directory,
+            parsed_args.type,
+            parsed_args.outputdir,
+            parsed_args.datafile_type,
+        )
+        for path in merged:
+            print(path)
+        return 0
+    except Exception as e:
+        logger.error(f"Merge failed: {str(e)}")
+        return 1
+
+
+def follow_main(args: Optional[List[str]] = None) -> int:
+    """Update a project's metrics while a data file is being recorded."""
+    from pydre import follow, output
+
+    parser = argparse.ArgumentParser(prog="pydre follow")
+    parser.add_argument(
+        "-p", "--projectfile", type=str, required=True, help="the project file path"
+    )
+    parser.add_argument("datafile", type=str, help="the data file being recorded")
+    parser.add_argument(
+        "-o",
+        "--outputfile",
+        type=str,
+        default=None,
+        help="file rewritten with the current results at every update",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="seconds of simulator time between updates",
+    )
+    parser.add_argument(
+        "--poll", type=float, default=0.5, help="seconds between checks for new rows"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=None,
+        help="stop once the file has not grown for this many seconds",
+    )
+    parser.add_argument("-l", "--warninglevel", type=str, default="WARNING")
+    parsed_args = parser.parse_args(args)
+    setup_logging(parsed_args.warninglevel)
+    try:
+        p = project.Project(parsed_args.projectfile)
+
+        def write(results):
+            if parsed_args.outputfile is not None:
+                output.writeResults(results, parsed_args.outputfile, p.config)
+            else:
+                print(results.write_csv(include_header=True), flush=True)
+
+        session = follow.FollowSession(
+            p, parsed_args.datafile, interval=parsed_args.interval, on_update=write
+        )
+        session.follow(parsed_args.poll, parsed_args.idle_timeout)
+        return 0
+    except Exception as e:
+        logger.error(f"Follow failed: {str(e)}")
+        return 1
+
+
+def watch_main(args: Optional[List[str]] = None) -> int:
+    """Process a project's new and changed data files as they appear."""
+    from pydre import watch
+
+    parser = argparse.ArgumentParser(prog="pydre watch")
+    parser.add_argument(
+        "-p", "--projectfile", type=str, required=True, help="the project file path"
+    )
+    parser.add_argument(
+        "-d", "--datafiles", type=str, help="additional data file patterns", nargs="+"
+    )
+    parser.add_argument(
+        "-o", "--outputfile", type=str, default=None, help="the name of the output file"
+    )
+    parser.add_argument(
+        "--interval", type=float, default=5.0, help="seconds between checks for files"
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=10.0,
+        help="seconds a file must stay unchanged before it is processed",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="process the current new and changed files, then exit",
+    )
+    parser.add_argument("-l", "--warninglevel", type=str, default="WARNING")
+    parsed_args = parser.parse_args(args)
+    setup_logging(parsed_args.warninglevel)
+    try:
+        p = project.Project(
+            parsed_args.projectfile, parsed_args.datafiles, parsed_args.outputfile
+        )
+        watcher = watch.Watcher(p, settle=parsed_args.settle)
+        watcher.run(parsed_args.interval, parsed_args.once)
+        return 0
+    except Exception as e:
+        logger.error(f"Watch failed: {str(e)}")
+        return 1
+
+
+def batch_main(args: Optional[List[str]] = None) -> int:
+    """Run several projects over their data files, loading each file once."""
+    from pydre import batch
+
+    parser = argparse.ArgumentParser(prog="pydre batch")
+    parser.add_argument(
+        "-p",
+        "--projectfiles",
+        type=str,
+        nargs="+",
+        required=True,
+        help="the project file paths",
+    )
+    parser.add_argument(
+        "-d", "--datafiles", type=str, help="additional data files", nargs="+"
+    )
+    parser.add_argument(
+        "-t", "--threads", type=int, default=None, help="number of worker threads"
+    )
+    parser.add_argument("-l", "--warninglevel", type=str, default="WARNING")
+    parsed_args = parser.parse_args(args)
+    setup_logging(parsed_args.warninglevel)
+    try:
+        projects = [
+            project.Project(projectfile, parsed_args.datafiles)
+            for projectfile in parsed_args.projectfiles
+        ]
+        batch.distinctOutputFiles(projects)
+        run = batch.BatchRun(projects)
+        run.processDatafiles(numThreads=parsed_args.threads)
+        run.saveResults()
+        return 0
+    except Exception as e:
+        logger.error(f"Batch run failed: {str(e)}")
+        return 1
+
+
+SUBCOMMANDS = {
+    "serve": serve_main,
+    "submit": submit_main,
+    "merge-results": merge_results_main,
+    "catalog": catalog_main,
+    "merge": merge_main,
+    "follow": follow_main,
+    "watch": watch_main,
+    "batch": batch_main,
+}
+
+
 def main(args: Optional[List[str]] = None) -> int:
     """Main entry point for the application."""
+    argv = sys.argv[1:] if args is None else args
+    if argv and argv[0] in SUBCOMMANDS:
+        return SUBCOMMANDS[argv[0]](argv[1:])
     try:
         parsed_args = parse_arguments(args)
         setup_logging(parsed_args.warninglevel)
+        options = {}
+        if getattr(parsed_args, "shard", None) is not None:
+            options["shard"] = parsed_args.shard
         run_project(
-            parsed_args.projectfile, parsed_args.datafiles, parsed_args.outputfile
+            parsed_args.projectfile,
+            parsed_args.datafiles,
+            parsed_args.outputfile,
+            **options,
         )
         return 0
     except Exception as e:
@@ -0,0 +1,283 @@
+"""Shared column types for the data files of a project.
+
+Without help, polars infers the type of each column of each data file from its first
+`infer_schema_length` rows. That costs a sampling pass per file, and a numeric column whose
+first rows are all missing (`.`) is read as text, which makes numeric metrics on it return
+None. A `SchemaRegistry` keeps one dtype per column name for the whole project:
+
+- columns listed in the `[config.schema]` table of the project file are always read with
+  that type
+- other columns are learned from the files as they are loaded. Text columns whose values
+  are all numbers are corrected to Float64, and a column seen with different types in
+  different files is widened to a common type.
+
+Known dtypes are passed to the CSV reader as `schema_overrides`. When every column in a
+file's header is known, no type inference is done at all. The learned dtypes can be stored
+in a JSON file (`schema_file` config option) and reused by later runs.
+
+After loading, `normalizeDtypes` casts well-known columns to the types metrics and filters
+expect (time and position columns Float64), so numbers read as integers or text are
+converted once per file. The defaults for each datafile_type are in `NORMALIZED_DTYPES` and can be
+changed with the `[config.normalize]` table.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from os import PathLike
+from pathlib import Path
+from typing import Any, Mapping, Optional
+
+import polars as pl
+from loguru import logger
+
+DTYPE_NAMES: dict[str, pl.DataType] = {
+    "float64": pl.Float64,
+    "float": pl.Float64,
+    "double": pl.Float64,
+    "float32": pl.Float32,
+    "int64": pl.Int64,
+    "int": pl.Int64,
+    "integer": pl.Int64,
+    "int32": pl.Int32,
+    "int16": pl.Int16,
+    "int8": pl.Int8,
+    "uint64": pl.UInt64,
+    "uint32": pl.UInt32,
+    "uint16": pl.UInt16,
+    "uint8": pl.UInt8,
+    "string": pl.String,
+    "str": pl.String,
+    "utf8": pl.String,
+    "boolean": pl.Boolean,
+    "bool": pl.Boolean,
+}
+
+
+_TIME_DTYPES: dict[str, pl.DataType] = {
+    "SimTime": pl.Float64,
+    "DatTime": pl.Float64,
+    "VidTime": pl.Float64,
+}
+
+# dtypes that loaded data files are normalized to, for each datafile_type
+NORMALIZED_DTYPES: dict[str, dict[str, pl.DataType]] = {
+    "rti": {**_TIME_DTYPES, "XPos": pl.Float64, "YPos": pl.Float64, "ZPos": pl.Float64},
+    "oldrti": {
+        **_TIME_DTYPES,
+        "XPos": pl.Float64,
+        "YPos": pl.Float64,
+        "ZPos": pl.Float64,
+    },
+    "scanner": dict(_TIME_DTYPES),
+}
+
+
+def parseDtype(name: str) -> pl.DataType:
+    """Convert a dtype name from a project or schema file (e.g. "Float64") to a polars dtype."""
+    try:
+        return DTYPE_NAMES[str(name).lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown column type '{name}'. Use one of: Float64, Float32, Int64, Int32, "
+            "Int16, Int8, UInt64, UInt32, UInt16, UInt8, String, Boolean"
+        )
+
+
+def _commonDtype(a: pl.DataType, b: pl.DataType) -> pl.DataType:
+    if a == b:
+        return a
+    if a.is_numeric() and b.is_numeric():
+        if a.is_float() or b.is_float():
+            return pl.Float64
+        return pl.Int64
+    return pl.String
+
+
+def _correctedDtype(column: pl.Series) -> Optional[pl.DataType]:
+    """The dtype a column should have, or None if it is entirely null (type unknown)."""
+    non_null = column.len() - column.null_count()
+    if non_null == 0 or column.dtype == pl.Null:
+        return None
+    if column.dtype == pl.String:
+        as_number = column.str.strip_chars().cast(pl.Float64, strict=False)
+        if as_number.null_count() == column.null_count():
+            return pl.Float64
+    return column.dtype
+
+
+class SchemaRegistry:
+    """Thread-safe map from column name to dtype, shared by all data files of a project."""
+
+    def __init__(
+        self,
+        explicit: Optional[Mapping[str, pl.DataType]] = None,
+        learn: bool = True,
+        path: Optional[PathLike] = None,
+    ):
+        self.explicit: dict[str, pl.DataType] = dict(explicit or {})
+        self.learned: dict[str, pl.DataType] = {}
+        self.learn_enabled = learn
+        self.path = Path(path) if path is not None else None
+        self._dirty = False
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            self.load(self.path)
+
+    @classmethod
+    def fromConfig(
+        cls, config: Mapping[str, Any], base_dir: Optional[PathLike] = None
+    ) -> SchemaRegistry:
+        """Build the registry described by a project `[config]` section.
+
+        Config options:
+            schema: table of column name -> dtype name, always applied
+            schema_learn: learn dtypes of other columns from the data files (default true)
+            schema_file: JSON file to load learned dtypes from and save them to,
+                relative to the project file
+        """
+        explicit = {
+            column: parseDtype(name)
+            for column, name in config.get("schema", {}).items()
+        }
+        path = config.get("schema_file")
+        if path is not None:
+            path = Path(path)
+            if not path.is_absolute() and base_dir is not None:
+                path = Path(base_dir) / path
+        return cls(explicit, bool(config.get("schema_learn", True)), path)
+
+    @property
+    def dtypes(self) -> dict[str, pl.DataType]:
+        """All known dtypes. Explicit types take precedence over learned ones."""
+        with self._lock:
+            return {**self.learned, **self.explicit}
+
+    def fingerprint(self) -> str:
+        """Identifies the explicit schema, for cache keys of loaded files."""
+        return ",".join(f"{c}:{t}" for c, t in sorted(self.explicit.items()))
+
+    def overridesFor(self, columns: list[str]) -> tuple[dict[str, pl.DataType], bool]:
+        """The known dtypes for a file's header columns.
+
+        Returns:
+            (schema overrides, whether every column in the header has a known dtype)
+        """
+        known = self.dtypes
+        overrides = {c: known[c] for c in columns if c in known}
+        return overrides, len(overrides) == len(columns)
+
+    def apply(self, df: pl.DataFrame) -> pl.DataFrame:
+        """Learn dtypes from a freshly loaded frame and cast it to the registry's dtypes."""
+        casts = {}
+        with self._lock:
+            for name in df.columns:
+                column = df.get_column(name)
+                if name in self.explicit:
+                    target = self.explicit[name]
+                elif name == "":
+                    # unnamed column created by a trailing separator in the header
+                    self._remember(name, pl.String)
+                    continue
+                else:
+                    corrected = _correctedDtype(column)
+                    if corrected is None:
+                        target = self.learned.get(name)
+                    elif not self.learn_enabled:
+                        target = corrected
+                    else:
+                        known = self.learned.get(name)
+                        target = (
+                            corrected
+                            if known is None
+                            else _commonDtype(known, corrected)
+                        )
+                        self._remember(name, target)
+                if target is not None and column.dtype != target:
+                    casts[name] = target
+        if casts:
+            logger.debug(f"Casting columns to project schema: {casts}")
+            df = df.with_columns(
+                pl.col(name).str.strip_chars().cast(dtype, strict=False)
+                if df.schema[name] == pl.String and dtype.is_numeric()
+                else pl.col(name).cast(dtype, strict=False)
+                for name, dtype in casts.items()
+            )
+        return df
+
+    def _remember(self, name: str, dtype: pl.DataType) -> None:
+        if self.learned.get(name) != dtype:
+            if name in self.learned:
+                logger.info(
+                    f"Widening column {name} from {self.learned[name]} to {dtype}"
+                )
+            self.learned[name] = dtype
+            self._dirty = True
+
+    def load(self, path: PathLike) -> None:
+        """Read learned dtypes from a JSON schema file."""
+        with open(path) as f:
+            stored = json.load(f)
+        with self._lock:
+            for column, name in stored.get("columns", {}).items():
+                self.learned[column] = parseDtype(name)
+        logger.info(f"Loaded schema for {len(self.learned)} columns from {path}")
+
+    def save(self, path: Optional[PathLike] = None) -> None:
+        """Write the learned dtypes to a JSON schema file if they changed."""
+        path = Path(path) if path is not None else self.path
+        if path is None or not self._dirty:
+            return
+        with self._lock:
+            columns = {c: str(t) for c, t in sorted(self.learned.items())}
+            self._dirty = False
+        with open(path, "w") as f:
+            json.dump({"columns": columns}, f, indent=2)
+        logger.info(f"Saved schema for {len(columns)} columns to {path}")
+
+
+def normalizedDtypes(config: Mapping[str, Any]) -> dict[str, pl.DataType]:
+    """Column dtypes that a project's data files are normalized to after loading.
+
+    Config options:
+        normalize: table of column name -> dtype name, added to (or replacing) the defaults
+            for the project's datafile_type. Set `normalize = false` to disable.
+    """
+    option = config.get("normalize", True)
+    if option is False:
+        return {}
+    datafile_type = config.get("datafile_type", "rti")
+    dtypes = dict(NORMALIZED_DTYPES.get(datafile_type, NORMALIZED_DTYPES["rti"]))
+    if isinstance(option, Mapping):
+        dtypes.update({column: parseDtype(name) for column, name in option.items()})
+    return dtypes
+
+
+def normalizeDtypes(
+    df: pl.DataFrame, dtypes: Mapping[str, pl.DataType]
+) -> pl.DataFrame:
+    """Cast the columns of `df` named in `dtypes` to those types, once, at load time.
+
+    Columns that cannot be converted (for example text in a time column) are left
+    unchanged and reported.
+    """
+    casts = {
+        name: dtype
+        for name, dtype in dtypes.items()
+        if name in df.columns and df.schema[name] != dtype
+    }
+    if not casts:
+        return df
+    try:
+        return df.with_columns(
+            pl.col(name).cast(dtype) for name, dtype in casts.items()
+        )
+    except pl.exceptions.PolarsError:
+        pass
+    for name, dtype in casts.items():
+        try:
+            df = df.with_columns(pl.col(name).cast(dtype))
+        except pl.exceptions.PolarsError as e:
+            logger.warning(f"Could not convert column {name} to {dtype}: {e}")
+    return df
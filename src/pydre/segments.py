@@ -0,0 +1,170 @@
+"""Run-length helpers for finding runs of identical values in drive data.
+
+A *run* is a maximal sequence of consecutive rows with the same value, such as one glance
+at the road in gaze data or one brake press. The expressions here label and measure runs
+with window expressions (`over` the run id), so they are computed in a single pass over
+the data without aggregating runs into a separate table and joining the results back.
+
+`runTable` summarizes the runs of a column or predicate as one row per run. The table is
+cached on the DriveData object, so metrics counting or timing the same events share it
+instead of each re-scanning the data.
+
+`firstIndex`, `firstTime`, `lastIndex` and `lastTime` find the first or last row matching a
+predicate, optionally only after a row matching another predicate ("first A after first
+B"). They search inside a single expression, without filtering the whole frame.
+"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+import polars as pl
+
+import pydre.core
+
+
+def runId(value: pl.Expr) -> pl.Expr:
+    """Number of the run each row belongs to, starting at 0.
+
+    A new run starts whenever `value` changes. Missing values form runs of their own.
+    """
+    return value.rle_id()
+
+
+def runLength(value: pl.Expr) -> pl.Expr:
+    """Number of rows in the run each row belongs to."""
+    return pl.len().over(runId(value))
+
+
+def runDuration(value: pl.Expr, time: pl.Expr) -> pl.Expr:
+    """Time from the first to the last row of the run each row belongs to."""
+    return (time.max() - time.min()).over(runId(value))
+
+
+def dropShortRuns(value: pl.Expr, time: pl.Expr, min_duration: float) -> pl.Expr:
+    """`value`, with rows of runs lasting less than `min_duration` set to missing."""
+    return pl.when(runDuration(value, time) < min_duration).then(None).otherwise(value)
+
+
+def runTable(
+    drivedata: pydre.core.DriveData,
+    value: str | pl.Expr,
+    timecol: Optional[str] = "SimTime",
+) -> pl.DataFrame:
+    """Table of the runs of a column or predicate, one row per run.
+
+    Parameters:
+        value: column name, or expression evaluated on the drive data
+        timecol: time column for the start and end times of each run, or None
+
+    Returns:
+        DataFrame with columns `run`, `start` and `end` (first and last row index),
+        `length`, `value`, `previous` (value of the preceding run) and, if `timecol` is
+        given, `start_time` and `end_time`. The table is cached until the drive data
+        changes.
+    """
+    expr = pl.col(value) if isinstance(value, str) else value
+    if timecol is not None:
+        drivedata.checkColumns([timecol])
+    key = ("runTable", str(expr), timecol)
+    return drivedata.cachedResult(
+        key, lambda: _computeRunTable(drivedata.data, expr, timecol)
+    )
+
+
+def _computeRunTable(
+    data: pl.DataFrame, expr: pl.Expr, timecol: Optional[str]
+) -> pl.DataFrame:
+    runs = (
+        data.select(expr.rle().alias("rle"))
+        .unnest("rle")
+        .with_row_index("run")
+        .with_columns(end=pl.col("len").cum_sum().cast(pl.Int64) - 1)
+        .select(
+            "run",
+            start=pl.col("end") - pl.col("len") + 1,
+            end="end",
+            length="len",
+            value="value",
+            previous=pl.col("value").shift(),
+        )
+    )
+    if timecol is not None:
+        time = data.get_column(timecol)
+        runs = runs.with_columns(
+            start_time=time.gather(runs.get_column("start")),
+            end_time=time.gather(runs.get_column("end")),
+        )
+    return runs
+
+
+def runStarts(
+    drivedata: pydre.core.DriveData,
+    predicate: str | pl.Expr,
+    timecol: Optional[str] = None,
+) -> pl.DataFrame:
+    """Runs in which `predicate` became true, after having been false.
+
+    A run at the very start of the data, or following missing values, is not a
+    transition and is not included.
+    """
+    return runTable(drivedata, predicate, timecol).filter(
+        pl.col("value") & pl.col("previous").not_()
+    )
+
+
+def _after(
+    predicate: pl.Expr, anchor: Optional[pl.Expr], timecol: Optional[str]
+) -> pl.Expr:
+    """Restrict `predicate` to rows after the first row matching `anchor`.
+
+    With a time column, "after" means a strictly later time; otherwise a later row.
+    """
+    if anchor is None:
+        return predicate
+    if timecol is None:
+        row = pl.int_range(pl.len())
+        return predicate & (row > row.filter(anchor).first())
+    time = pl.col(timecol)
+    return predicate & (time > time.filter(anchor).first())
+
+
+def firstIndex(
+    data: pl.DataFrame, predicate: pl.Expr, after: Optional[pl.Expr] = None
+) -> Optional[int]:
+    """Index of the first row where `predicate` is true, or None.
+
+    Parameters:
+        predicate: boolean expression; missing values count as false
+        after: only consider rows after the first row where this is true
+    """
+    return data.select(_after(predicate, after, None).arg_true().first()).item()
+
+
+def lastIndex(data: pl.DataFrame, predicate: pl.Expr) -> Optional[int]:
+    """Index of the last row where `predicate` is true, or None."""
+    return data.select(predicate.arg_true().last()).item()
+
+
+def firstTime(
+    data: pl.DataFrame,
+    predicate: pl.Expr,
+    timecol: str = "SimTime",
+    after: Optional[pl.Expr] = None,
+) -> Optional[float]:
+    """Time of the first row where `predicate` is true, or None.
+
+    Parameters:
+        predicate: boolean expression; missing values count as false
+        timecol: time column
+        after: only consider rows later in time than the first row where this is true
+    """
+    time = pl.col(timecol)
+    return data.select(time.filter(_after(predicate, after, timecol)).first()).item()
+
+
+def lastTime(
+    data: pl.DataFrame, predicate: pl.Expr, timecol: str = "SimTime"
+) -> Optional[float]:
+    """Time of the last row where `predicate` is true, or None."""
+    return data.select(pl.col(timecol).filter(predicate).last()).item()
@@ -0,0 +1,265 @@
+"""Long-running pydre worker with a local directory job queue.
+
+`pydre serve` starts a worker that watches a queue directory for job files. Keeping one
+process alive between jobs avoids paying interpreter startup, module imports, custom
+metric loading, ROI parsing and file parsing for every small project. Clients submit a job
+with `pydre submit`, which writes a job file into the queue and then streams the job's log
+and final status back to the terminal.
+
+Queue directory layout:
+
+- `incoming/`: new job files (`<job id>.json`), written atomically by clients
+- `running/`: the job currently being processed
+- `logs/`: one log file per job, appended to while the job runs
+- `done/`: one status file per finished job
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+import traceback
+import uuid
+from os import PathLike
+from pathlib import Path
+from typing import Any, Optional, TextIO
+
+from loguru import logger
+
+import pydre.core
+import pydre.plan
+import pydre.project
+
+QUEUE_DIRS = ("incoming", "running", "logs", "done")
+
+
+def _writeJson(path: Path, content: dict[str, Any]) -> None:
+    """Write a JSON file atomically so readers never see a partial file."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(content, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def prepareQueue(queue_dir: str | PathLike) -> Path:
+    """Create the queue directory structure if needed and return the queue path."""
+    queue = Path(queue_dir).resolve()
+    for name in QUEUE_DIRS:
+        (queue / name).mkdir(parents=True, exist_ok=True)
+    return queue
+
+
+class PydreServer:
+    """Worker that processes jobs from a queue directory, keeping caches warm between jobs.
+
+    Cached between jobs:
+        - metric and filter registries (modules stay imported once a project uses them)
+        - the compiled plan of each project file, until the project file, its custom
+          metric and filter modules or its ROI files change
+        - parsed data files, in a `pydre.core.DriveDataCache`
+
+    The worker logs to stderr at `log_level`, and each job also to its own log file in
+    `logs/`. Building a project replaces the loguru sinks with the project's own, so the
+    worker's sinks are restored after each project is built.
+    """
+
+    def __init__(
+        self,
+        queue_dir: str | PathLike,
+        num_threads: Optional[int] = None,
+        poll_interval: float = 1.0,
+        max_cached_files: int = 32,
+        log_level: str = "INFO",
+    ):
+        self.queue = prepareQueue(queue_dir)
+        self.log_level = log_level
+        self.num_threads = num_threads
+        self.poll_interval = poll_interval
+        self.datafile_cache = pydre.core.DriveDataCache(max_cached_files)
+        # project file -> (modification times of the plan's source files, plan)
+        self._plans: dict[str, tuple[tuple, pydre.plan.ProjectPlan]] = {}
+        self._running = False
+
+    def nextJob(self) -> Optional[Path]:
+        """Claim the oldest job in the queue by moving it to `running/`."""
+        incoming = sorted(
+            (self.queue / "incoming").glob("*.json"), key=lambda p: p.stat().st_mtime
+        )
+        for job_file in incoming:
+            claimed = self.queue / "running" / job_file.name
+            try:
+                os.replace(job_file, claimed)
+            except FileNotFoundError:
+                # claimed by another worker sharing the queue
+                continue
+            return claimed
+        return None
+
+    def runJob(self, job_file: Path) -> dict[str, Any]:
+        """Process one claimed job file and write its status to `done/`."""
+        job_id = job_file.stem
+        log_path = self.queue / "logs" / f"{job_id}.log"
+        status: dict[str, Any] = {"id": job_id, "started": time.time()}
+        job_level = "INFO"
+        try:
+            with open(job_file) as f:
+                job = json.load(f)
+            job_level = job.get("log_level", job_level)
+            self._resetLogging(log_path, job_level)
+            project = pydre.project.Project(
+                job["projectfile"], job.get("datafiles"), job.get("outputfile")
+            )
+            # Project construction replaces the log sinks with the project's own
+            self._resetLogging(log_path, job_level)
+            logger.info(f"Running job {job_id} for project {job['projectfile']}")
+            outputfile = Path(project.config["outputfile"])
+            if not outputfile.is_absolute():
+                outputfile = Path(job.get("cwd", os.getcwd())) / outputfile
+                project.config["outputfile"] = str(outputfile)
+
+            project.datafile_cache = self.datafile_cache
+            project.plan = self._cachedPlan(project)
+            results = project.processDatafiles(
+                numThreads=job.get("num_threads", self.num_threads)
+            )
+            if results is None:
+                raise RuntimeError("No results generated for project")
+            project.saveResults()
+            logger.info(f"Wrote {results.height} rows to {outputfile}")
+            status.update(
+                status="done", outputfile=str(outputfile), rows=results.height
+            )
+        except Exception as e:
+            # a failed job is reported back to the client, so the worker keeps running
+            logger.exception(f"Job {job_id} failed: {e}")
+            status.update(
+                status="failed", error=str(e), traceback=traceback.format_exc()
+            )
+        finally:
+            logger.complete()
+            self._resetLogging()
+            status["finished"] = time.time()
+            _writeJson(self.queue / "done" / f"{job_id}.json", status)
+            job_file.unlink(missing_ok=True)
+        return status
+
+    def _resetLogging(
+        self, log_path: Optional[Path] = None, level: str = "INFO"
+    ) -> None:
+        """Log to stderr at the worker's level and, during a job, to the job's log file."""
+        logger.remove()
+        logger.add(sys.stderr, level=self.log_level)
+        if log_path is not None:
+            logger.add(str(log_path), level=level, enqueue=True)
+
+    def _cachedPlan(self, project: pydre.project.Project) -> pydre.plan.ProjectPlan:
+        path = str(project.project_filename.resolve())
+        signature = tuple(
+            (str(source), source.stat().st_mtime_ns if source.exists() else None)
+            for source in project.planSources()
+        )
+        cached = self._plans.get(path)
+        if cached is not None and cached[0] == signature:
+            logger.info(f"Using cached plan for {path}")
+            return cached[1]
+        plan = project.compilePlan()
+        self._plans[path] = (signature, plan)
+        return plan
+
+    def runPending(self) -> int:
+        """Process every job currently in the queue. Returns the number of jobs run."""
+        count = 0
+        job_file = self.nextJob()
+        while job_file is not None:
+            self.runJob(job_file)
+            count += 1
+            job_file = self.nextJob()
+        return count
+
+    def serveForever(self) -> None:
+        """Poll the queue and process jobs until interrupted."""
+        self._running = True
+        logger.info(f"pydre worker listening on {self.queue}")
+        try:
+            while self._running:
+                if self.runPending() == 0:
+                    time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            logger.warning("Worker interrupted, shutting down.")
+        finally:
+            self._running = False
+
+    def stop(self) -> None:
+        self._running = False
+
+
+def submitJob(
+    queue_dir: str | PathLike,
+    projectfile: str | PathLike,
+    datafiles: Optional[list[str]] = None,
+    outputfile: Optional[str] = None,
+    num_threads: Optional[int] = None,
+) -> str:
+    """Add a job to the queue and return its id.
+
+    Relative paths are resolved against the current directory, since the worker may be
+    running somewhere else.
+    """
+    queue = prepareQueue(queue_dir)
+    job_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    job = {
+        "projectfile": str(Path(projectfile).resolve()),
+        "datafiles": (
+            [str(Path(d).resolve()) for d in datafiles]
+            if datafiles is not None
+            else None
+        ),
+        "outputfile": (
+            str(Path(outputfile).resolve()) if outputfile is not None else None
+        ),
+        "num_threads": num_threads,
+        "cwd": os.getcwd(),
+    }
+    _writeJson(queue / "incoming" / f"{job_id}.json", job)
+    return job_id
+
+
+def waitForJob(
+    queue_dir: str | PathLike,
+    job_id: str,
+    stream: Optional[TextIO] = None,
+    poll_interval: float = 0.5,
+    timeout: Optional[float] = None,
+) -> dict[str, Any]:
+    """Wait for a job to finish, copying its log to `stream` as it is written.
+
+    Returns:
+        The job status dictionary. Its "status" entry is "done", "failed" or "timeout".
+    """
+    queue = Path(queue_dir).resolve()
+    log_path = queue / "logs" / f"{job_id}.log"
+    status_path = queue / "done" / f"{job_id}.json"
+    position = 0
+    start = time.monotonic()
+
+    def copyLog() -> None:
+        nonlocal position
+        if stream is None or not log_path.exists():
+            return
+        with open(log_path) as f:
+            f.seek(position)
+            stream.write(f.read())
+            position = f.tell()
+        stream.flush()
+
+    while True:
+        copyLog()
+        if status_path.exists():
+            copyLog()
+            with open(status_path) as f:
+                return json.load(f)
+        if timeout is not None and time.monotonic() - start > timeout:
+            return {"id": job_id, "status": "timeout"}
+        time.sleep(poll_interval)
@@ -0,0 +1,136 @@
+"""Splitting a project's data files across several independent runs, and merging the results.
+
+Large studies can be processed on several machines by giving each run a shard
+specification `i/N`. Each run processes a deterministic, size-balanced subset of the
+project's files and writes its own result file. `mergeResults` then combines the shard
+result files into a single table.
+"""
+
+from os import PathLike
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence
+
+import polars as pl
+from loguru import logger
+
+import pydre.output
+
+
+def parseShard(spec: str) -> tuple[int, int]:
+    """Parse a shard specification of the form `i/N` (1-based).
+
+    Returns:
+        (index, count) with 1 <= index <= count
+
+    Raises:
+        ValueError: if the specification is malformed or out of range
+    """
+    try:
+        index_str, count_str = spec.split("/")
+        index, count = int(index_str), int(count_str)
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected the form i/N (e.g. 2/8)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}', need 1 <= i <= N")
+    return index, count
+
+
+def _fileSize(path: PathLike) -> int:
+    try:
+        return Path(path).stat().st_size
+    except OSError:
+        return 0
+
+
+def partitionFiles(files: Sequence[PathLike], count: int) -> list[list[PathLike]]:
+    """Split files into `count` groups of roughly equal total size.
+
+    Files are assigned largest first to the group with the smallest total so far (the LPT
+    heuristic). Ties are broken by file name and by group number, so every machine that
+    sees the same files computes the same partition regardless of the order in which the
+    files were listed or where the data directory is mounted.
+
+    Each group is returned in the original file order.
+    """
+    order = {id(f): i for i, f in enumerate(files)}
+    by_size = sorted(
+        files, key=lambda f: (-_fileSize(f), Path(f).name, str(Path(f).as_posix()))
+    )
+    groups: list[list[PathLike]] = [[] for _ in range(count)]
+    loads = [0] * count
+    for f in by_size:
+        target = min(range(count), key=lambda g: (loads[g], g))
+        groups[target].append(f)
+        loads[target] += _fileSize(f)
+    return [sorted(g, key=lambda f: order[id(f)]) for g in groups]
+
+
+def shardFiles(files: Sequence[PathLike], index: int, count: int) -> list[PathLike]:
+    """The files assigned to shard `index` (1-based) of `count`."""
+    return partitionFiles(files, count)[index - 1]
+
+
+def shardOutputName(outputfile: PathLike, index: int, count: int) -> str:
+    """Name of the result file for one shard, e.g. `out.csv` -> `out.shard-2-of-8.csv`."""
+    path = Path(outputfile)
+    return str(path.with_name(f"{path.stem}.shard-{index}-of-{count}{path.suffix}"))
+
+
+def _reconcileTypes(frames: Sequence[pl.DataFrame]) -> list[pl.DataFrame]:
+    """Cast columns without any value to the type the column has in the other frames.
+
+    A shard in which a metric was never computed has no values in that column, and reading
+    it back from CSV types the column as text, which would make the merged column text too.
+    """
+    types: dict[str, set[pl.DataType]] = {}
+    for frame in frames:
+        for name in frame.columns:
+            if frame.get_column(name).null_count() < frame.height:
+                types.setdefault(name, set()).add(frame.schema[name])
+    reconciled = []
+    for frame in frames:
+        casts = {
+            name: next(iter(types[name]))
+            for name in frame.columns
+            if frame.get_column(name).null_count() == frame.height
+            and len(types.get(name, ())) == 1
+        }
+        reconciled.append(frame.cast(casts) if casts else frame)
+    return reconciled
+
+
+def mergeResults(
+    resultfiles: Sequence[PathLike],
+    outputfile: PathLike,
+    config: Optional[Mapping[str, Any]] = None,
+) -> pl.DataFrame:
+    """Combine shard result files into one sorted result file.
+
+    Columns are matched by name. Columns missing from some shards are filled with nulls,
+    columns without any value in a shard take their type from the other shards, and
+    columns whose types differ between shards are cast to a common supertype. Rows
+    are sorted by the metadata columns (every column up to and including "ROI").
+
+    Result files may be in any format `pydre.output.readResults` understands. The merged
+    table is written with `pydre.output.writeResults`, using the output options in `config`.
+
+    Returns:
+        the merged results
+    """
+    if len(resultfiles) == 0:
+        raise ValueError("No result files to merge")
+    frames = []
+    for f in resultfiles:
+        logger.info(f"Reading results from {f}")
+        frames.append(pydre.output.readResults(f))
+    merged = pl.concat(_reconcileTypes(frames), how="diagonal_relaxed")
+
+    if "ROI" in merged.columns:
+        sort_columns = merged.columns[: merged.columns.index("ROI") + 1]
+        merged = merged.sort(sort_columns, nulls_last=True, maintain_order=True)
+    else:
+        logger.warning("No ROI column in results, keeping shard order")
+
+    pydre.output.writeResults(merged, outputfile, config)
+    logger.info(f"Merged {len(resultfiles)} files into {outputfile}")
+    return merged
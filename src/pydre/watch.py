@@ -0,0 +1,180 @@
+"""Process a project's new and changed data files as they appear.
+
+A `Watcher` polls the project's `datafiles` patterns. A file is processed once its size
+and modification time have stayed the same for `settle` seconds, so files that are still
+being copied are not read half-written. Only files that are new or have changed since they
+were last processed are run through `Project.processSingleFile`; their result rows replace
+any earlier rows of the same file, and the output file is rewritten from the combined
+results.
+
+The files processed and their result rows are kept in a state directory next to the
+output file (`OUTPUT.watch`), so a restarted watcher continues where it stopped instead of
+processing the whole study again. The state is discarded if the project file changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import time
+import traceback
+from os import PathLike
+from pathlib import Path
+from typing import Optional
+
+import polars as pl
+from loguru import logger
+
+import pydre.output
+import pydre.project
+
+# column of the state results holding the data file each row came from
+SOURCE_COLUMN = "__datafile"
+
+
+class Watcher:
+    """Incrementally keeps a project's output up to date with its data files.
+
+    Parameters:
+        project: project to run
+        settle: seconds a file's size and modification time must stay unchanged before it
+            is processed
+        statedir: directory for the watch state (default: the output file name + ".watch")
+    """
+
+    def __init__(
+        self,
+        project: pydre.project.Project,
+        settle: float = 10.0,
+        statedir: Optional[PathLike] = None,
+    ):
+        self.project = project
+        self.settle = settle
+        self.outputfile = Path(project.config["outputfile"])
+        if statedir is None:
+            statedir = self.outputfile.with_name(self.outputfile.name + ".watch")
+        self.statedir = Path(statedir)
+        self.project_hash = hashlib.sha256(
+            Path(project.project_filename).read_bytes()
+        ).hexdigest()
+        # path -> (size, mtime_ns) of the version of each file that was processed
+        self.processed: dict[str, tuple[int, int]] = {}
+        # path -> (size, mtime_ns, monotonic time that version was first seen)
+        self.pending: dict[str, tuple[int, int, float]] = {}
+        # path -> (size, mtime_ns) of a version whose processing failed; it is tried
+        # again once the file changes
+        self.failed: dict[str, tuple[int, int]] = {}
+        self.results = pl.DataFrame(
+            {SOURCE_COLUMN: []}, schema={SOURCE_COLUMN: pl.String}
+        )
+        self._loadState()
+
+    def poll(self) -> list[Path]:
+        """Process the data files that are new or changed and have settled.
+
+        Returns:
+            the files processed
+        """
+        now = time.monotonic()
+        current: dict[str, tuple[int, int]] = {}
+        for path in self.project.findDatafiles():
+            try:
+                stat = Path(path).stat()
+            except FileNotFoundError:
+                continue
+            current[str(path)] = (stat.st_size, stat.st_mtime_ns)
+
+        ready = []
+        for path, signature in current.items():
+            if (
+                self.processed.get(path) == signature
+                or self.failed.get(path) == signature
+            ):
+                self.pending.pop(path, None)
+                continue
+            seen = self.pending.get(path)
+            if seen is None or seen[:2] != signature:
+                self.pending[path] = (*signature, now)
+            elif now - seen[2] >= self.settle:
+                ready.append(path)
+
+        removed = [path for path in self.processed if path not in current]
+        for path in list(self.failed):
+            if path not in current:
+                del self.failed[path]
+        if not ready and not removed:
+            return []
+
+        frames = []
+        done = []
+        for path in ready:
+            logger.info(f"Processing {path}")
+            try:
+                frame = self.project.processSingleFile(Path(path))
+            except Exception as e:
+                # keep the results of the earlier version until this one can be processed
+                logger.error(f"Processing {path} failed: {e}")
+                logger.error(traceback.format_exc())
+                self.failed[path] = self.pending.pop(path)[:2]
+                continue
+            self.failed.pop(path, None)
+            if frame.height > 0:
+                frames.append(frame.with_columns(pl.lit(path).alias(SOURCE_COLUMN)))
+            self.processed[path] = self.pending.pop(path)[:2]
+            done.append(path)
+        for path in removed:
+            logger.info(f"{path} was removed, dropping its results")
+            del self.processed[path]
+        if not done and not removed:
+            return []
+
+        replaced = pl.col(SOURCE_COLUMN).is_in(done + removed)
+        self.results = pl.concat(
+            [self.results.filter(~replaced)] + frames, how="diagonal_relaxed"
+        ).sort(SOURCE_COLUMN, maintain_order=True)
+        self._write()
+        return [Path(path) for path in done]
+
+    def run(self, interval: float = 5.0, once: bool = False) -> None:
+        """Poll every `interval` seconds until interrupted (Ctrl+C).
+
+        With `once`, process the files that settle within one `settle` period and return.
+        """
+        try:
+            self.poll()
+            if once:
+                time.sleep(self.settle)
+                self.poll()
+                return
+            while True:
+                time.sleep(interval)
+                self.poll()
+        except KeyboardInterrupt:
+            logger.info("Stopped watching")
+
+    def _write(self) -> None:
+        output = self.results.drop(SOURCE_COLUMN)
+        if output.width > 0:
+            pydre.output.writeResults(output, self.outputfile, self.project.config)
+        if self.project.schema is not None:
+            self.project.schema.save()
+        self.statedir.mkdir(parents=True, exist_ok=True)
+        self.results.write_parquet(self.statedir / "results.parquet")
+        state = {"project": self.project_hash, "files": self.processed}
+        (self.statedir / "files.json").write_text(json.dumps(state, indent=1))
+        logger.info(
+            f"Wrote results of {len(self.processed)} files to {self.outputfile}"
+        )
+
+    def _loadState(self) -> None:
+        files = self.statedir / "files.json"
+        results = self.statedir / "results.parquet"
+        if not files.exists() or not results.exists():
+            return
+        state = json.loads(files.read_text())
+        if state.get("project") != self.project_hash:
+            logger.warning("Project file changed, processing all data files again")
+            return
+        self.processed = {path: tuple(sig) for path, sig in state["files"].items()}
+        self.results = pl.read_parquet(results)
+        logger.info(f"Resuming watch with {len(self.processed)} processed files")
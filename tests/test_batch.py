@@ -0,0 +1,163 @@
+import polars as pl
+
+import pydre.filters
+import pydre.project
+from pydre.batch import BatchRun, distinctOutputFiles, sharedFilterPrefix
+from pydre.run import main
+
+DRIVES = ["Main_1_Load_1.dat", "Main_2_Load_2.dat", "Main_3_NoLoad_3.dat"]
+
+
+def make_drives(directory):
+    directory.mkdir()
+    for i, name in enumerate(DRIVES):
+        (directory / name).write_text(
+            "SimTime Velocity Brake\n"
+            + "".join(f"{t / 10} {i + t} {t % 2}\n" for t in range(10))
+        )
+
+
+def make_project(tmp_path, name, filters, metrics, datafiles="data/*.dat"):
+    toml = tmp_path / f"{name}.toml"
+    toml.write_text(
+        f"""
+        [config]
+        datafiles = ["{datafiles}"]
+        outputfile = "{name}.csv"
+        """
+        + filters
+        + metrics
+    )
+    return toml
+
+
+SHARED = """
+[filters.zscore]
+function = "zscoreCol"
+col = "Velocity"
+newcol = "VelocityZ"
+"""
+
+
+def projects(tmp_path):
+    make_drives(tmp_path / "data")
+    speed = make_project(
+        tmp_path,
+        "speed",
+        SHARED,
+        """
+        [metrics.meanVelocity]
+        function = "colMean"
+        var = "Velocity"
+        [metrics.maxZ]
+        function = "colMax"
+        var = "VelocityZ"
+        """,
+    )
+    brakes = make_project(
+        tmp_path,
+        "brakes",
+        SHARED
+        + """
+        [filters.zscoreBrake]
+        function = "zscoreCol"
+        col = "Brake"
+        newcol = "BrakeZ"
+        """,
+        """
+        [metrics.brakes]
+        function = "numbrakes"
+        [metrics.maxBrakeZ]
+        function = "colMax"
+        var = "BrakeZ"
+        """,
+        datafiles="data/*_Load_*.dat",
+    )
+    return speed, brakes
+
+
+def test_shared_filter_prefix(tmp_path):
+    speed, brakes = projects(tmp_path)
+    plans = [pydre.project.Project(p).compilePlan() for p in (speed, brakes)]
+    assert sharedFilterPrefix(plans) == 1
+    assert sharedFilterPrefix(plans[1:]) == 2
+    assert sharedFilterPrefix([]) == 0
+
+
+def test_batch_matches_separate_runs(tmp_path, monkeypatch):
+    speed, brakes = projects(tmp_path)
+    expected = [
+        pydre.project.Project(p).processDatafiles(numThreads=1) for p in (speed, brakes)
+    ]
+
+    calls = []
+    original = pydre.filters.filtersList["zscoreCol"]
+
+    def counting(drivedata, **kwargs):
+        calls.append(kwargs["newcol"])
+        return original(drivedata, **kwargs)
+
+    batch = [pydre.project.Project(p) for p in (speed, brakes)]
+    for project in batch:
+        steps = project.compilePlan().filters
+        object.__setattr__(steps[0], "func", counting)
+        object.__setattr__(steps[-1], "func", counting)
+    load = []
+    monkeypatch.setattr(
+        pydre.project.Project,
+        "loadDatafile",
+        lambda self, path, _orig=pydre.project.Project.loadDatafile: (
+            load.append(path.name) or _orig(self, path)
+        ),
+    )
+    run = BatchRun(batch)
+    run.processDatafiles(numThreads=1)
+
+    # each drive loaded once and the shared filter applied once per drive
+    assert sorted(load) == DRIVES
+    assert calls.count("VelocityZ") == 3
+    assert calls.count("BrakeZ") == 2
+    for project, result in zip(batch, expected):
+        key = ["ParticipantID", "ROI"]
+        assert project.results.sort(key).equals(result.sort(key))
+
+
+def test_batch_stops_on_interrupt(tmp_path, monkeypatch):
+    speed, brakes = projects(tmp_path)
+    run = BatchRun([pydre.project.Project(speed), pydre.project.Project(brakes)])
+
+    def interrupted(group, datafilename):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(run, "processSingleFile", interrupted)
+    run.processDatafiles(numThreads=1)
+    assert run._stop_event.is_set()
+    assert all(project.results.height == 0 for project in run.projects)
+
+    # Ctrl+C while waiting for the workers
+    def interruptedWait(futures):
+        raise KeyboardInterrupt
+        yield
+
+    monkeypatch.setattr("concurrent.futures.as_completed", interruptedWait)
+    run = BatchRun([pydre.project.Project(speed), pydre.project.Project(brakes)])
+    run.processDatafiles(numThreads=1)
+    assert run._stop_event.is_set()
+
+
+def test_distinct_output_files(tmp_path):
+    speed, brakes = projects(tmp_path)
+    batch = [pydre.project.Project(p, outputfile="out.csv") for p in (speed, brakes)]
+    distinctOutputFiles(batch)
+    assert [p.config["outputfile"] for p in batch] == [
+        "out.speed.csv",
+        "out.brakes.csv",
+    ]
+
+
+def test_batch_cli(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    speed, brakes = projects(tmp_path)
+    assert main(["batch", "-p", str(speed), str(brakes), "-t", "2"]) == 0
+    assert pl.read_csv(tmp_path / "speed.csv").height == 3
+    assert pl.read_csv(tmp_path / "brakes.csv").height == 2
@@ -0,0 +1,111 @@
+import os
+
+import pydre.project
+from pydre.catalog import Catalog, ignoreMatcher, matchesSelection
+from pydre.run import main
+
+
+def make_drives(directory, names):
+    directory.mkdir(exist_ok=True)
+    for name in names:
+        (directory / name).write_text("SimTime Velocity\n0.1 3\n0.2 5\n")
+
+
+DRIVES = [
+    "DX_1_Load_1.dat",
+    "DX_1_NoLoad_2.dat",
+    "DX_2_Load_3.dat",
+    "DX_2_NoLoad_4.dat",
+]
+
+
+def test_ignore_matcher():
+    matcher = ignoreMatcher(["bad_", "DX_2"])
+    assert matcher.search("/data/bad_file.dat")
+    assert matcher.search("/data/DX_2_Load_3.dat")
+    assert not matcher.search("/data/DX_1_Load_1.dat")
+    assert ignoreMatcher([]) is None
+
+
+def test_matches_selection():
+    metadata = {"ParticipantID": "2", "ScenarioName": "Load"}
+    assert matchesSelection(metadata, {"ScenarioName": "Load"})
+    assert matchesSelection(metadata, {"ParticipantID": [1, 2]})
+    assert not matchesSelection(metadata, {"ScenarioName": ["NoLoad"]})
+    assert not matchesSelection(metadata, {"DriveID": "1"})
+
+
+def test_catalog_refresh_is_incremental(tmp_path):
+    data = tmp_path / "data"
+    make_drives(data, DRIVES)
+    with Catalog(tmp_path / "catalog.sqlite") as catalog:
+        infos = catalog.refresh(data / "*.dat")
+        assert [i.path.name for i in infos] == DRIVES
+        assert infos[0].columns == ("SimTime", "Velocity")
+        assert infos[0].metadata["ScenarioName"] == "Load"
+
+        (data / DRIVES[0]).write_text("SimTime Velocity Lane\n0.1 3 1\n")
+        os.utime(data / DRIVES[0], ns=(1, 1))
+        (data / DRIVES[3]).unlink()
+        (data / "notes.txt").write_text("not a drive")
+        infos = catalog.refresh(data / "*.dat")
+        assert [i.path.name for i in infos] == DRIVES[:3]
+        assert infos[0].columns == ("SimTime", "Velocity", "Lane")
+        assert len(catalog) == 3
+
+    # the catalog persists between runs
+    with Catalog(tmp_path / "catalog.sqlite") as catalog:
+        selected = catalog.select({"ScenarioName": "Load"})
+        assert [i.path.name for i in selected] == ["DX_1_Load_1.dat", "DX_2_Load_3.dat"]
+        selected = catalog.select({"ScenarioName": "Load", "ParticipantID": [2]})
+        assert [i.path.name for i in selected] == ["DX_2_Load_3.dat"]
+
+
+def test_project_uses_catalog_and_selection(tmp_path):
+    make_drives(tmp_path / "data", DRIVES)
+    toml = tmp_path / "catalog.toml"
+    toml.write_text("""
+    [config]
+    datafiles = ["data/*.dat"]
+    catalog = "catalog.sqlite"
+    ignore = ["DX_1_NoLoad"]
+
+    [config.select]
+    ParticipantID = ["1", "2"]
+    ScenarioName = "NoLoad"
+
+    [metrics.meanVelocity]
+    function = "colMean"
+    var = "Velocity"
+    """)
+    proj = pydre.project.Project(toml)
+    assert [p.name for p in proj.filelist] == ["DX_2_NoLoad_4.dat"]
+    assert (tmp_path / "catalog.sqlite").exists()
+    assert len(proj.index) == 4
+
+    results = proj.processDatafiles(numThreads=1)
+    assert results["meanVelocity"].to_list() == [4.0]
+
+
+def test_project_selection_without_catalog(tmp_path):
+    make_drives(tmp_path, DRIVES)
+    toml = tmp_path / "select.toml"
+    toml.write_text("""
+    [config]
+    datafiles = ["*.dat"]
+    select = { ScenarioName = "Load" }
+    """)
+    proj = pydre.project.Project(toml)
+    assert [p.name for p in proj.filelist] == ["DX_1_Load_1.dat", "DX_2_Load_3.dat"]
+
+
+def test_catalog_cli(tmp_path, capsys):
+    make_drives(tmp_path / "data", DRIVES)
+    catalog = str(tmp_path / "catalog.sqlite")
+    pattern = str(tmp_path / "data" / "*.dat")
+    assert main(["catalog", catalog, pattern, "-s", "ParticipantID=1"]) == 0
+    out = capsys.readouterr().out.split()
+    assert [os.path.basename(p) for p in out] == [
+        "DX_1_Load_1.dat",
+        "DX_1_NoLoad_2.dat",
+    ]
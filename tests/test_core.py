@@ -2,6 +2,7 @@ from pathlib import Path
 import pytest
 import polars as pl
 from pydre.core import DriveData, ColumnsMatchError
+from pydre.schema import SchemaRegistry
 
 FIXTURE_DIR = Path(__file__).parent.resolve() / "test_data"
 
@@ -207,3 +208,71 @@ def test_check_columns_numeric_missing_column_logged():
     with pytest.raises(ColumnsMatchError) as exc_info:
         dd.checkColumnsNumeric(["not_a_column"])
     assert "not numeric" in str(exc_info.value)
+
+
+def test_load_gzip_datfile(tmp_path):
+    import gzip
+
+    from pydre.core import detectCompression
+
+    text = "VidTime SimTime Speed\n1 1 .\n2 2 3.5\n3 3 4\n"
+    plain = tmp_path / "DX_Alice_City_42.dat"
+    plain.write_text(text)
+    compressed = tmp_path / "DX_Alice_City_43.dat.gz"
+    compressed.write_bytes(gzip.compress(text.encode()))
+    assert detectCompression(plain) is None
+    assert detectCompression(compressed) == "gzip"
+
+    expected = DriveData.init_rti(plain)
+    expected.loadData()
+    dd = DriveData.init_rti(compressed)
+    dd.loadData()
+    assert dd.metadata["UniqueID"] == "43"
+    assert dd.data.equals(expected.data)
+
+    dd = DriveData.init_rti(compressed)
+    dd.loadData(SchemaRegistry())
+    assert dd.data["Speed"].to_list() == [None, 3.5, 4.0]
+
+
+def test_load_zstd_datfile(tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    from pydre.core import detectCompression
+
+    text = "VidTime SimTime\n1 1\n2 2\n3 3\n"
+    compressed = tmp_path / "DX_Alice_City_42.dat.zst"
+    compressed.write_bytes(zstandard.ZstdCompressor().compress(text.encode()))
+    assert detectCompression(compressed) == "zstd"
+
+    dd = DriveData.init_rti(compressed)
+    dd.loadData()
+    assert dd.data["SimTime"].to_list() == [1, 2, 3]
+
+
+def test_decompressed_file_is_removed(tmp_path):
+    import gzip
+
+    from pydre.core import decompressedFile
+
+    compressed = tmp_path / "DX_Alice_City_42.dat.gz"
+    compressed.write_bytes(gzip.compress(b"SimTime\n1\n" * 1000))
+    with decompressedFile(compressed) as source:
+        assert source != compressed
+        assert source.read_bytes() == b"SimTime\n1\n" * 1000
+    assert not source.exists()
+
+    plain = tmp_path / "DX_Alice_City_43.dat"
+    plain.write_text("SimTime\n1\n")
+    with decompressedFile(plain) as source:
+        assert source == plain
+    assert plain.exists()
+
+
+def test_load_compressed_scannerfile(tmp_path):
+    import gzip
+
+    file_path = tmp_path / "p001v01d02.txt.gz"
+    file_path.write_bytes(gzip.compress(b"colA\tcolB\n1\t2\n3\t4"))
+    dd = DriveData.init_scanner(file_path)
+    dd.loadData()
+    assert dd.data["colB"].to_list() == [2, 4]
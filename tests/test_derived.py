@@ -0,0 +1,90 @@
+import polars as pl
+import pytest
+
+import pydre.core
+import pydre.derived
+from pydre.core import ColumnsMatchError
+from pydre.derived import derivedColumn, registerDerived, withDerived
+from pydre.metrics.common import (
+    closeFollowing,
+    maxAcceleration,
+    roadExits,
+    timeAboveSpeed,
+    timeWithinSpeedLimit,
+)
+
+
+@pytest.fixture
+def drivedata():
+    df = pl.DataFrame(
+        {
+            "SimTime": [0.0, 0.1, 0.2, 0.15, 0.3, 1.3],
+            "Velocity": [10.0, 20.0, 20.0, 10.0, 20.0, 20.0],
+            "LonAccel": [3.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+            "LatAccel": [4.0, 0.0, 1.0, 0.0, 0.0, 0.0],
+        }
+    )
+    return pydre.core.DriveData.init_test(df, "test.dat")
+
+
+def test_derived_columns(drivedata):
+    dt = derivedColumn(drivedata, "dt")
+    assert dt.name == "dt"
+    assert dt.to_list() == pytest.approx([None, 0.1, 0.1, 0.0, 0.15, 1.0], nan_ok=True)
+    assert derivedColumn(drivedata, "VelocityMPH")[0] == pytest.approx(22.3694)
+    assert derivedColumn(drivedata, "TotalAccel")[0] == pytest.approx(5.0)
+
+    df = withDerived(drivedata, "dt", "VelocityMPH")
+    assert df.columns == drivedata.data.columns + ["dt", "VelocityMPH"]
+
+
+def test_derived_column_is_computed_once(drivedata):
+    calls = []
+
+    @registerDerived("testDouble", dependencies=["Velocity"])
+    def double():
+        calls.append(1)
+        return pl.col("Velocity") * 2
+
+    try:
+        first = derivedColumn(drivedata, "testDouble")
+        assert derivedColumn(drivedata, "testDouble") is first
+        assert len(calls) == 1
+
+        # a filter replacing the data invalidates the derived columns
+        drivedata.data = drivedata.data.with_columns(pl.col("Velocity") + 1)
+        assert derivedColumn(drivedata, "testDouble")[0] == 22.0
+        assert len(calls) == 2
+    finally:
+        del pydre.derived.derivedColumns["testDouble"]
+
+
+def test_derived_missing_dependency(drivedata):
+    with pytest.raises(ColumnsMatchError):
+        derivedColumn(drivedata, "gaze_angle")
+    with pytest.raises(KeyError):
+        derivedColumn(drivedata, "noSuchColumn")
+
+
+def test_metrics_share_derived_columns(drivedata):
+    assert timeAboveSpeed(drivedata, cutoff=15) == pytest.approx(1.35)
+    assert maxAcceleration(drivedata) == pytest.approx(5.0)
+    assert ("derived", "dt") in drivedata._cache
+    assert ("derived", "TotalAccel") in drivedata._cache
+
+
+def test_duration_metrics():
+    df = pl.DataFrame(
+        {
+            "SimTime": [0.0, 0.1, 0.2, 0.3, 0.4, 2.0],
+            "Velocity": [10.0, 10.0, 30.0, 30.0, 10.0, 10.0],
+            "SpeedLimit": [30.0, 30.0, 30.0, 30.0, 30.0, 30.0],
+            "RoadOffset": [1.0, 8.0, 8.0, 1.0, 1.0, 8.0],
+            "HeadwayTime": [1.0, 1.0, 3.0, 3.0, 1.0, 1.0],
+        }
+    )
+    drivedata = pydre.core.DriveData.init_test(df, "test.dat")
+    assert timeWithinSpeedLimit(drivedata) == pytest.approx(1.8)
+    assert roadExits(drivedata) == pytest.approx(0.7)
+    assert closeFollowing(drivedata, threshold=2) == pytest.approx(0.2)
+    assert closeFollowing(drivedata, threshold=2, percentage=True) == pytest.approx(0.5)
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 import polars as pl
 from pydre.core import DriveData
@@ -66,3 +67,46 @@ def test_speed_limit_match_time_none():
     data = make_drive_data(df)
     with pytest.raises(IndexError):
         driverdistraction.speedLimitMatchTime(data, 2.0, "SpeedLimit")
+
+
+def following_drive(delay_samples=90):
+    time = np.arange(0, 300, 1 / 60)
+    rng = np.random.default_rng(0)
+    lead = 20 + np.cumsum(rng.normal(0, 0.05, len(time)))
+    ownship = np.roll(lead, delay_samples) + rng.normal(0, 0.05, len(time))
+    df = pl.DataFrame(
+        {"SimTime": time, "OwnshipVelocity": ownship, "LeadCarVelocity": lead}
+    )
+    return DriveData.init_test(df, "following.dat")
+
+
+# ---- cross-correlation ----
+def test_cross_correlation_family():
+    data = following_drive()
+    assert driverdistraction.crossCorrelate(data) > 0.95
+    assert driverdistraction.crossCorrelationLag(data) == pytest.approx(1.5)
+    assert driverdistraction.speedCoherence(data) > 0.9
+
+    # the peak must lie within the lag window
+    assert driverdistraction.crossCorrelationLag(data, max_lag=1.0) <= 1.0
+
+
+def test_cross_correlation_derives_velocities():
+    time = np.arange(0, 60, 0.1)
+    df = pl.DataFrame(
+        {
+            "SimTime": time,
+            "XPos": 20 * time + np.sin(time),
+            "HeadwayTime": np.full(len(time), 2.0),
+        }
+    )
+    data = DriveData.init_test(df, "derived.dat")
+    derived = driverdistraction.addVelocities(data)
+    assert "LeadCarVelocity" in derived.columns
+    assert driverdistraction.crossCorrelate(data) is not None
+    assert (
+        driverdistraction.crossCorrelate(
+            DriveData.init_test(pl.DataFrame({"SimTime": time}), "none.dat")
+        )
+        is None
+    )
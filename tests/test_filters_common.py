@@ -21,6 +21,7 @@ from pydre.filters.common import (
     mergeSplitFiletime,
     zscoreCol,
     nullifyOutlier,
+    _jenksBreak,
 )
 
 
@@ -179,6 +180,30 @@ def test_number_binary_blocks_only_on():
     assert result.data["NumberedBlocks"].to_list() == [1.0, 1.0, 2.0]
 
 
+def test_number_binary_blocks_leading_null():
+    df = pl.DataFrame({"ButtonStatus": [None, 0, 1, 1, 0, 1]})
+    dd = pydre.core.DriveData.init_test(df, "test.dat")
+    result = numberBinaryBlocks(dd)
+    assert result.data["NumberedBlocks"].to_list() == [None, 0, 1, 1, 2, 3]
+
+    df = pl.DataFrame({"ButtonStatus": [None, 1, 1, 0, 1]})
+    dd = pydre.core.DriveData.init_test(df, "test.dat")
+    result = numberBinaryBlocks(dd, only_on=1)
+    assert result.data["NumberedBlocks"].to_list() == [1.0, 1.0, 2.0]
+
+
+def test_number_binary_blocks_null_inside_block():
+    df = pl.DataFrame({"ButtonStatus": [0, None, 1, 1, 0, 1]})
+    dd = pydre.core.DriveData.init_test(df, "test.dat")
+    result = numberBinaryBlocks(dd)
+    assert result.data["NumberedBlocks"].to_list() == [0, None, 1, 1, 2, 3]
+
+    df = pl.DataFrame({"ButtonStatus": [1, None, 1, 0, 1]})
+    dd = pydre.core.DriveData.init_test(df, "test.dat")
+    result = numberBinaryBlocks(dd, only_on=1)
+    assert result.data["NumberedBlocks"].to_list() == [1.0, 1.0, 2.0]
+
+
 def test_jenks_basic_classification():
     data = {"SimTime": [0, 1, 2, 3, 4], "headPitch": [5.0, 5.2, 10.0, 10.2, 10.5]}
     df = pl.DataFrame(data)
@@ -191,6 +216,27 @@ def test_jenks_basic_classification():
     assert len(unique_vals) == 2
 
 
+def test_jenks_break_matches_jenkspy():
+    # reference implementation, a development dependency only
+    jenkspy = pytest.importorskip("jenkspy")
+
+    rng = np.random.default_rng(7)
+    values = np.concatenate([rng.normal(0, 1, 400), rng.normal(5, 1.5, 300)])
+    expected = jenkspy.jenks_breaks(values.tolist(), n_classes=2)[1]
+    assert _jenksBreak(values) == expected
+
+    # the histogram approximation lands within one bin of the exact break
+    approx = _jenksBreak(values, exact=False, bins=200)
+    assert abs(approx - expected) <= (values.max() - values.min()) / 200
+
+
+def test_jenks_approximate_with_nulls():
+    data = {"headPitch": [5.0, None, 5.2, 10.0, 10.2, 10.5]}
+    dd = pydre.core.DriveData.init_test(pl.DataFrame(data), "test.dat")
+    result = Jenks(dd, oldCol="headPitch", newCol="hpBinary", exact=False, bins=50)
+    assert result.data["hpBinary"].to_list() == [0, 1, 0, 1, 1, 1]
+
+
 def test_fix_reversed_road_linear_land():
     data = {
         "SimTime": [0, 1, 2, 3, 4],
@@ -51,3 +51,24 @@ def test_smooth_gaze_data_low_variation():
 
     assert isinstance(result, DriveData)
     assert result.data.shape == dd.data.shape
+
+
+def test_smooth_gaze_data_removes_short_glances():
+    gaze = ["WindScreen"] * 10 + ["RearViewMirror"] * 2 + ["WindScreen"] * 8
+    gaze += ["InstrumentCluster"] * 10
+    df = pl.DataFrame(
+        {
+            "DatTime": [i * 0.05 for i in range(len(gaze))],
+            "FILTERED_GAZE_OBJ_NAME": gaze,
+        }
+    )
+    result = smoothGazeData(DummyDriveData(df), latencyShift=0).data
+
+    # the 0.05 s mirror glance is absorbed by the surrounding on-road glance
+    assert result["onroad"][:18].to_list() == [1.0] * 18
+    assert result["onroad"][20:28].to_list() == [0.0] * 8
+    assert result["gazenum"].unique().len() <= 3
+
+    shifted = smoothGazeData(DummyDriveData(df), latencyShift=4).data
+    assert shifted["onroad"][:16].to_list() == [1.0] * 16
+    assert shifted["onroad"][16:24].to_list() == [0.0] * 8
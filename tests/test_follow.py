@@ -0,0 +1,132 @@
+import polars as pl
+import pytest
+
+import pydre.metrics
+import pydre.project
+from pydre.follow import DatTailer, FollowSession
+from pydre.run import main
+
+HEADER = "SimTime Velocity Brake HeadwayDistance\n"
+
+
+def rows(start, stop):
+    lines = []
+    for i in range(start, stop):
+        brake = 1 if i % 7 in (3, 4) else 0
+        lines.append(f"{i / 10} {10 + i % 5}.5 {brake} {i % 11}\n")
+    return "".join(lines)
+
+
+def test_tailer_reads_appended_rows(tmp_path):
+    path = tmp_path / "drive.dat"
+    path.write_text(HEADER + "0.0 3 0 1\n0.1 4 . 2\n0.2 5")
+    tailer = DatTailer(path)
+    batch = tailer.read()
+    assert batch.columns == ["SimTime", "Velocity", "Brake", "HeadwayDistance"]
+    assert batch.get_column("Velocity").to_list() == [3.0, 4.0]
+    assert batch.get_column("Brake").to_list() == [0.0, None]
+    assert tailer.read() is None
+
+    # the partial line is completed, and an integer column gets a decimal value
+    with open(path, "a") as f:
+        f.write(".5 0 3\n0.3 6 0 4\n")
+    batch = tailer.read()
+    assert batch.get_column("Velocity").to_list() == [5.5, 6.0]
+    assert batch.schema["Velocity"] == pl.Float64
+
+
+def test_tailer_types_column_missing_in_first_rows(tmp_path):
+    path = tmp_path / "drive.dat"
+    path.write_text(HEADER + "0.0 3 0 .\n0.1 4 0 .\n")
+    tailer = DatTailer(path)
+    batch = tailer.read()
+    assert batch.schema["HeadwayDistance"] == pl.Float64
+    assert batch.get_column("HeadwayDistance").to_list() == [None, None]
+
+    # the lead vehicle appears
+    with open(path, "a") as f:
+        f.write("0.2 5 0 5.5\n0.3 6 0 2.0\n")
+    batch = tailer.read()
+    assert batch.schema["HeadwayDistance"] == pl.Float64
+    assert batch.get_column("HeadwayDistance").to_list() == [5.5, 2.0]
+
+    metric = pydre.metrics.metricsIncremental["leadVehicleCollision"]()
+    path.write_text(HEADER + "0.0 3 0 .\n0.1 4 0 .\n")
+    tailer = DatTailer(path)
+    state = metric.update(metric.init(), tailer.read())
+    with open(path, "a") as f:
+        f.write("0.2 5 0 5.5\n0.3 6 0 2.0\n")
+    state = metric.update(state, tailer.read())
+    assert metric.finalize(state) == 1
+
+
+def test_tailer_limits_batch_size(tmp_path):
+    path = tmp_path / "drive.dat"
+    path.write_text(HEADER + rows(0, 100))
+    tailer = DatTailer(path, max_bytes=64)
+    batches = list(tailer.batches())
+    assert len(batches) > 10
+    assert sum(b.height for b in batches) == 100
+
+
+@pytest.fixture
+def follow_project(tmp_path):
+    toml = tmp_path / "follow.toml"
+    toml.write_text("""
+    [config]
+    datafiles = ["*.dat"]
+
+    [metrics.meanVelocity]
+    function = "colMean"
+    var = "Velocity"
+
+    [metrics.brakes]
+    function = "numbrakes"
+    cutofflimit = 11
+
+    [metrics.collisions]
+    function = "leadVehicleCollision"
+    cutoff = 2
+
+    [metrics.firstVelocity]
+    function = "colFirst"
+    var = "Velocity"
+    """)
+    return toml
+
+
+def test_follow_session_matches_project(tmp_path, follow_project):
+    datafile = tmp_path / "Main_3_Load_1.dat"
+    datafile.write_text(HEADER)
+    project = pydre.project.Project(follow_project)
+    updates = []
+    session = FollowSession(project, datafile, interval=2.0, on_update=updates.append)
+
+    assert session.update() is None
+    for start in range(0, 200, 15):
+        with open(datafile, "a") as f:
+            text = rows(start, start + 15)
+            # stop writing in the middle of a line
+            f.write(text[:-4])
+        session.update()
+        with open(datafile, "a") as f:
+            f.write(text[-4:])
+    session.update()
+    assert len(updates) == 7
+    assert session.rows == 210
+
+    expected = pydre.project.Project(follow_project).processSingleFile(datafile)
+    results = session.results()
+    assert results["ParticipantID"].to_list() == ["3"]
+    for column in ("meanVelocity", "brakes", "collisions"):
+        assert results[column].to_list() == pytest.approx(expected[column].to_list())
+    assert results["firstVelocity"].to_list() == [None]
+
+
+def test_follow_cli(tmp_path, follow_project):
+    datafile = tmp_path / "Main_3_Load_1.dat"
+    datafile.write_text(HEADER + rows(0, 50))
+    out = tmp_path / "live.csv"
+    args = ["follow", "-p", str(follow_project), str(datafile), "-o", str(out)]
+    assert main(args + ["--poll", "0", "--idle-timeout", "0"]) == 0
+    assert pl.read_csv(out)["brakes"].to_list() == [5]
@@ -0,0 +1,82 @@
+import gzip
+import os
+from pathlib import Path
+
+import pydre.project
+from pydre.index import FileIndex, referencedColumns, scanFile
+from pydre.plan import compilePlan
+
+FIXTURE_DIR = Path(__file__).parent.resolve() / "test_data"
+
+
+def test_scan_file_reads_header_and_metadata():
+    info = scanFile(FIXTURE_DIR / "test_datfiles" / "clvspectest_Sub_8_Drive_3.dat")
+    assert info.columns[:3] == ("VidTime", "SimTime", "LonAccel")
+    assert "ParticipantID" in info.columns
+    assert info.metadata["ParticipantID"] == "8"
+    assert info.compression is None
+    assert info.missingColumns(["SimTime", "Velocity"]) == ["Velocity"]
+
+
+def test_scan_compressed_and_scanner_files(tmp_path):
+    gz = tmp_path / "DX_1_City_1.dat.gz"
+    gz.write_bytes(gzip.compress(b"SimTime Velocity\n" + b"0.1 3\n" * 1000))
+    info = scanFile(gz)
+    assert info.compression == "gzip"
+    assert info.columns == ("SimTime", "Velocity")
+
+    scanner = tmp_path / "p001v02d03.txt"
+    scanner.write_text("Time\tSpeed\n1\t2\n")
+    info = scanFile(scanner, "scanner")
+    assert info.columns == ("Time", "Speed")
+    assert info.metadata == {"ParticipantID": "001", "VisitID": "02", "DriveID": "03"}
+
+
+def test_file_index_refreshes_changed_files(tmp_path):
+    f = tmp_path / "DX_1_City_1.dat"
+    f.write_text("SimTime\n1\n")
+    index = FileIndex()
+    assert index.get(f).columns == ("SimTime",)
+    assert f in index
+
+    f.write_text("SimTime Velocity\n1 2\n")
+    os.utime(f, ns=(1, 1))
+    assert index.get(f).columns == ("SimTime", "Velocity")
+    assert len(index) == 1
+
+
+def test_referenced_columns():
+    plan = compilePlan(
+        {
+            "rois": [{"type": "column", "columnname": "Section"}],
+            "metrics": [
+                {"name": "meanV", "function": "colMean", "var": "Velocity"},
+                {"name": "maxV", "function": "colMax", "var": "Velocity"},
+            ],
+        }
+    )
+    assert referencedColumns(plan) == {
+        "Section": ["ROI column"],
+        "Velocity": ["metric meanV", "metric maxV"],
+    }
+
+
+def test_project_skips_files_without_required_columns(tmp_path):
+    (tmp_path / "DX_1_City_1.dat").write_text("SimTime Velocity\n0.1 3\n0.2 5\n")
+    (tmp_path / "DX_2_City_1.dat").write_text("SimTime\n0.1\n0.2\n")
+    toml = tmp_path / "required.toml"
+    toml.write_text("""
+    [config]
+    datafiles = ["*.dat"]
+    required_columns = ["Velocity"]
+
+    [metrics.meanVelocity]
+    function = "colMean"
+    var = "Velocity"
+    """)
+    proj = pydre.project.Project(toml)
+    assert len(proj.filelist) == 2
+    results = proj.processDatafiles(numThreads=1)
+    assert [p.name for p in proj.filelist] == ["DX_1_City_1.dat"]
+    assert results["ParticipantID"].to_list() == ["1"]
+    assert results["meanVelocity"].to_list() == [4.0]
@@ -0,0 +1,99 @@
+import polars as pl
+import pytest
+
+from pydre.merge import groupFragments, mergeDirectory, mergeDrive
+from pydre.run import main
+
+
+def write_fragment(path, rows):
+    lines = ["SimTime XPos YPos Velocity"]
+    lines += [" ".join(str(v) for v in row) for row in rows]
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def read_merged(path):
+    return pl.read_csv(path, separator=" ", null_values=".")
+
+
+@pytest.fixture
+def fragments(tmp_path):
+    first = write_fragment(
+        tmp_path / "Study_Sub_3_Drive_1.dat",
+        [(0.5, 0, 0, 10), (1.0, 10, 0, 11), (1.5, 20, 0, 12)],
+    )
+    # the restarted drive begins back at the start of the road
+    second = write_fragment(
+        tmp_path / "Study_Sub_3_Drive_4.dat",
+        [(0.5, 0, 0, 1), (1.0, 11, 0, 2), (1.5, 21, 0, 3), (2.0, 31, 0, 4)],
+    )
+    other = write_fragment(tmp_path / "Study_Sub_5_Drive_2.dat", [(0.5, 0, 0, 7)])
+    return first, second, other
+
+
+def test_group_fragments(fragments):
+    first, second, other = fragments
+    groups = groupFragments([second, other, first])
+    assert groups == {
+        (("ParticipantID", "3"),): [first, second],
+        (("ParticipantID", "5"),): [other],
+    }
+
+
+def test_sequential_merge(fragments, tmp_path):
+    first, second, _ = fragments
+    rows = mergeDrive([first, second], tmp_path / "merged.dat", "sequential")
+    assert rows == 7
+    merged = read_merged(tmp_path / "merged.dat")
+    assert merged["SimTime"].to_list() == [0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5]
+    assert merged["Velocity"].to_list() == [10, 11, 12, 1, 2, 3, 4]
+
+
+def test_spatial_merge_starts_at_nearest_position(fragments, tmp_path):
+    first, second, _ = fragments
+    rows = mergeDrive([first, second], tmp_path / "merged.dat", "Spatial")
+    assert rows == 5
+    merged = read_merged(tmp_path / "merged.dat")
+    assert merged["XPos"].to_list() == [0, 10, 20, 21, 31]
+    assert merged["SimTime"].to_list() == [0.5, 1.0, 1.5, 2.0, 2.5]
+
+
+@pytest.mark.parametrize("merge_type", ["sequential", "spatial"])
+def test_merged_time_increases_across_joins(tmp_path, merge_type):
+    fragments = [
+        write_fragment(
+            tmp_path / f"Study_Sub_3_Drive_{drive}.dat",
+            [(i * 0.1, x + 10 * i, 0, 1) for i in range(5)],
+        )
+        for drive, x in [(1, 0), (2, 25), (3, 50)]
+    ]
+    mergeDrive(fragments, tmp_path / "merged.dat", merge_type)
+    times = read_merged(tmp_path / "merged.dat")["SimTime"]
+    steps = times.diff().drop_nulls()
+    assert steps.min() > 0
+    assert steps.max() == pytest.approx(0.1)
+
+
+def test_merge_columns_follow_first_fragment(tmp_path):
+    first = write_fragment(tmp_path / "Study_Sub_1_Drive_1.dat", [(0.5, 0, 0, 1)])
+    second = tmp_path / "Study_Sub_1_Drive_2.dat"
+    second.write_text("SimTime Lane\n0.5 2\n")
+    mergeDrive([first, second], tmp_path / "merged.dat")
+    merged = read_merged(tmp_path / "merged.dat")
+    assert merged.columns == ["SimTime", "XPos", "YPos", "Velocity"]
+    assert merged["Velocity"].to_list() == [1, None]
+
+
+def test_unknown_merge_type(fragments, tmp_path):
+    with pytest.raises(ValueError):
+        mergeDrive(list(fragments[:2]), tmp_path / "merged.dat", "temporal")
+
+
+def test_merge_directory_cli(fragments, tmp_path, capsys):
+    assert main(["merge", "-d", str(tmp_path), "-t", "sequential"]) == 0
+    merged = sorted(p.name for p in (tmp_path / "MergedData").iterdir())
+    assert merged == ["Study_Sub_3_Drive_1.dat", "Study_Sub_5_Drive_2.dat"]
+    assert len(capsys.readouterr().out.split()) == 2
+
+    outputs = mergeDirectory(tmp_path, "spatial", tmp_path / "spatial")
+    assert [p.name for p in outputs] == merged
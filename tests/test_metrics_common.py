@@ -588,3 +588,54 @@ def test_timeToOutsideThreshold():
         dd2, var="Steer", threshold_high=0.5
     )
     assert result2 is None
+
+
+@pytest.fixture
+def sweep_drive():
+    import numpy as np
+
+    rng = np.random.default_rng(11)
+    n = 500
+    times = np.cumsum(rng.uniform(0.01, 0.06, n))
+    # a splice with time going backwards, and a gap
+    times[200:] -= 1.0
+    times[300:] += 2.0
+    df = pl.DataFrame(
+        {
+            "SimTime": times,
+            "Velocity": rng.uniform(0, 30, n),
+            "HeadwayTime": rng.uniform(-1, 4, n),
+            "HeadwayDistance": rng.integers(0, 8, n).astype(float),
+        }
+    ).with_columns(
+        pl.when(pl.int_range(pl.len()) % 37 == 0)
+        .then(None)
+        .otherwise(pl.col("HeadwayDistance"))
+        .alias("HeadwayDistance")
+    )
+    return pydre.core.DriveData.init_test(df, "test.dat")
+
+
+@pytest.mark.parametrize(
+    "metric, parameter, values, kwargs",
+    [
+        ("timeAboveSpeed", "cutoff", [0, 5.5, 10, 29, 40], {}),
+        ("timeAboveSpeed", "cutoff", [3, 12], {"percentage": True}),
+        ("closeFollowing", "threshold", [0.5, 1, 2.5, 3.0, 5], {}),
+        (
+            "closeFollowing",
+            "threshold",
+            [1, 2],
+            {"percentage": True, "minvelocity": 10},
+        ),
+        ("leadVehicleCollision", "cutoff", [0, 1, 2.5, 3, 7, 8], {}),
+    ],
+)
+def test_sweeps_match_metric(sweep_drive, metric, parameter, values, kwargs):
+    sweep_parameter, sweep = pydre.metrics.metricsSweep[metric]
+    assert sweep_parameter == parameter
+    expected = [
+        pydre.metrics.metricsList[metric](sweep_drive, **kwargs, **{parameter: v})
+        for v in values
+    ]
+    assert sweep(sweep_drive, values, **kwargs) == pytest.approx(expected)
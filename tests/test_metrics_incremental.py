@@ -0,0 +1,104 @@
+import numpy as np
+import polars as pl
+import pytest
+
+import pydre.core
+import pydre.metrics
+from pydre.metrics import metricsIncremental, metricsList
+from pydre.metrics.incremental import Digest, Moments, RunCount
+
+
+@pytest.fixture
+def drive():
+    rng = np.random.default_rng(3)
+    n = 1000
+    return pl.DataFrame(
+        {
+            "SimTime": np.arange(n) / 60,
+            "Velocity": rng.normal(20, 5, n),
+            "Brake": (rng.random(n) < 0.1).astype(float),
+            "LaneOffset": rng.normal(0, 0.5, n),
+            "HeadwayDistance": rng.uniform(0, 10, n),
+        }
+    ).with_columns(
+        # missing values inside a run
+        pl.when(pl.int_range(pl.len()) % 97 == 0)
+        .then(None)
+        .otherwise(pl.col("Velocity"))
+        .alias("Velocity")
+    )
+
+
+def chunks(df, sizes):
+    start = 0
+    for size in sizes:
+        yield df.slice(start, size)
+        start += size
+    yield df.slice(start)
+
+
+@pytest.mark.parametrize(
+    "name, kwargs",
+    [
+        ("colMean", {"var": "Velocity"}),
+        ("colMean", {"var": "Velocity", "cutoff": 20}),
+        ("colSD", {"var": "Velocity"}),
+        ("colMin", {"var": "Velocity"}),
+        ("colMax", {"var": "LaneOffset"}),
+        ("colMedian", {"var": "Velocity", "cutoff": 15}),
+        ("numbrakes", {"cutofflimit": 18}),
+        ("laneViolations", {}),
+        ("leadVehicleCollision", {"cutoff": 1.5}),
+    ],
+)
+def test_incremental_matches_metric(drive, name, kwargs):
+    expected = metricsList[name](
+        pydre.core.DriveData.init_test(drive, "test.dat"), **kwargs
+    )
+    metric = metricsIncremental[name](**kwargs)
+    for sizes in ([1000], [1, 0, 10, 100, 7], [3] * 300):
+        assert metric.compute(chunks(drive, sizes)) == pytest.approx(expected)
+
+
+def test_incremental_states_merge(drive):
+    metric = metricsIncremental["leadVehicleCollision"]()
+    parts = [metric.summarize(chunk) for chunk in chunks(drive, [5] * 150)]
+    # parallel reduction of neighbouring parts gives the same count as sequential updates
+    while len(parts) > 1:
+        parts = [
+            metric.merge(*parts[i : i + 2]) if i + 1 < len(parts) else parts[i]
+            for i in range(0, len(parts), 2)
+        ]
+    assert metric.finalize(parts[0]) == metric.compute(chunks(drive, [5] * 150))
+
+
+def test_incremental_missing_column(drive):
+    metric = metricsIncremental["colMean"](var="Steer")
+    assert metric.compute(chunks(drive, [10])) is None
+    assert "colFirst" not in metricsIncremental
+
+
+def test_moments():
+    values = pl.Series([1.0, 2.0, 4.0, 8.0])
+    merged = Moments.of(values[:1]) + Moments() + Moments.of(values[1:])
+    assert merged.mean == pytest.approx(values.mean())
+    assert merged.m2 / 3 == pytest.approx(values.var())
+
+
+def test_run_count_boundary():
+    state = RunCount.of(pl.Series([True, False])) + RunCount.of(pl.Series([True]))
+    assert state.count == 1
+    state = RunCount.of(pl.Series([True, None])) + RunCount.of(pl.Series([True]))
+    assert state.count == 0
+    assert (RunCount() + RunCount.of(pl.Series([True]))).count == 0
+
+
+def test_digest_median_is_approximate_for_long_drives():
+    rng = np.random.default_rng(7)
+    values = rng.exponential(2.0, 100_000)
+    digest = Digest.empty()
+    for part in np.array_split(values, 50):
+        digest = digest.merge(Digest(part, np.ones(len(part))), 500, 5000)
+    assert len(digest.means) < 5000
+    assert digest.count == len(values)
+    assert digest.quantile(0.5) == pytest.approx(np.median(values), rel=0.01)
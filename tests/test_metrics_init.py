@@ -3,7 +3,12 @@ import polars as pl
 from pathlib import Path
 import pydre.metrics as metrics_module
 
-from pydre.metrics import registerMetric, metricsList, metricsColNames
+from pydre.metrics import (
+    registerMetric,
+    metricsList,
+    metricsColNames,
+    metricsColTypes,
+)
 from pydre.core import DriveData
 
 
@@ -34,6 +39,26 @@ def test_register_metric_defaults_to_func_name(dummy_drive_data):
     assert metricsList["speed_range"](dummy_drive_data) == 20
 
 
+def test_register_metric_column_types():
+    @registerMetric(columntypes=pl.Float64)
+    def typed_metric(data: DriveData):
+        return 1.0
+
+    @registerMetric("typed_pair", ["a", "b"], [pl.String, None])
+    def typed_pair(data: DriveData):
+        return "x", 1
+
+    assert metricsColTypes["typed_metric"] == [pl.Float64]
+    assert metricsColTypes["typed_pair"] == [pl.String, None]
+    assert metricsColTypes["speed_range"] == [None]
+
+    with pytest.raises(ValueError):
+
+        @registerMetric("bad_types", ["a", "b"], [pl.Float64])
+        def bad_types(data: DriveData):
+            return 1, 2
+
+
 def test_check_data_columns_decorator_logs(monkeypatch):
     log_msgs = []
 
@@ -51,6 +76,19 @@ def test_check_data_columns_decorator_logs(monkeypatch):
     assert any("return value" in str(m) for m in log_msgs)
 
 
+# import all built-in metric modules first, so modules imported later by other
+# test files are not dropped from the registries on teardown
+metricsList.loadAll()
+_savedMetricsList = dict(metricsList)
+_savedMetricsColNames = dict(metricsColNames)
+_savedMetricsColTypes = dict(metricsColTypes)
+
+
 def teardown_module(module):
+    # restore the registries so later test modules still see the built-in metrics
     metricsList.clear()
     metricsColNames.clear()
+    metricsList.update(_savedMetricsList)
+    metricsColNames.update(_savedMetricsColNames)
+    metricsColTypes.clear()
+    metricsColTypes.update(_savedMetricsColTypes)
@@ -0,0 +1,73 @@
+import polars as pl
+
+from pydre.core import DriveData
+from pydre.metrics import R2DMetrics
+
+
+def make_drive(data: dict) -> DriveData:
+    return DriveData.init_test(pl.DataFrame(data), "test_r2d.dat")
+
+
+def test_throttle_reaction_time():
+    dd = make_drive(
+        {
+            "SimTime": [10.0, 11.0, 12.0, 13.0, 14.0, 15.0],
+            "FollowCarBrakingStatus": [0, 1, 1, 1, 1, 1],
+            "Brake": [0.0, 5.0, 0.0, 0.0, 0.0, 0.0],
+            "LonAccel": [1.0, -2.0, -1.0, 0.5, 1.0, 1.0],
+        }
+    )
+    assert R2DMetrics.throttleReactionTime(dd) == 3.0
+
+    no_brake = make_drive(
+        {
+            "SimTime": [0.0, 1.0],
+            "FollowCarBrakingStatus": [0, 0],
+            "Brake": [0.0, 0.0],
+            "LonAccel": [1.0, 1.0],
+        }
+    )
+    assert R2DMetrics.throttleReactionTime(no_brake) is None
+
+
+def test_event_speed_recovery_time():
+    data = {
+        "SimTime": [0.0, 1.0, 2.0, 3.0, 4.0, 5.0],
+        "Velocity": [16.0, 11.0, 10.0, 11.0, 12.0, 15.0],
+        "Brake": [0.0] * 6,
+        "EventName": ["Deer"] * 6,
+    }
+    assert R2DMetrics.eventSpeedRecoveryTime(make_drive(data)) == 2.0
+
+    data["Velocity"] = [16.0, 10.0, 10.0, 10.0, 10.0, 10.0]
+    assert R2DMetrics.eventSpeedRecoveryTime(make_drive(data)) == "NoRecover"
+
+    data["Velocity"] = [16.0] * 6
+    assert R2DMetrics.eventSpeedRecoveryTime(make_drive(data)) == "NoSlowDown"
+
+    data["EventName"] = [""] * 6
+    assert R2DMetrics.eventSpeedRecoveryTime(make_drive(data)) == "NoEvent"
+
+
+def test_event_recenter_recovery_time():
+    data = {
+        "SimTime": [0.0, 1.0, 2.0, 3.0, 4.0],
+        "LaneOffset": [0.1, 1.0, 0.9, 0.3, 0.1],
+        "EventName": ["Trash"] * 5,
+    }
+    assert R2DMetrics.eventRecenterRecoveryTime(make_drive(data)) == 1.0
+
+    data["LaneOffset"] = [0.1, 1.0, 0.9, 0.8, 0.7]
+    assert R2DMetrics.eventRecenterRecoveryTime(make_drive(data)) == "NoRecover"
+
+
+def test_reaction_time_event_true_r2d():
+    dd = make_drive(
+        {
+            "SimTime": [1.0, 2.0, 3.0, 4.0],
+            "Throttle": [0.5, 0.5, 0.5, 0.5],
+            "Steer": [0.0, 0.0, 0.3, 0.0],
+        }
+    )
+    assert R2DMetrics.reactionCheckVarVal(dd, "Throttle", 0.1) is None
+    assert R2DMetrics.reactionTimeEventTrueR2D(dd, "Throttle", "Steer", 0.1, 0.2) == 2.0
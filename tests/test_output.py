@@ -0,0 +1,69 @@
+import polars as pl
+import polars.testing
+import pytest
+
+from pydre import output
+
+RESULTS = pl.DataFrame(
+    {
+        "ParticipantID": ["1", "1", "2"],
+        "ScenarioName": ["Load", "NoLoad", "Load"],
+        "ROI": ["a", "a", "b"],
+        "meanSpeed": [1.5, 2.0, None],
+        "count": [3, 4, 5],
+    }
+)
+
+
+@pytest.mark.parametrize(
+    "filename, config, expected",
+    [
+        ("out.csv", {}, "csv"),
+        ("out.parquet", {}, "parquet"),
+        ("out.PQ", {}, "parquet"),
+        ("out.arrow", {}, "ipc"),
+        ("out.feather", {}, "ipc"),
+        ("out.txt", {}, "csv"),
+        ("out.csv", {"output_format": "parquet"}, "parquet"),
+        ("out.csv", {"output_format": "Arrow"}, "ipc"),
+        ("out", {"output_partition_by": "ScenarioName"}, "parquet"),
+    ],
+)
+def test_output_format(filename, config, expected):
+    assert output.outputFormat(filename, config) == expected
+
+
+@pytest.mark.parametrize("filename", ["out.parquet", "out.arrow"])
+def test_roundtrip_keeps_dtypes(tmp_path, filename):
+    path = tmp_path / filename
+    output.writeResults(RESULTS, path, {})
+    polars.testing.assert_frame_equal(output.readResults(path), RESULTS)
+
+
+def test_csv_roundtrip(tmp_path):
+    path = tmp_path / "out.csv"
+    output.writeResults(RESULTS, path)
+    assert output.readResults(path).shape == RESULTS.shape
+
+
+def test_partitioned_output(tmp_path):
+    path = tmp_path / "out"
+    output.writeResults(RESULTS, path, {"output_partition_by": ["ScenarioName"]})
+    assert (path / "ScenarioName=Load").is_dir()
+    assert (path / "ScenarioName=NoLoad").is_dir()
+
+    loaded = output.readResults(path)
+    polars.testing.assert_frame_equal(
+        loaded.select(RESULTS.columns).sort("ScenarioName", "ParticipantID"),
+        RESULTS.sort("ScenarioName", "ParticipantID"),
+    )
+    pruned = pl.scan_parquet(path, hive_partitioning=True).filter(
+        pl.col("ScenarioName") == "NoLoad"
+    )
+    assert pruned.collect().height == 1
+
+
+def test_partition_missing_column_falls_back(tmp_path):
+    path = tmp_path / "out.parquet"
+    output.writeResults(RESULTS, path, {"output_partition_by": "Nope"})
+    assert path.is_file()
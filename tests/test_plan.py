@@ -0,0 +1,248 @@
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+import pydre.filters
+import pydre.metrics
+import pydre.metrics.common
+import pydre.filters.common
+import pydre.project
+from pydre.core import DriveData
+from pydre.plan import (
+    ProjectDefinitionError,
+    buildResultFrame,
+    compileFilter,
+    compileMetric,
+    compilePlan,
+    compileRoi,
+)
+
+FIXTURE_DIR = Path(__file__).parent.resolve() / "test_data"
+
+
+@pytest.fixture
+def drivedata():
+    df = pl.DataFrame({"XPos": [1.0, 2.0, 3.0], "Velocity": [10.0, 20.0, 30.0]})
+    return DriveData.init_test(df, Path("test.dat"))
+
+
+def test_compile_metric_binds_arguments(drivedata):
+    step = compileMetric({"name": "meanX", "function": "colMean", "var": "XPos"})
+    assert step.columns == ("meanX",)
+    assert dict(step.kwargs) == {"var": "XPos"}
+    assert step.run(drivedata) == {"meanX": 2.0}
+
+
+def test_compile_metric_kwargs_are_immutable():
+    step = compileMetric({"name": "meanX", "function": "colMean", "var": "XPos"})
+    with pytest.raises(TypeError):
+        step.kwargs["var"] = "YPos"
+
+
+def test_compile_metric_bad_argument():
+    with pytest.raises(ProjectDefinitionError) as e:
+        compileMetric({"name": "meanX", "function": "colMean", "column": "XPos"})
+    assert "meanX" in str(e.value)
+
+
+def test_compile_metric_missing_required_argument():
+    with pytest.raises(ProjectDefinitionError):
+        compileMetric({"name": "meanX", "function": "colMean"})
+
+
+def test_compile_metric_unknown_function():
+    with pytest.raises(KeyError):
+        compileMetric({"name": "x", "function": "doesNotExist"})
+
+
+def test_compile_filter(drivedata):
+    step = compileFilter(
+        {"name": "z", "function": "zscoreCol", "col": "XPos", "newcol": "XPos_z"}
+    )
+    result = step.run(drivedata)
+    assert "XPos_z" in result.data.columns
+
+
+def test_compile_filter_missing_function():
+    with pytest.raises(ProjectDefinitionError):
+        compileFilter({"name": "nofunction"})
+
+
+def test_compile_roi_missing_field():
+    with pytest.raises(ProjectDefinitionError):
+        compileRoi({"type": "column"}, lambda f: f)
+
+
+def test_compile_roi_load_errors(tmp_path, monkeypatch):
+    with pytest.raises(ProjectDefinitionError):
+        compileRoi({"type": "rect", "filename": tmp_path / "missing.csv"}, lambda f: f)
+
+    def broken(filename):
+        raise RuntimeError("bug in ROI code")
+
+    monkeypatch.setattr("pydre.rois.SpaceROI", broken)
+    with pytest.raises(RuntimeError):
+        compileRoi({"type": "rect", "filename": "rois.csv"}, lambda f: f)
+
+
+def test_compile_roi_unknown_type(drivedata):
+    step = compileRoi({"type": "nonexistent"}, lambda f: f)
+    assert step.split(drivedata) == [drivedata]
+
+
+def test_compile_plan_collects_all_errors():
+    definition = {
+        "filters": [{"name": "f", "function": "noSuchFilter"}],
+        "metrics": [
+            {"name": "ok", "function": "colMean", "var": "XPos"},
+            {"name": "bad", "function": "noSuchMetric"},
+        ],
+    }
+    with pytest.raises(ProjectDefinitionError) as e:
+        compilePlan(definition)
+    assert len(e.value.problems) == 2
+
+
+def test_plan_output_columns(monkeypatch):
+    monkeypatch.setitem(pydre.metrics.metricsList, "pair", lambda d: (1, 2))
+    monkeypatch.setitem(pydre.metrics.metricsColNames, "pair", ["first", "second"])
+    plan = compilePlan(
+        {
+            "metrics": [
+                {"name": "meanX", "function": "colMean", "var": "XPos"},
+                {"name": "pairs", "function": "pair"},
+            ]
+        }
+    )
+    assert plan.output_columns == ("ROI", "meanX", "first", "second")
+
+
+def test_plan_result_schema(monkeypatch):
+    monkeypatch.setitem(pydre.metrics.metricsList, "pair", lambda d: (1, 2))
+    monkeypatch.setitem(pydre.metrics.metricsColNames, "pair", ["first", "second"])
+    monkeypatch.setitem(pydre.metrics.metricsColTypes, "pair", [None, pl.Int64])
+    plan = compilePlan(
+        {
+            "metrics": [
+                {"name": "meanX", "function": "colMean", "var": "XPos"},
+                {"name": "firstX", "function": "colFirst", "var": "XPos"},
+                {"name": "pairs", "function": "pair"},
+            ]
+        }
+    )
+    assert plan.result_schema == {
+        "ROI": pl.String,
+        "meanX": pl.Float64,
+        "second": pl.Int64,
+    }
+
+
+def test_build_result_frame_uses_declared_types():
+    schema = {"ROI": pl.String, "time": pl.Float64, "count": pl.Int64}
+    columns = {
+        "ParticipantID": ["1", "2"],
+        "ROI": [None, 3],
+        "time": [None, 4],
+        "count": [2, None],
+        "other": [None, "a"],
+    }
+    result = buildResultFrame(columns, schema)
+    assert result.columns == ["ParticipantID", "ROI", "time", "count", "other"]
+    assert result.schema == {
+        "ParticipantID": pl.String,
+        "ROI": pl.String,
+        "time": pl.Float64,
+        "count": pl.Int64,
+        "other": pl.String,
+    }
+    assert result["ROI"].to_list() == [None, "3"]
+    assert result["time"].to_list() == [None, 4.0]
+
+
+def test_build_result_frame_falls_back_on_mismatch():
+    result = buildResultFrame({"time": [1.5, "never"]}, {"time": pl.Float64})
+    assert result["time"].to_list() == ["1.5", "never"]
+
+
+def test_project_plan_errors_before_processing(tmp_path):
+    datafile = tmp_path / "Sub_1_Drive_1.dat"
+    datafile.write_text("SimTime XPos\n0.0 1.0\n")
+    toml = tmp_path / "bad.toml"
+    toml.write_text(
+        """
+        [config]
+        datafiles = ["*.dat"]
+
+        [metrics.meanX]
+        function = "colMean"
+        variable = "XPos"
+        """
+    )
+    project = pydre.project.Project(toml)
+    with pytest.raises(ProjectDefinitionError):
+        project.processDatafiles(numThreads=1)
+
+
+@pytest.mark.datafiles(FIXTURE_DIR / "good_projectfiles" / "test1_pf.toml")
+def test_project_compile_plan_is_cached(datafiles):
+    project = pydre.project.Project(datafiles / "test1_pf.toml")
+    plan = project.compilePlan()
+    assert project.compilePlan() is plan
+    assert [m.name for m in plan.metrics] == ["meanXPos", "meanYPos"]
+    assert plan.rois[0].roi_type == "column"
+
+
+def test_compile_metric_sweep(drivedata):
+    step = compileMetric(
+        {
+            "name": "fast",
+            "function": "timeAboveSpeed",
+            "cutoff": {"start": 5, "stop": 25, "step": 10},
+        }
+    )
+    assert step.columns == ("fast_cutoff_5", "fast_cutoff_15", "fast_cutoff_25")
+    assert step.dtypes == (pl.Float64,) * 3
+    assert "cutoff" not in step.kwargs
+    drivedata.data = drivedata.data.with_columns(SimTime=pl.Series([0.0, 1.0, 2.0]))
+    assert step.run(drivedata) == {
+        "fast_cutoff_5": 2.0,
+        "fast_cutoff_15": 2.0,
+        "fast_cutoff_25": 1.0,
+    }
+
+
+def test_compile_metric_sweep_without_sweep_function(drivedata):
+    step = compileMetric(
+        {
+            "name": "mean",
+            "function": "colMean",
+            "var": "Velocity",
+            "cutoff": {"sweep": [15, 25.5]},
+        }
+    )
+    assert step.columns == ("mean_cutoff_15", "mean_cutoff_25.5")
+    assert step.run(drivedata) == {"mean_cutoff_15": 25.0, "mean_cutoff_25.5": 30.0}
+
+
+def test_compile_metric_bad_sweeps():
+    with pytest.raises(ProjectDefinitionError):
+        compileMetric(
+            {
+                "name": "m",
+                "function": "colMean",
+                "var": {"sweep": ["a", "b"]},
+                "cutoff": {"sweep": [1]},
+            }
+        )
+    with pytest.raises(ProjectDefinitionError):
+        compileMetric(
+            {
+                "name": "m",
+                "function": "colMean",
+                "var": "x",
+                "cutoff": {"start": 2, "stop": 1, "step": 1},
+            }
+        )
+    with pytest.raises(ProjectDefinitionError):
+        compileMetric({"name": "m", "function": "colMean", "limit": {"sweep": [1, 2]}})
@@ -67,7 +67,8 @@ def test_project_custom_metric(datafiles):
                 "ROI": None,
                 "custom_test": 1387.6228702430055,
             }
-        ]
+        ],
+        schema_overrides={"ROI": pl.String},
     )
 
     polars.testing.assert_frame_equal(proj.results, expected_result)
@@ -469,3 +470,43 @@ def test_save_results_without_running_logs_error(tmp_path, caplog, capsys):
     out, err = capsys.readouterr()
     msg = "Results not computed yet"
     assert (msg in caplog.text) or (msg in err)
+
+
+def test_process_single_file_returns_columnar_results(tmp_path):
+    datafile = tmp_path / "Sub_1_Drive_1.dat"
+    datafile.write_text(
+        "SimTime Velocity Section\n0.0 10.0 1\n0.1 20.0 1\n0.2 30.0 2\n0.3 50.0 2\n"
+    )
+    toml = tmp_path / "columnar.toml"
+    toml.write_text("""
+    [config]
+    datafiles = ["Sub_1_Drive_1.dat"]
+
+    [rois.sections]
+    type = "column"
+    columnname = "Section"
+
+    [metrics.meanVelocity]
+    function = "colMean"
+    var = "Velocity"
+
+    [metrics.firstTime]
+    function = "colFirst"
+    var = "SimTime"
+    """)
+    proj = pydre.project.Project(toml)
+    result = proj.processSingleFile(datafile).sort("ROI")
+
+    assert result.columns == [
+        "ParticipantID",
+        "UniqueID",
+        "ScenarioName",
+        "DXmode",
+        "ROI",
+        "meanVelocity",
+        "firstTime",
+    ]
+    assert result["ROI"].to_list() == ["1", "2"]
+    assert result["meanVelocity"].dtype == pl.Float64
+    assert result["meanVelocity"].to_list() == [15.0, 40.0]
+    assert result["ParticipantID"].to_list() == ["1", "1"]
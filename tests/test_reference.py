@@ -0,0 +1,83 @@
+import os
+
+import polars as pl
+import pytest
+
+import pydre.core
+from pydre.filters.R2DFilters import DesignateNonEventRegions
+from pydre.reference import ReferenceTableCache, lookupReference, referenceTables
+
+
+@pytest.fixture
+def reference_csv(tmp_path):
+    path = tmp_path / "regions.csv"
+    path.write_text(
+        "Scenario,Week,startX1,endX1,startX2,endX2,startX3,endX3\n"
+        "Load,1,0,10,20,30,40,50\n"
+        "Load,2,5,15,25,35,45,55\n"
+        "NoLoad,1,1,2,3,4,5,6\n"
+    )
+    yield path
+    referenceTables.clear()
+
+
+def test_lookup_partitions_by_keys(reference_csv):
+    cache = ReferenceTableCache()
+    rows = cache.lookup(reference_csv, Scenario="Load", Week="2")
+    assert rows.height == 1
+    assert rows.get_column("startX1").item() == 5
+
+    table = cache.get(reference_csv)
+    assert ("Scenario", "Week") in table.partitions
+    # same object is returned on subsequent lookups
+    assert cache.get(reference_csv) is table
+
+
+def test_lookup_no_match_returns_empty_frame(reference_csv):
+    cache = ReferenceTableCache()
+    rows = cache.lookup(reference_csv, Scenario="Missing", Week=1)
+    assert rows.height == 0
+    assert rows.columns == cache.get(reference_csv).data.columns
+
+
+def test_lookup_matches_numeric_keys_across_types(tmp_path):
+    path = tmp_path / "weeks.csv"
+    path.write_text("Scenario,Week,startX1\nLoad,1.0,7\nLoad,2.5,9\n")
+    cache = ReferenceTableCache()
+    assert cache.get(path).data.schema["Week"] == pl.Float64
+    for week in (1, 1.0, "1", "1.0"):
+        assert cache.lookup(path, Scenario="Load", Week=week)["startX1"].to_list() == [
+            7
+        ]
+    assert cache.lookup(path, Scenario="Load", Week="2.5")["startX1"].to_list() == [9]
+
+
+def test_lookup_missing_key_column(reference_csv):
+    cache = ReferenceTableCache()
+    with pytest.raises(KeyError):
+        cache.lookup(reference_csv, ScenarioName="Load")
+
+
+def test_reload_on_change(reference_csv):
+    cache = ReferenceTableCache()
+    first = cache.get(reference_csv)
+    reference_csv.write_text(
+        "Scenario,Week,startX1,endX1,startX2,endX2,startX3,endX3\n"
+        "Load,1,100,110,120,130,140,150\n"
+    )
+    stat = reference_csv.stat()
+    os.utime(reference_csv, ns=(stat.st_atime_ns, first.mtime_ns + 1_000_000_000))
+    second = cache.get(reference_csv)
+    assert second is not first
+    assert second.lookup(Scenario="Load", Week=1).get_column("startX1").item() == 100
+
+
+def test_designate_non_event_regions_uses_cache(reference_csv):
+    df = pl.DataFrame({"XPos": [0.0, 5.0, 25.0, 45.0, 60.0]})
+    dd = pydre.core.DriveData.init_test(df, "test.dat")
+    dd.metadata = {"ParticipantID": "3110001w1", "ScenarioName": "Load"}
+
+    result = DesignateNonEventRegions(dd, dataFile=str(reference_csv))
+
+    assert result.data.get_column("NonEventRegion").to_list() == [1, 1, 2, 3]
+    assert lookupReference(reference_csv, Scenario="Load", Week="1").height == 1
@@ -0,0 +1,113 @@
+import os
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+import pydre.filters
+import pydre.metrics
+from pydre.registry import LazyRegistry, buildManifest
+
+SRC_DIR = Path(__file__).parent.parent.resolve() / "src"
+
+
+def test_manifest_matches_registered_functions():
+    pydre.metrics.metricsList.loadAll()
+    pydre.filters.filtersList.loadAll()
+
+    for name, func in dict.items(pydre.metrics.metricsList):
+        if func.__module__.startswith("pydre.metrics."):
+            assert pydre.metrics.metricsManifest.get(name) == func.__module__, name
+    for name, func in dict.items(pydre.filters.filtersList):
+        if func.__module__.startswith("pydre.filters."):
+            assert pydre.filters.filtersManifest.get(name) == func.__module__, name
+
+    for name in pydre.metrics.metricsManifest:
+        assert dict.__contains__(pydre.metrics.metricsList, name), name
+        assert dict.__contains__(pydre.metrics.metricsColNames, name), name
+        assert dict.__contains__(pydre.metrics.metricsColTypes, name), name
+    for name in pydre.filters.filtersManifest:
+        assert dict.__contains__(pydre.filters.filtersList, name), name
+
+
+def test_lazy_registry_imports_on_lookup(monkeypatch):
+    registry = LazyRegistry(buildManifest({"fake_metrics_module": ["fakeMetric"]}))
+
+    def register_on_import(name):
+        assert name == "fake_metrics_module"
+        registry["fakeMetric"] = len
+        return types.ModuleType(name)
+
+    monkeypatch.setattr("importlib.import_module", register_on_import)
+
+    assert not dict.__contains__(registry, "fakeMetric")
+    assert "fakeMetric" in registry
+    assert registry["fakeMetric"] is len
+    assert registry.get("otherMetric") is None
+    with pytest.raises(KeyError):
+        registry["otherMetric"]
+
+
+def test_project_import_does_not_load_metric_modules():
+    code = (
+        "import sys\n"
+        "import pydre.project\n"
+        "loaded = [m for m in ('scipy', 'jenkspy', 'pydre.metrics.common', "
+        "'pydre.filters.common') if m in sys.modules]\n"
+        "assert loaded == [], loaded\n"
+        "import pydre.plan\n"
+        "pydre.plan.compileMetric({'name': 'm', 'function': 'colMean', 'var': 'x'})\n"
+        "assert 'pydre.metrics.common' in sys.modules\n"
+        "assert 'pydre.metrics.box' not in sys.modules\n"
+        "assert 'scipy' not in sys.modules\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": str(SRC_DIR)},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_incremental_manifest_matches_registered_classes():
+    for name in pydre.metrics.incrementalManifest:
+        assert name in pydre.metrics.metricsIncremental, name
+        assert name in pydre.metrics.metricsManifest, name
+    for name, cls in dict.items(pydre.metrics.metricsIncremental):
+        if cls.__module__.startswith("pydre.metrics."):
+            assert pydre.metrics.incrementalManifest.get(name) == cls.__module__, name
+
+
+def test_custom_functions_survive_builtin_import():
+    code = (
+        "import pydre.metrics, pydre.filters\n"
+        "def colMean(drivedata, var):\n"
+        "    return 1\n"
+        "def closeFollowing(drivedata):\n"
+        "    return 2\n"
+        "def Jenks(drivedata):\n"
+        "    return drivedata\n"
+        "pydre.metrics.registerMetric()(colMean)\n"
+        "pydre.metrics.registerMetric()(closeFollowing)\n"
+        "pydre.filters.registerFilter()(Jenks)\n"
+        # other names of the same modules import the built-in definitions
+        "assert 'colSD' in pydre.metrics.metricsList\n"
+        "assert 'numberBinaryBlocks' in pydre.filters.filtersList\n"
+        "assert pydre.metrics.metricsList['colMean'] is colMean\n"
+        "assert pydre.metrics.metricsColNames['colMean'] == ['colMean']\n"
+        "assert pydre.filters.filtersList['Jenks'] is Jenks\n"
+        "assert 'colMean' not in pydre.metrics.metricsIncremental\n"
+        "assert 'colSD' in pydre.metrics.metricsIncremental\n"
+        "assert 'closeFollowing' not in pydre.metrics.metricsSweep\n"
+        "assert 'timeAboveSpeed' in pydre.metrics.metricsSweep\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        env={**os.environ, "PYTHONPATH": str(SRC_DIR)},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
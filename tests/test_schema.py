@@ -0,0 +1,151 @@
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+import pydre.project
+from pydre.core import DriveData
+from pydre.schema import (
+    SchemaRegistry,
+    normalizeDtypes,
+    normalizedDtypes,
+    parseDtype,
+)
+
+
+def write_dat(path: Path, header: str, rows: list[str]) -> Path:
+    path.write_text("\n".join([header] + rows) + "\n")
+    return path
+
+
+def load(path: Path, schema=None, infer_schema_length=2) -> DriveData:
+    dd = DriveData.init_rti(path)
+    dd.config = {"infer_schema_length": infer_schema_length}
+    dd.loadData(schema)
+    return dd
+
+
+def test_parse_dtype():
+    assert parseDtype("Float64") == pl.Float64
+    assert parseDtype("int") == pl.Int64
+    assert parseDtype("String") == pl.String
+    with pytest.raises(ValueError):
+        parseDtype("complex")
+
+
+def test_missing_leading_values_are_corrected(tmp_path):
+    f = write_dat(
+        tmp_path / "Sub_1_Drive_1.dat",
+        "SimTime Speed",
+        ["0.1 .", "0.2 .", "0.3 .", "0.4 12.5", "0.5 13"],
+    )
+    assert load(f).data["Speed"].dtype == pl.String
+
+    schema = SchemaRegistry()
+    data = load(f, schema).data
+    assert data["Speed"].dtype == pl.Float64
+    assert data["Speed"].to_list() == [None, None, None, 12.5, 13.0]
+    assert schema.dtypes == {"SimTime": pl.Float64, "Speed": pl.Float64}
+
+
+def test_text_columns_stay_text(tmp_path):
+    f = write_dat(tmp_path / "Sub_1_Drive_1.dat", "SimTime Label", ["0.1 a", "0.2 b"])
+    schema = SchemaRegistry()
+    assert load(f, schema).data["Label"].dtype == pl.String
+    assert schema.dtypes["Label"] == pl.String
+
+
+def test_later_files_use_known_schema(tmp_path):
+    first = write_dat(
+        tmp_path / "Sub_1_Drive_1.dat", "SimTime Speed", ["0.1 .", "0.2 .", "0.3 4"]
+    )
+    second = write_dat(
+        tmp_path / "Sub_1_Drive_2.dat",
+        "SimTime Speed",
+        ["0.1 .", "0.2 .", "0.3 .", "0.4 4"],
+    )
+    schema = SchemaRegistry()
+    load(first, schema)
+    assert schema.overridesFor(["SimTime", "Speed"]) == (
+        {"SimTime": pl.Float64, "Speed": pl.Float64},
+        True,
+    )
+    assert load(second, schema).data["Speed"].dtype == pl.Float64
+
+
+def test_conflicting_types_are_widened(tmp_path):
+    ints = write_dat(tmp_path / "Sub_1_Drive_1.dat", "SimTime Lane", ["0.1 1", "0.2 2"])
+    floats = write_dat(
+        tmp_path / "Sub_1_Drive_2.dat", "SimTime Lane", ["0.1 1", "0.2 1.5"]
+    )
+    schema = SchemaRegistry()
+    assert load(ints, schema).data["Lane"].dtype == pl.Int64
+    data = load(floats, schema).data
+    assert data["Lane"].to_list() == [1.0, 1.5]
+    assert schema.dtypes["Lane"] == pl.Float64
+
+
+def test_explicit_schema_and_persistence(tmp_path):
+    write_dat(
+        tmp_path / "Sub_1_Drive_1.dat", "SimTime Lane Speed", ["0.1 1 .", "0.2 2 ."]
+    )
+    toml = tmp_path / "schema.toml"
+    toml.write_text("""
+    [config]
+    datafiles = ["*.dat"]
+    schema_file = "learned_schema.json"
+
+    [config.schema]
+    Lane = "Float64"
+
+    [metrics.meanLane]
+    function = "colMean"
+    var = "Lane"
+    """)
+    proj = pydre.project.Project(toml)
+    data = proj.loadDatafile(proj.filelist[0]).data
+    assert data["Lane"].dtype == pl.Float64
+    assert data["Speed"].dtype == pl.String  # all missing, left to inference
+
+    proj.processDatafiles(numThreads=1)
+    assert (tmp_path / "learned_schema.json").exists()
+    reloaded = SchemaRegistry(path=tmp_path / "learned_schema.json")
+    assert reloaded.dtypes["SimTime"] == pl.Float64
+    assert "Speed" not in reloaded.dtypes
+
+
+def test_normalized_dtypes_config():
+    defaults = normalizedDtypes({})
+    assert defaults["SimTime"] == pl.Float64
+    assert defaults["XPos"] == pl.Float64
+    assert "XPos" not in normalizedDtypes({"datafile_type": "scanner"})
+    assert normalizedDtypes({"normalize": False}) == {}
+
+    custom = normalizedDtypes({"normalize": {"XPos": "Float32", "TaskFail": "UInt8"}})
+    assert custom["XPos"] == pl.Float32
+    assert custom["TaskFail"] == pl.UInt8
+
+
+def test_normalize_dtypes_leaves_unconvertible_columns():
+    df = pl.DataFrame({"SimTime": [1, 2], "DatTime": ["a", "b"], "XPos": [0.5, 1.5]})
+    normalized = normalizeDtypes(df, normalizedDtypes({}))
+    assert normalized.schema["SimTime"] == pl.Float64
+    assert normalized.schema["DatTime"] == pl.String
+    assert normalized.schema["XPos"] == pl.Float64
+
+
+def test_project_normalizes_loaded_files(tmp_path):
+    write_dat(tmp_path / "DX_1_City_1.dat", "SimTime XPos Lane", ["1 10 1", "2 20 2"])
+    toml = tmp_path / "normalize.toml"
+    toml.write_text("""
+    [config]
+    datafiles = ["*.dat"]
+
+    [config.normalize]
+    Lane = "UInt8"
+    """)
+    proj = pydre.project.Project(toml)
+    data = proj.loadDatafile(proj.filelist[0]).data
+    assert data.schema["SimTime"] == pl.Float64
+    assert data.schema["XPos"] == pl.Float64
+    assert data.schema["Lane"] == pl.UInt8
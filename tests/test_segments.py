@@ -0,0 +1,98 @@
+import polars as pl
+
+from pydre.core import DriveData
+from pydre.segments import (
+    dropShortRuns,
+    firstIndex,
+    firstTime,
+    lastIndex,
+    lastTime,
+    runDuration,
+    runId,
+    runLength,
+    runStarts,
+    runTable,
+)
+
+
+def test_run_expressions():
+    df = pl.DataFrame(
+        {
+            "t": [0.0, 0.1, 0.2, 0.3, 0.4, 0.5],
+            "v": [1, 1, None, 2, 2, 2],
+        }
+    )
+    result = df.select(
+        id=runId(pl.col("v")),
+        length=runLength(pl.col("v")),
+        duration=runDuration(pl.col("v"), pl.col("t")),
+        kept=dropShortRuns(pl.col("v"), pl.col("t"), 0.15),
+    )
+    assert result["id"].to_list() == [0, 0, 1, 2, 2, 2]
+    assert result["length"].to_list() == [2, 2, 1, 3, 3, 3]
+    assert result["duration"].round(6).to_list() == [0.1, 0.1, 0.0, 0.2, 0.2, 0.2]
+    assert result["kept"].to_list() == [None, None, None, 2, 2, 2]
+
+
+def test_run_table():
+    dd = DriveData.init_test(
+        pl.DataFrame(
+            {
+                "SimTime": [0.0, 0.1, 0.2, 0.3, 0.4, 0.5],
+                "Brake": [0, 3, 4, 0, None, 2],
+            }
+        ),
+        "test_run_table.dat",
+    )
+    runs = runTable(dd, "Brake")
+    assert runs.columns == [
+        "run",
+        "start",
+        "end",
+        "length",
+        "value",
+        "previous",
+        "start_time",
+        "end_time",
+    ]
+    assert runs["start"].to_list() == [0, 1, 2, 3, 4, 5]
+
+    presses = runTable(dd, pl.col("Brake") > 0)
+    assert presses["start"].to_list() == [0, 1, 3, 4, 5]
+    assert presses["end"].to_list() == [0, 2, 3, 4, 5]
+    assert presses["end_time"].to_list() == [0.0, 0.2, 0.3, 0.4, 0.5]
+
+    # a press after missing data is not counted as a transition
+    assert runStarts(dd, pl.col("Brake") > 0)["start"].to_list() == [1]
+
+
+def test_run_table_is_cached_until_data_changes():
+    dd = DriveData.init_test(
+        pl.DataFrame({"SimTime": [0.0, 0.1], "Lane": [1, 2]}), "test_cache.dat"
+    )
+    first = runTable(dd, "Lane")
+    assert runTable(dd, "Lane") is first
+    assert runTable(dd, "Lane", timecol=None) is not first
+
+    dd.data = dd.data.with_columns(pl.lit(1).alias("Lane"))
+    assert runTable(dd, "Lane").height == 1
+
+
+def test_first_and_last_crossings():
+    df = pl.DataFrame(
+        {
+            "SimTime": [0.0, 1.0, 1.0, 2.0, 3.0],
+            "Brake": [0, 5, 0, 0, 1],
+            "Accel": [1, 1, 1, 0, 1],
+        }
+    )
+    assert firstIndex(df, pl.col("Accel") > 0) == 0
+    assert lastIndex(df, pl.col("Brake") == 0) == 3
+    assert firstTime(df, pl.col("Brake") > 3) == 1.0
+    assert lastTime(df, pl.col("Accel") > 0) == 3.0
+    assert firstTime(df, pl.col("Brake") > 10) is None
+
+    # first acceleration after the first brake press: by row, and strictly later in time
+    assert firstIndex(df, pl.col("Accel") > 0, after=pl.col("Brake") > 3) == 2
+    assert firstTime(df, pl.col("Accel") > 0, after=pl.col("Brake") > 3) == 3.0
+    assert firstTime(df, pl.col("Accel") > 0, after=pl.col("Brake") > 10) is None
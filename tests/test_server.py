@@ -0,0 +1,143 @@
+import io
+import json
+import os
+import shutil
+from pathlib import Path
+
+import polars as pl
+from loguru import logger
+
+from pydre import server
+from pydre.run import main
+
+FIXTURE_DIR = Path(__file__).parent.resolve() / "test_data"
+
+
+def make_project(tmp_path: Path) -> tuple[Path, Path]:
+    datafile = tmp_path / "clvspectest_Sub_8_Drive_3.dat"
+    shutil.copy(
+        FIXTURE_DIR / "test_datfiles" / "clvspectest_Sub_8_Drive_3.dat", datafile
+    )
+    projectfile = tmp_path / "project.toml"
+    projectfile.write_text(
+        """
+[metrics.meanAccel]
+function = "colMean"
+var = "LonAccel"
+"""
+    )
+    return projectfile, datafile
+
+
+def test_submit_and_run_job(tmp_path):
+    projectfile, datafile = make_project(tmp_path)
+    queue = tmp_path / "queue"
+    worker = server.PydreServer(queue, num_threads=1)
+
+    job_id = server.submitJob(
+        queue, projectfile, [str(datafile)], str(tmp_path / "a.csv")
+    )
+    assert (queue / "incoming" / f"{job_id}.json").exists()
+    assert worker.runPending() == 1
+
+    stream = io.StringIO()
+    status = server.waitForJob(queue, job_id, stream=stream, timeout=5)
+    assert status["status"] == "done"
+    assert status["rows"] == 1
+    assert "Running job" in stream.getvalue()
+    assert pl.read_csv(tmp_path / "a.csv")["meanAccel"].len() == 1
+    assert not any((queue / "incoming").iterdir())
+    assert not any((queue / "running").iterdir())
+
+
+def test_worker_reuses_plan_and_data(tmp_path):
+    projectfile, datafile = make_project(tmp_path)
+    queue = tmp_path / "queue"
+    worker = server.PydreServer(queue, num_threads=1)
+
+    first = server.submitJob(
+        queue, projectfile, [str(datafile)], str(tmp_path / "a.csv")
+    )
+    worker.runPending()
+    plan = next(iter(worker._plans.values()))[1]
+    assert len(worker.datafile_cache) == 1
+
+    second = server.submitJob(
+        queue, projectfile, [str(datafile)], str(tmp_path / "b.csv")
+    )
+    worker.runPending()
+    assert len(worker._plans) == 1
+    assert next(iter(worker._plans.values()))[1] is plan
+    assert len(worker.datafile_cache) == 1
+    assert "Using cached plan" in (queue / "logs" / f"{second}.log").read_text()
+    assert pl.read_csv(tmp_path / "a.csv").equals(pl.read_csv(tmp_path / "b.csv"))
+    assert (
+        json.loads((queue / "done" / f"{first}.json").read_text())["status"] == "done"
+    )
+
+
+def test_worker_recompiles_plan_when_sources_change(tmp_path):
+    projectfile, datafile = make_project(tmp_path)
+    metrics_dir = tmp_path / "custom"
+    metrics_dir.mkdir()
+    custom = metrics_dir / "custom_metric.py"
+    custom.write_text(
+        "from pydre.metrics import registerMetric\n"
+        "@registerMetric()\n"
+        "def serverTestValue(drivedata):\n"
+        "    return 1\n"
+    )
+    projectfile.write_text(
+        projectfile.read_text()
+        + '[config]\ncustom_metrics_dirs = ["custom"]\n'
+        + '[metrics.value]\nfunction = "serverTestValue"\n'
+    )
+    queue = tmp_path / "queue"
+    worker = server.PydreServer(queue, num_threads=1)
+
+    server.submitJob(queue, projectfile, [str(datafile)], str(tmp_path / "a.csv"))
+    worker.runPending()
+    assert pl.read_csv(tmp_path / "a.csv")["value"].to_list() == [1]
+
+    # the custom module changes, but the project file does not
+    custom.write_text(custom.read_text().replace("return 1", "return 2"))
+    stat = custom.stat()
+    os.utime(custom, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    server.submitJob(queue, projectfile, [str(datafile)], str(tmp_path / "b.csv"))
+    worker.runPending()
+    assert pl.read_csv(tmp_path / "b.csv")["value"].to_list() == [2]
+    assert len(worker._plans) == 1
+
+
+def test_failed_job_reports_error(tmp_path):
+    queue = tmp_path / "queue"
+    worker = server.PydreServer(queue)
+    job_id = server.submitJob(queue, tmp_path / "missing.toml")
+    worker.runPending()
+    status = server.waitForJob(queue, job_id, timeout=5)
+    assert status["status"] == "failed"
+    assert "Traceback" in status["traceback"]
+    assert "Traceback" in (queue / "logs" / f"{job_id}.log").read_text()
+
+
+def test_worker_keeps_its_log_sink(tmp_path, capsys):
+    projectfile, datafile = make_project(tmp_path)
+    queue = tmp_path / "queue"
+    worker = server.PydreServer(queue, num_threads=1, log_level="DEBUG")
+    server.submitJob(queue, projectfile, [str(datafile)], str(tmp_path / "a.csv"))
+    server.submitJob(queue, projectfile, [str(datafile)], str(tmp_path / "b.csv"))
+    worker.runPending()
+    # projects log at INFO; the worker's own DEBUG sink is back after the jobs
+    logger.debug("worker still logging")
+    assert "worker still logging" in capsys.readouterr().err
+
+
+def test_cli_submit_and_serve_once(tmp_path):
+    projectfile, datafile = make_project(tmp_path)
+    queue = tmp_path / "queue"
+    output = tmp_path / "cli.csv"
+
+    args = ["-p", str(projectfile), "-d", str(datafile), "-o", str(output)]
+    assert main(["submit", "-q", str(queue), "--no-wait", *args]) == 0
+    assert main(["serve", "-q", str(queue), "--once", "-t", "1"]) == 0
+    assert output.exists()
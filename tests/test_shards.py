@@ -0,0 +1,111 @@
+import random
+import shutil
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+from pydre import shards
+from pydre.run import main
+
+FIXTURE_DIR = Path(__file__).parent.resolve() / "test_data"
+
+
+def make_files(tmp_path, sizes):
+    files = []
+    for i, size in enumerate(sizes):
+        f = tmp_path / f"file_{i}.dat"
+        f.write_bytes(b"x" * size)
+        files.append(f)
+    return files
+
+
+def test_parse_shard():
+    assert shards.parseShard("1/4") == (1, 4)
+    assert shards.parseShard("4/4") == (4, 4)
+    for bad in ["0/4", "5/4", "1/0", "a/b", "3", "1/2/3"]:
+        with pytest.raises(ValueError):
+            shards.parseShard(bad)
+
+
+def test_partition_covers_all_files_once(tmp_path):
+    files = make_files(tmp_path, [100, 10, 55, 70, 30, 30, 5, 90])
+    groups = shards.partitionFiles(files, 3)
+    assert sorted(f for g in groups for f in g) == sorted(files)
+    loads = [sum(f.stat().st_size for f in g) for g in groups]
+    assert max(loads) - min(loads) <= 100
+
+
+def test_partition_is_deterministic(tmp_path):
+    files = make_files(tmp_path, [100, 10, 55, 70, 30, 30, 5, 90])
+    expected = [shards.shardFiles(files, i, 3) for i in range(1, 4)]
+    shuffled = list(files)
+    random.Random(1).shuffle(shuffled)
+    for i in range(1, 4):
+        assert sorted(shards.shardFiles(shuffled, i, 3)) == sorted(expected[i - 1])
+
+
+def test_shard_output_name():
+    assert shards.shardOutputName("out.csv", 2, 8) == "out.shard-2-of-8.csv"
+    assert shards.shardOutputName(Path("res") / "a.csv", 1, 2) == str(
+        Path("res") / "a.shard-1-of-2.csv"
+    )
+
+
+def test_merge_results_reconciles_schema(tmp_path):
+    a = tmp_path / "a.csv"
+    b = tmp_path / "b.csv"
+    pl.DataFrame(
+        {"ParticipantID": ["2", "1"], "ROI": ["x", "x"], "m1": [1, 2]}
+    ).write_csv(a)
+    pl.DataFrame(
+        {"ParticipantID": ["0"], "ROI": ["y"], "m1": [1.5], "m2": ["z"]}
+    ).write_csv(b)
+
+    merged = shards.mergeResults([a, b], tmp_path / "out.csv")
+    assert merged.columns == ["ParticipantID", "ROI", "m1", "m2"]
+    assert merged["ParticipantID"].to_list() == [0, 1, 2]
+    assert merged["m1"].dtype == pl.Float64
+    assert merged["m2"].to_list() == ["z", None, None]
+
+
+def test_merge_results_with_empty_metric_shard(tmp_path):
+    a = tmp_path / "a.csv"
+    b = tmp_path / "b.csv"
+    pl.DataFrame({"ParticipantID": ["1"], "ROI": ["x"], "m": [1.5]}).write_csv(a)
+    pl.DataFrame(
+        {"ParticipantID": ["2"], "ROI": ["x"], "m": [None]},
+        schema={"ParticipantID": pl.String, "ROI": pl.String, "m": pl.Float64},
+    ).write_csv(b)
+    assert pl.read_csv(b).schema["m"] == pl.String
+
+    merged = shards.mergeResults([a, b], tmp_path / "out.csv")
+    assert merged.schema["m"] == pl.Float64
+    assert merged["m"].to_list() == [1.5, None]
+
+
+def test_sharded_run_matches_single_run(tmp_path):
+    for drive in (1, 2, 3):
+        name = f"CrossCorrTest_Sub_1_Drive_{drive}.dat"
+        shutil.copy(FIXTURE_DIR / "test_datfiles" / name, tmp_path / name)
+    projectfile = tmp_path / "project.toml"
+    projectfile.write_text(
+        """
+[config]
+datafiles = ["CrossCorrTest_*.dat"]
+
+[metrics.meanTime]
+function = "colMean"
+var = "SimTime"
+"""
+    )
+    single = tmp_path / "single.csv"
+    assert main(["-p", str(projectfile), "-o", str(single)]) == 0
+    out = tmp_path / "out.csv"
+    for i in (1, 2):
+        assert main(["-p", str(projectfile), "-o", str(out), "--shard", f"{i}/2"]) == 0
+    shard_files = [str(tmp_path / f"out.shard-{i}-of-2.csv") for i in (1, 2)]
+    assert main(["merge-results", *shard_files, "-o", str(out)]) == 0
+
+    expected = pl.read_csv(single).sort("UniqueID")
+    assert pl.read_csv(out).equals(expected)
@@ -0,0 +1,117 @@
+import os
+
+import polars as pl
+
+import pydre.project
+from pydre.run import main
+from pydre.watch import Watcher
+
+
+def write_drive(path, velocities, mtime=None):
+    lines = ["SimTime Velocity"]
+    lines += [f"{i / 10} {v}" for i, v in enumerate(velocities)]
+    path.write_text("\n".join(lines) + "\n")
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+def make_project(tmp_path):
+    toml = tmp_path / "watch.toml"
+    toml.write_text("""
+    [config]
+    datafiles = ["data/*.dat"]
+    outputfile = "results.csv"
+
+    [metrics.meanVelocity]
+    function = "colMean"
+    var = "Velocity"
+    """)
+    (tmp_path / "data").mkdir()
+    return toml
+
+
+def test_watcher_processes_new_and_changed_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    toml = make_project(tmp_path)
+    data = tmp_path / "data"
+    write_drive(data / "Main_1_Load_1.dat", [2, 4])
+
+    watcher = Watcher(pydre.project.Project(toml), settle=0)
+    # first seen: wait until the file has settled
+    assert watcher.poll() == []
+    assert [p.name for p in watcher.poll()] == ["Main_1_Load_1.dat"]
+    assert watcher.poll() == []
+
+    calls = []
+    original = watcher.project.processSingleFile
+    monkeypatch.setattr(
+        watcher.project,
+        "processSingleFile",
+        lambda path: calls.append(path.name) or original(path),
+    )
+    write_drive(data / "Main_2_Load_2.dat", [10, 20])
+    write_drive(data / "Main_1_Load_1.dat", [6, 8], mtime=1)
+    watcher.poll()
+    watcher.poll()
+    assert sorted(calls) == ["Main_1_Load_1.dat", "Main_2_Load_2.dat"]
+
+    results = pl.read_csv(tmp_path / "results.csv")
+    assert results["ParticipantID"].to_list() == [1, 2]
+    assert results["meanVelocity"].to_list() == [7.0, 15.0]
+
+    # a new watcher resumes from the saved state without reprocessing
+    calls.clear()
+    watcher = Watcher(pydre.project.Project(toml), settle=0)
+    monkeypatch.setattr(
+        watcher.project,
+        "processSingleFile",
+        lambda path: calls.append(path.name) or original(path),
+    )
+    (data / "Main_2_Load_2.dat").unlink()
+    watcher.poll()
+    watcher.poll()
+    assert calls == []
+    results = pl.read_csv(tmp_path / "results.csv")
+    assert results["meanVelocity"].to_list() == [7.0]
+
+
+def test_watcher_retries_failed_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    toml = make_project(tmp_path)
+    write_drive(tmp_path / "data" / "Main_1_Load_1.dat", [2, 4])
+
+    watcher = Watcher(pydre.project.Project(toml), settle=0)
+    original = watcher.project.processSingleFile
+
+    def locked(path):
+        raise PermissionError(f"{path} is locked")
+
+    calls = []
+    monkeypatch.setattr(
+        watcher.project,
+        "processSingleFile",
+        lambda path: calls.append(path.name) or locked(path),
+    )
+    watcher.poll()
+    assert watcher.poll() == []
+    assert watcher.processed == {}
+    # the same version is not tried again
+    assert watcher.poll() == []
+    assert calls == ["Main_1_Load_1.dat"]
+
+    # a new version of the file is
+    monkeypatch.setattr(watcher.project, "processSingleFile", original)
+    write_drive(tmp_path / "data" / "Main_1_Load_1.dat", [2, 4], mtime=1)
+    watcher.poll()
+    assert [p.name for p in watcher.poll()] == ["Main_1_Load_1.dat"]
+    assert pl.read_csv(tmp_path / "results.csv")["meanVelocity"].to_list() == [3.0]
+
+
+def test_watch_cli(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    toml = make_project(tmp_path)
+    write_drive(tmp_path / "data" / "Main_1_Load_1.dat", [2, 4])
+    args = ["watch", "-p", str(toml), "-o", "out.csv", "--settle", "0", "--once"]
+    assert main(args) == 0
+    assert pl.read_csv(tmp_path / "out.csv")["meanVelocity"].to_list() == [3.0]
+    assert (tmp_path / "out.csv.watch" / "files.json").exists()